@@ -1,13 +1,20 @@
 from collections.abc import Callable
-from typing import Dict, List, Tuple
+from functools import partial
+from typing import Dict, List, Optional, Tuple
 
-import networkx as nx
 import numpy as np
-import pandas as pd
 from agent.CommunicatingAgent import CommunicatingAgent
 from arguments.Argument import Argument
+from arguments.Argumentation import Argumentation
 from arguments.CoupleValue import CoupleValue
-from conversational_model.FSM import FiniteStateMachine
+from conversational_model.ConversationManager import ConversationManager
+from conversational_model.ConversationTable import (
+    Conversation,
+    Conversations,
+    ConversationTable,
+)
+from conversational_model.FSM import Turn
+from conversational_model.TransitionContext import TransitionContext
 from mesa import Model
 from message.Message import Message
 from message.MessagePerformative import MessagePerformative
@@ -20,22 +27,7 @@ from preferences.PreferenceModel import (
 )
 from preferences.Preferences import Preferences
 from preferences.Value import Value
-
-
-class Argumentation:
-    def __init__(self, agent_a, agent_b):
-        self.agent_a = agent_a
-        self.agent_b = agent_b
-        self.G = nx.Graph()
-
-    def add_argument(self, argument: Argument):
-        self.G.add_node(argument)
-
-        if argument.get_parent() is not None:
-            self.G.add_edge(argument, argument.get_parent())
-
-    def all_arguments(self):
-        return self.G.nodes
+from rng.RandomStream import RandomStream
 
 
 class ArgumentAgent(CommunicatingAgent):
@@ -49,11 +41,21 @@ class ArgumentAgent(CommunicatingAgent):
         list_items: a list of items the agent can see.
         bag: a list of items that the agent possess.
         conversations:
-        a dictionary that maps conversation IDs to FiniteStateMachine objects.
-        Each conversation is managed by a FSM, that controls the state of the protocol.
-        The FSM is initialized when the agent receives a message from another agent, or
-        when the agent initiates a conversation with another agent.
-        Each agents maintains a copy of the FSM for each conversation it is involved in.
+        a mapping from the names of the other agents to the conversations with them.
+        Each conversation follows the protocol, with the interface of a FSM, and is
+        stored in the ConversationTable of the model, which holds the state of the
+        conversations of every pair of agents.
+        Each agent maintains its own view of each conversation it is involved in.
+        conversation_manager:
+        the ConversationManager resetting the conversations once closed, and
+        evicting the argumentations of the closed conversations.
+        deterministic: whether ties between preferred items are broken by the
+        order of the items instead of at random.
+        conversation_cache:
+        the ConversationCache resolving the conversations the agent opens at once,
+        None when conversations are run message by message.
+        max_conversations: the number of conversations under way the agent keeps
+        by opening new ones, None to open one per step whatever their number.
 
     """
 
@@ -65,128 +67,160 @@ class ArgumentAgent(CommunicatingAgent):
         decision_function: Callable[[Message, MessagePerformative], Message],
         message_builder: Callable[[Message, MessagePerformative], Message],
         verbose: bool = False,
+        rng: Optional[RandomStream] = None,
     ):
         super().__init__(unique_id, model, name)
+        profiler = getattr(model, "profiler", None)
+        if profiler is not None:
+            decision_function = profiler.wrap("decide", decision_function)
+            message_builder = profiler.wrap("build_message", message_builder)
+
         self.preferences = Preferences(
-            lambda preferences, input, current_state, next_states: decision_function(
-                self,
-                preferences,
-                input,
-                current_state,
-                next_states,
-            ),
-            lambda preferences, input, next_states: message_builder(
-                self,
-                preferences,
-                input,
-                next_states,
-            ),
+            partial(decision_function, self),
+            partial(message_builder, self),
         )
 
         self.list_items: list[Item] = []
+        self.thresholds: Optional[np.ndarray] = None
+        self.__items_by_name: Dict[str, Item] = {}
+        self.__items_above: Dict[CriterionName, List[Tuple[Item, ...]]] = {}
         self.agreed_items: Dict[str, List[str]] = {}
         self.proposed_items: Dict[str, List[str]] = {}
-        self.conversations: dict[str, FiniteStateMachine] = {}
+        table = getattr(model, "conversations", None)
+        if table is None:
+            # Agents of a model without a table share one, so that they know
+            # each other as partners.
+            table = model.conversations = ConversationTable()
+        self.conversations: Conversations = table.add_agent(name)
         self.argumentations: dict[str, Argumentation] = {}
+        self.conversation_manager = ConversationManager(
+            self.conversations,
+            self.argumentations,
+            argument_budget=getattr(model, "argument_budget", None),
+        )
         self.verbose = verbose
+        self.rng = rng if rng is not None else RandomStream()
+        self.deterministic = getattr(model, "deterministic", False)
+        self.conversation_cache = getattr(model, "conversation_cache", None)
+        self.max_conversations = getattr(model, "max_conversations", None)
+
+        self.__infer = self.__infer_other_action
+        self.__init_conversation = self.init_conversation
+        if profiler is not None:
+            self.__infer = profiler.wrap("fsm_inference", self.__infer)
+            self.__init_conversation = profiler.wrap(
+                "init_conversation",
+                self.__init_conversation,
+            )
 
     def step(self):
         super().step()
-        nouveaux_messages = self.get_new_messages()
-        for new_message in nouveaux_messages:
+        self.process_messages(self.get_new_messages())
+        self.__init_conversation()
+
+    def process_messages(self, messages: List[Message]):
+        """Answers each message in the conversation with its sender."""
+        for new_message in messages:
             exp = new_message.get_exp()
-            if exp not in self.conversations:
-                self.conversations[exp] = FiniteStateMachine(
-                    self.get_name(),
-                    exp,
-                    verbose=False,
-                )
+            conversation = self.conversations[exp]
 
             # Infer the other agent action
-            self.conversations[exp].step(input=new_message)
+            self.__infer(conversation, new_message)
 
             # Do my action
-            self.conversations[exp].step(
+            conversation.step(
                 input=new_message,
                 preferences=self.preferences,
             )
+            self.conversation_manager.update(exp)
 
-        self.init_conversation()
+    def new_conversation(self, other_agent_name: str) -> Conversation:
+        conversation = self.conversations[other_agent_name]
+        conversation.reset()
+        return conversation
 
-    def reset_conversation(self):
-        finished_talking = [
-            conversation
-            for conversation in self.conversations.values()
-            if conversation.has_finished()
-        ]
+    @staticmethod
+    def __infer_other_action(conversation: Conversation, message: Message):
+        conversation.step(input=message)
 
-        for conversation in finished_talking:
-            conversation.reset()
+    def reset_conversation(self):
+        self.conversation_manager.reset_finished()
 
     def set_bag(self, bag: Dict[str, List[str]]):
         self.agreed_items = bag
 
     def init_conversation(self):
-        """Initialize a new conversation with another agent.
-
-        This method selects a random agent that is not already engaged in a conversation
-        with the current agent, and starts a new conversation with them using a new
-        `FiniteStateMachine` object. If there are no available agents to converse with,
-        this method does nothing.
+        """Initialize new conversations with other agents.
 
-        If the selected agent is already involved in a conversation with the current
-        agent, no new conversation is started.
+        This method selects a random agent that is not already engaged in a
+        conversation with the current agent, and starts the conversation with them
+        from the initial state of the protocol, reusing the one of their previous
+        exchange. With max_conversations, it instead selects as many agents as
+        needed to bring the conversations under way up to max_conversations, or
+        all the available ones if there are fewer. If there are no available agents
+        to converse with, this method does nothing.
 
         This method is called at each step of the model, after processing incoming
         messages and resetting finished conversations.
         """
 
-        continuous_talkings = [
-            conversation
-            for conversation, fsm in self.conversations.items()
-            if not fsm.is_start()
-        ]
-
-        finished_talking = [
-            conversation
-            for conversation, fsm in self.conversations.items()
-            if fsm.has_finished()
-        ]
-
-        continuous_talkings = list(set(continuous_talkings) - set(finished_talking))
-
-        possible_choices = [
-            agent
-            for agent in self.model.schedule.agents
-            if agent.get_name() not in continuous_talkings
-            and agent.get_name() != self.get_name()
-        ]
-
-        # print('possible_choices', [x.get_name()
-        # for x in possible_choices], 'agent: ', self.get_name())
-        # print('self.conversations', self.conversations)
-        if len(possible_choices) == 0:
-            return
-        chosen_agent = np.random.choice(possible_choices, 1, replace=False)[0]
-
-        if chosen_agent not in self.conversations:
-            self.conversations[chosen_agent.get_name()] = FiniteStateMachine(
-                self.get_name(),
-                chosen_agent.get_name(),
-                verbose=False,
+        possible_choices = self.conversations.available_partners()
+        table = self.conversations.table
+        openings = 1
+        if self.max_conversations is not None:
+            # Every other agent of the row is either available or under way.
+            under_way = (
+                table.row_size(self.conversations.agent)
+                - len(possible_choices)
+                - (table.topology is None)
             )
-
-        self.conversations[chosen_agent.get_name()].step(
-            input=Message(
+            openings = self.max_conversations - under_way
+        names = table.names
+        for remaining in range(min(openings, len(possible_choices)), 0, -1):
+            chosen = self.rng.choice(possible_choices)
+            self.__open_conversation(names[chosen])
+            if remaining > 1:
+                possible_choices = possible_choices[possible_choices != chosen]
+
+    def __open_conversation(self, chosen_agent: str):
+        # Takes the initiative of the conversation with chosen_agent.
+        conversation = self.conversation_manager.open(chosen_agent)
+        if self.conversation_cache is None:
+            conversation.tick(self.preferences)
+        else:
+            self.__resolve_conversation(conversation, chosen_agent)
+        self.conversation_manager.update(chosen_agent)
+
+    def __resolve_conversation(self, conversation: Conversation, other: str):
+        # Takes the opening decision as tick does, then resolves the conversation
+        # at once through the cache instead of sending the proposal.
+        if conversation.control is None:
+            conversation.control = Message(
                 self.get_name(),
-                chosen_agent.get_name(),
+                other,
                 MessagePerformative.IDLE,
                 None,
-            ),
-            preferences=self.preferences,
+            )
+        context = TransitionContext()
+        conversation.turn = Turn.Other
+        next_state = conversation.table.protocol.next_state(
+            conversation.current_state,
+            conversation.control,
+            self.preferences,
+            context,
+        )
+        if next_state != MessagePerformative.PROPOSE:
+            conversation.current_state = next_state
+            return
+        self.conversation_cache.resolve(
+            self,
+            self.model.message_service.find_agent_from_name(other),
+            context.item,
         )
 
     def print_preference_table(self):
+        import pandas as pd
+
         criterion_list = self.preferences.get_criterion_value_list()
         criterion_names = self.preferences.get_criterion_name_list()
 
@@ -202,7 +236,8 @@ class ArgumentAgent(CommunicatingAgent):
         print("Preference table of ", self.get_name(), ":")
         print(pref_table)
         df_items = pd.DataFrame(
-            {x: [x.get_score(self.preferences)] for x in self.list_items},
+            [self.preferences.get_scores(self.list_items)],
+            columns=self.list_items,
         )
         print("Score of each item for ", self.get_name(), ":")
         print(df_items)
@@ -231,8 +266,17 @@ class ArgumentAgent(CommunicatingAgent):
         criterion_list = list(list(map_item_criterion.items())[0][1].keys())
 
         criterion_name_list = [CriterionName[x] for x in criterion_list]
-        np.random.shuffle(criterion_name_list)
-        if self.verbose:
+        self.rng.shuffle(criterion_name_list)
+        trace = getattr(self.model, "trace", None)
+        if trace is not None:
+            if trace.enabled_for(trace.EVENTS):
+                trace.log(
+                    trace.EVENTS,
+                    "Agent %s criterion_name_list: %s",
+                    self.get_name(),
+                    " > ".join(criterion.name for criterion in criterion_name_list),
+                )
+        elif self.verbose:
             print("Agent ", self.get_name(), " criterion_name_list: ", end=" ")
             for criterion in criterion_name_list[0:-1]:
                 print(criterion.name + " >", end=" ")
@@ -240,27 +284,90 @@ class ArgumentAgent(CommunicatingAgent):
 
         self.preferences.set_criterion_name_list(criterion_name_list)
 
-        profiler = RandomIntervalProfile(map_item_criterion, verbose)
+        profiler = RandomIntervalProfile(
+            map_item_criterion,
+            verbose,
+            rng=self.rng.generator,
+        )
         # profiler = IntervalProfileCSV(map_item_criterion, verbose)
 
-        for criterion in criterion_list:
-            for item in list_items:
-                value = profiler.get_value_from_data(item, CriterionName[criterion])
+        criterion_names = [CriterionName[criterion] for criterion in criterion_list]
+        self.thresholds = np.full(
+            (len(CriterionName), len(profiler.VALUES) - 1),
+            np.nan,
+        )
+        for criterion_name in criterion_names:
+            self.thresholds[criterion_name.value] = profiler.get_thresholds(
+                criterion_name
+            )
+        values = profiler.get_values_from_data(list_items, criterion_names).tolist()
+        for column, criterion_name in enumerate(criterion_names):
+            for row, item in enumerate(list_items):
                 self.preferences.add_criterion_value(
-                    CriterionValue(item, CriterionName[criterion], value),
+                    CriterionValue(
+                        item,
+                        criterion_name,
+                        profiler.VALUES[values[row][column]],
+                    ),
                 )
+        self.__build_indexes()
 
         if verbose:
             self.print_preference_table()
 
+    def set_preferences(
+        self,
+        list_items: list[Item],
+        criterion_name_list: list[CriterionName],
+        criterion_values: list[CriterionValue],
+        thresholds: Optional[np.ndarray] = None,
+    ):
+        """Sets preferences generated elsewhere, in place of generate_preferences.
+
+        Args:
+            list_items (list[Item]): The items the agent can see.
+            criterion_name_list (list[CriterionName]): The criteria, most important
+            first.
+            criterion_values (list[CriterionValue]): The value of every item on every
+            criterion, in the order generate_preferences adds them.
+            thresholds (np.ndarray): The thresholds of the interval profile the
+            values were classified with, one row per criterion value, if known.
+        """
+        self.list_items = list_items
+        self.thresholds = thresholds
+        self.preferences.set_criterion_name_list(criterion_name_list)
+        for criterion_value in criterion_values:
+            self.preferences.add_criterion_value(criterion_value)
+        self.__build_indexes()
+
+    def __build_indexes(self):
+        # Indexes the preferences once they are complete. For each criterion and
+        # value, keeps the first two items of list_items valued above it on that
+        # criterion, which is enough to find one that is not the proposed item.
+        self.preferences.build_index()
+        self.__items_by_name = {item.get_name(): item for item in self.list_items}
+        self.__items_above = {}
+        for criterion in self.preferences.get_criterion_name_list():
+            item_values = [
+                (item, self.preferences.get_value(item, criterion).value)
+                for item in self.list_items
+            ]
+            self.__items_above[criterion] = [
+                tuple([item for item, value in item_values if value > threshold][:2])
+                for threshold in range(len(Value))
+            ]
+
+    def get_item(self, item_name: str) -> Item:
+        """Returns the item of list_items with the given name."""
+        return self.__items_by_name[item_name]
+
     def support_proposal(self, item: str, agent: str):
         """
         Used when the agent receives " ASK_WHY " after having proposed an item
         : param item : str - name of the item which was proposed
         : return : string - the strongest supportive argument
         """
-        items = [x for x in self.list_items if x.get_name() == item]
-        item = items[0]
+        item = self.__items_by_name[item]
         best_argument = Argument(True, item, self.get_name())
         list_arguments = best_argument.list_supporting_proposal(item, self.preferences)
         # remove already used arguments
@@ -294,10 +401,8 @@ class ArgumentAgent(CommunicatingAgent):
         best_argument: Argument,
         already_used_arguments: Argument,
     ) -> bool:
-        for already_used_argument in already_used_arguments:
-            if best_argument == already_used_argument:
-                return True
-        return False
+        # Arguments are hashed and compared by their text.
+        return best_argument in already_used_arguments
 
     def attack_proposal(self, item):
         """
@@ -305,7 +410,7 @@ class ArgumentAgent(CommunicatingAgent):
         : param item : str - name of the item which was proposed
         : return : string - the strongest supportive argument
         """
-        item = [x for x in self.list_items if x.get_name() == item][0]
+        item = self.__items_by_name[item]
         best_argument = Argument(False, item, self.get_name())
         list_arguments = best_argument.list_attacking_proposal(item, self.preferences)
         # les arguments sont ordonnés dans la liste
@@ -320,14 +425,10 @@ class ArgumentAgent(CommunicatingAgent):
         proposed_item: Item,
         premisse: CoupleValue,
     ) -> Tuple[Item, Value]:
-        proposed_value = premisse.value
         criterion_name = premisse.criterion_name
-        for item in self.list_items:
-            if item.get_name() == proposed_item.get_name():
-                continue
-            item_value = self.preferences.get_value(item, criterion_name)
-            if item_value.value > proposed_value.value:
-                return (item, item_value)
+        for item in self.__items_above[criterion_name][premisse.value.value]:
+            if item.get_name() != proposed_item.get_name():
+                return (item, self.preferences.get_value(item, criterion_name))
         return None
 
     def has_bad_evaluation(self, item: Item, premisse: CoupleValue):
@@ -337,9 +438,9 @@ class ArgumentAgent(CommunicatingAgent):
         return None
 
     def bad_evaluation_other_criterion(self, item: Item, premisse: CoupleValue):
-        for criterion in self.preferences.get_criterion_name_list():
-            if premisse.criterion_name == criterion:
-                break
+        criterion_names = self.preferences.get_criterion_name_list()
+        rank = self.preferences.get_criterion_rank(premisse.criterion_name)
+        for criterion in criterion_names if rank is None else criterion_names[:rank]:
             item_value = self.preferences.get_value(item, criterion)
             if item_value.value < premisse.value.value:
                 return (criterion, item_value)
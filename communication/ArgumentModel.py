@@ -1,14 +1,27 @@
 import copy
+from typing import Dict, List, Optional, Sequence
 
 from ArgumentAgent import ArgumentAgent
+from checkpoint.Checkpoint import (
+    read_checkpoint,
+    restore_checkpoint,
+    save_checkpoint,
+)
+from conversational_model.Behavior import Behavior
+from conversational_model.ConversationTable import ConversationTable
 from mesa import DataCollector, Model
+from memoization.ConversationCache import ConversationCache
 from mesa.time import RandomActivation
 from message.MessageService import MessageService
+from metrics.MetricsExporter import MetricsExporter, RunMetrics
 from preferences.ItemFactory import ItemCreatorCSV
-from StandardAgentsBehavior import (
-    standard_agent_decision_builder,
-    standard_agent_message_builder,
-)
+from preferences.PopulationProfiles import PopulationProfiles
+from preferences.ScoreMatrix import ScoreMatrix
+from profiling.Profiler import Profiler
+from rng.RandomStream import RandomStream
+from StandardAgentsBehavior import standard_behavior
+from topology.Topology import Topology
+from tracing.MessageTrace import MessageTrace
 
 
 class ArgumentModel(Model):
@@ -22,19 +35,91 @@ class ArgumentModel(Model):
 
     """
 
-    def __init__(self, num_agents: int = 2, verbose: bool = False):
+    def __init__(
+        self,
+        num_agents: int = 2,
+        verbose: bool = False,
+        profile: bool = False,
+        profile_phase: Optional[str] = None,
+        trace_path: Optional[str] = None,
+        trace_level: int = MessageTrace.MESSAGES,
+        seed: Optional[int] = None,
+        checkpoint: Optional[str] = None,
+        behavior: Optional[Behavior] = None,
+        argument_budget: Optional[int] = None,
+        topology: Optional[Topology] = None,
+        deterministic: bool = False,
+        conversation_cache: Optional[ConversationCache] = None,
+        profiles: Optional[PopulationProfiles | str] = None,
+        max_conversations: Optional[int] = None,
+        metrics_port: Optional[int] = None,
+        metrics_path: Optional[str] = None,
+        metrics_interval: float = 1.0,
+    ):
         """
         Initializes a new ArgumentModel object.
 
         Args:
             num_agents (int): The number of agents in the simulation. Default value is 2
+            profile (bool): Measures the time spent in each phase of a step.
+            profile_phase (str): Also collects cProfile statistics for this phase
+            (see Profiler.PHASES). Implies profile.
+            trace_path (str): Records every message sent in this binary trace file.
+            trace_level (int): MessageTrace.EVENTS also logs FSM transitions and
+            generated preferences next to the trace, instead of printing them.
+            seed (int): Seeds the activation order and one independent random stream
+            per agent, so that runs with the same seed are identical.
+            checkpoint (str): Resumes the run saved in this checkpoint file, in
+            place of creating a population; num_agents and seed are then ignored.
+            It must be resumed with the deterministic and max_conversations
+            settings it was run with, ValueError being raised otherwise.
+            behavior (Behavior): The handlers deciding and building the messages of
+            the agents, StandardAgentsBehavior.standard_behavior by default.
+            argument_budget (int): The number of arguments each agent keeps for its
+            closed conversations, the oldest being evicted first. No limit by
+            default.
+            topology (Topology): The interaction graph, agents only opening
+            conversations with their neighbours. Every pair of agents may converse
+            by default. A checkpoint must be resumed with the topology it was run
+            with.
+            deterministic (bool): Breaks the ties between preferred items by the
+            order of the items instead of at random.
+            conversation_cache (ConversationCache): Resolves each conversation at
+            once when it is opened, looking its outcome up in this cache, which may
+            be shared with other models, instead of exchanging messages over the
+            following steps. Only supported with the standard behavior.
+            profiles (PopulationProfiles | str): Gives the agents these preferences,
+            or those of this profiles file, in place of generating them; num_agents
+            is then ignored. The file is memory-mapped, each agent reading its own
+            record.
+            max_conversations (int): The number of conversations under way each
+            agent keeps, opening new ones with different partners at each step
+            while it has fewer, so that it negotiates with several partners at
+            once. Conversations opened by its partners count, and may take it
+            above. By default each agent opens one conversation per step.
+            metrics_port (int): Serves the live metrics of the run in the
+            Prometheus text format on http://127.0.0.1:metrics_port/metrics.
+            metrics_path (str): Rewrites the live metrics of the run as JSON to
+            this file.
+            metrics_interval (float): The time between two samples of the live
+            metrics, in seconds.
 
         Attributes:
             schedule (RandomActivation): A scheduler that runs the agents in
             a random order.
-            __messages_service (MessageService): A service that manages message
+            message_service (MessageService): A service that manages message
             passing between agents.
             current_id (int): A counter that keeps track of the current agent id.
+            conversations (ConversationTable): The state of the conversation of
+            every pair of agents, or of every pair of neighbours.
+            topology (Topology): The interaction graph, None when every pair of
+            agents may converse.
+            profiler (Profiler): The phase profiler, None when profiling is off.
+            trace (MessageTrace): The message trace, None when tracing is off.
+            metrics (RunMetrics): The counters of the run, None when the live
+            metrics are off.
+            metrics_exporter (MetricsExporter): The live metrics publisher, None
+            when the live metrics are off.
 
         Notes:
             The ArgumentModel assumes that an ItemCreator_CSV class has been defined
@@ -42,24 +127,96 @@ class ArgumentModel(Model):
             that returns a tuple of items_list and map_item_criterion.
         """
 
-        self.schedule = RandomActivation(self)
+        self.reset_randomizer(seed)
+        self.behavior = behavior if behavior is not None else standard_behavior
+        if conversation_cache is not None and self.behavior is not standard_behavior:
+            raise ValueError(
+                "Conversations are only memoized with the standard behavior"
+            )
+        if max_conversations is not None and max_conversations < 1:
+            raise ValueError("Agents must keep at least one conversation under way")
+        self.deterministic = deterministic
+        self.max_conversations = max_conversations
+        self.conversation_cache = conversation_cache
+        self.argument_budget = argument_budget
+        self.schedule = self.new_schedule()
         self.verbose = verbose
-        self.__messages_service = MessageService(self.schedule, verbose=self.verbose)
-
-        item_creator = ItemCreatorCSV()
-        items_list, map_item_criterion = item_creator.create()
-
-        self.current_id = 0
-        for i in range(num_agents):
-            new_agent = self.__create_agent()
-            new_agent.generate_preferences(
-                copy.deepcopy(items_list),
-                copy.deepcopy(map_item_criterion),
-                verbose=0,
+        self.profiler: Optional[Profiler] = None
+        if profile or profile_phase is not None:
+            self.profiler = Profiler(cprofile_phase=profile_phase)
+        self.message_service = self.new_message_service()
+        self.message_service.profiler = self.profiler
+
+        state = None
+        if checkpoint is not None:
+            state = read_checkpoint(checkpoint)
+            items_list = state["items"]
+            num_agents = len(state["meta"]["agents"])
+        elif profiles is not None:
+            if not isinstance(profiles, PopulationProfiles):
+                profiles = PopulationProfiles.load(profiles)
+            items_list = profiles.items
+            num_agents = len(profiles)
+        else:
+            item_creator = ItemCreatorCSV()
+            items_list, map_item_criterion = item_creator.create()
+
+        if topology is not None and topology.num_agents != num_agents:
+            raise ValueError(
+                f"The topology joins {topology.num_agents} agents, not {num_agents}"
+            )
+        self.topology = topology
+        self.conversations = self.new_conversation_table(num_agents, topology)
+        indices = self.agent_indices(num_agents)
+        agents = [
+            self.__create_agent(idx, rng)
+            for idx, rng in zip(indices, RandomStream.spawn(seed, num_agents, indices))
+        ]
+        self.current_id = num_agents
+
+        self.trace: Optional[MessageTrace] = None
+        if trace_path is not None:
+            self.trace = MessageTrace(
+                trace_path,
+                [agent.get_name() for agent in agents],
+                items_list,
+                level=trace_level,
+            )
+            self.message_service.trace = self.trace
+            self.conversations.trace = self.trace
+
+        if state is not None:
+            restore_checkpoint(self, agents, state)
+        elif profiles is not None:
+            for idx, new_agent in zip(indices, agents):
+                new_agent.set_preferences(
+                    items_list, *profiles.get_agent_preferences(idx)
+                )
+                self.schedule.add(new_agent)
+        else:
+            for new_agent in agents:
+                new_agent.generate_preferences(
+                    copy.deepcopy(items_list),
+                    copy.deepcopy(map_item_criterion),
+                    verbose=0,
+                )
+                self.schedule.add(new_agent)
+
+        self.metrics: Optional[RunMetrics] = None
+        self.metrics_exporter: Optional[MetricsExporter] = None
+        if metrics_port is not None or metrics_path is not None:
+            self.metrics = RunMetrics()
+            self.message_service.metrics = self.metrics
+            self.metrics_exporter = MetricsExporter(
+                self,
+                self.metrics,
+                interval=metrics_interval,
+                path=metrics_path,
+                port=metrics_port,
             )
-            self.schedule.add(new_agent)
 
         self.running = True
+        self.__score_matrix: Optional[ScoreMatrix] = None
 
         self.datacollector = DataCollector(
             model_reporters={
@@ -76,24 +233,116 @@ class ArgumentModel(Model):
             },
         )
 
-    def __create_agent(self) -> ArgumentAgent:
-        # Creates a new agent and returns it.
+        self.__dispatch_messages = self.message_service.dispatch_messages
+        self.__collect = self.datacollector.collect
+        if self.profiler is not None:
+            self.__dispatch_messages = self.profiler.wrap(
+                "dispatch_messages",
+                self.__dispatch_messages,
+            )
+            self.__collect = self.profiler.wrap("collect", self.__collect)
+
+    def new_schedule(self) -> RandomActivation:
+        # Creates the scheduler activating the agents at each step.
+        return RandomActivation(self)
+
+    def new_message_service(self) -> MessageService:
+        # Creates the service the agents send their messages through.
+        return MessageService(self.schedule, verbose=self.verbose)
+
+    def new_conversation_table(
+        self,
+        num_agents: int,
+        topology: Optional[Topology],
+    ) -> ConversationTable:
+        # Creates the table of the conversations between the agents.
+        return ConversationTable(num_agents, topology=topology)
+
+    def agent_indices(self, num_agents: int) -> Sequence[int]:
+        # The indices of the agents the model creates and steps: all of them.
+        return range(num_agents)
+
+    @staticmethod
+    def agent_name(idx: int) -> str:
+        """Return the name of the agent of index idx."""
+        return "Agent " + str(idx + 1)
+
+    def __create_agent(self, idx: int, rng: RandomStream) -> ArgumentAgent:
+        # Creates the agent of index idx and returns it.
         return ArgumentAgent(
-            self.next_id(),
+            idx + 1,
             self,
-            "Agent " + str(self.current_id),
-            standard_agent_decision_builder,
-            standard_agent_message_builder,
+            self.agent_name(idx),
+            self.behavior.decide,
+            self.behavior.build_message,
             self.verbose,
+            rng=rng,
         )
 
     def step(self):
         # Runs one step of the simulation.
-        self.__messages_service.dispatch_messages()
-        self.datacollector.collect(self)
+        if self.profiler is not None:
+            self.profiler.begin_step()
+        self.__dispatch_messages()
+        self.__collect(self)
         self.schedule.step()
+        if self.metrics is not None:
+            self.metrics.steps += 1
 
-    def run_n_steps(self, n: int):
-        # Runs n steps of the simulation.
+    def run_n_steps(
+        self,
+        n: int,
+        checkpoint_every: Optional[int] = None,
+        checkpoint_path: Optional[str] = None,
+    ):
+        # Runs n steps of the simulation, saving a checkpoint to checkpoint_path
+        # every checkpoint_every steps.
         for _ in range(n):
             self.step()
+            if checkpoint_every and self.schedule.steps % checkpoint_every == 0:
+                self.save_checkpoint(checkpoint_path)
+
+    def save_checkpoint(self, path: str):
+        # Saves the state of the run, to be resumed with ArgumentModel(checkpoint=path).
+        save_checkpoint(self, path)
+
+    def save_profiles(self, path: str):
+        # Saves the preferences of the agents, to be given to
+        # ArgumentModel(profiles=path).
+        PopulationProfiles.from_agents(list(self.schedule.agent_buffer())).save(path)
+
+    def get_agreed_items(self) -> Dict[str, Dict[str, List[str]]]:
+        """Returns the items each agent agreed on, per other agent."""
+        return {
+            agent.get_name(): agent.agreed_items
+            for agent in self.schedule.agent_buffer()
+        }
+
+    def get_score_matrix(self) -> ScoreMatrix:
+        """Returns the score of every item for every agent, computed on first use
+        and kept for the run."""
+        if self.__score_matrix is None:
+            agents = list(self.schedule.agent_buffer())
+            self.__score_matrix = ScoreMatrix.from_preferences(
+                [agent.get_name() for agent in agents],
+                [agent.preferences for agent in agents],
+                agents[0].list_items if agents else [],
+            )
+        return self.__score_matrix
+
+    def close_trace(self):
+        # Writes the buffered trace records and stops the trace writer thread.
+        if self.trace is not None:
+            self.trace.close()
+
+    def close_metrics(self):
+        # Publishes the last metrics and stops the metrics exporter.
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.close()
+
+    def get_profile_report(self) -> Optional[dict]:
+        """Returns the per-phase profile of the steps run so far, or None when the
+        model was created without profiling."""
+        if self.profiler is None:
+            return None
+        return self.profiler.report()
@@ -1,150 +1,207 @@
-from typing import List
+from typing import List, Optional
 
-import numpy as np
-from agent.CommunicatingAgent import CommunicatingAgent
 from ArgumentAgent import ArgumentAgent, Argumentation
 from arguments.Argument import Argument
+from conversational_model.Behavior import Behavior
+from conversational_model.TransitionContext import TransitionContext
 from message.Message import Message
 from message.MessagePerformative import MessagePerformative
 from preferences.Item import Item
 from preferences.Preferences import Preferences
 
+standard_behavior = Behavior("standard")
+"""The behavior of the agents of ArgumentModel.
+
+To change what an agent does for a performative <PERFORMATIVE>, one registers a
+handler on a copy of the behavior, and gives it to the model.
+Practical example:
+
+    >>> behavior = standard_behavior.copy("stubborn")
+    >>> @behavior.on_decision(MessagePerformative.PROPOSE)
+    ... def never_accept(agent, preferences, input, current_state, next_states,
+    ...                  context):
+    ...     return MessagePerformative.ASK_WHY
+    >>> model = ArgumentModel(behavior=behavior)
+
+Message handlers take:
+    agent (ArgumentAgent): The agent for which the message is being built.
+    preferences (Preferences): The preferences of the agent.
+    input (Message): The input message received by the agent.
+    next_state (MessagePerformative): The next state the agent is transitioning.
+    context (TransitionContext): What the decision handler computed for this
+    transition, reused instead of being computed again.
+and return the message sent, or None.
+
+Decision handlers take:
+    agent (ArgumentAgent): The argument agent object making the decision.
+    preferences (Preferences): preferences object.
+    input (Message): The message received by the agent from another agent.
+    current_state (MessagePerformative): The current state of the agent.
+    next_states (List[MessagePerformative]): A list of the possible next states.
+    context (TransitionContext): Keeps the item to propose and the argument to
+    send for the message builder.
+and return the next state the agent should transition to.
+"""
+
+
+@standard_behavior.on_message(MessagePerformative.IDLE, MessagePerformative.FINISHED)
+def build_no_message(
+    agent: ArgumentAgent,
+    preferences: Preferences,
+    input: Message,
+    next_state: MessagePerformative,
+    context: Optional[TransitionContext] = None,
+) -> Message:
+    """Nothing is sent when going back to IDLE or FINISHED."""
+    return None
+
+
+@standard_behavior.default_message
+def build_reply(
+    agent: ArgumentAgent,
+    preferences: Preferences,
+    input: Message,
+    next_state: MessagePerformative,
+    context: Optional[TransitionContext] = None,
+) -> Message:
+    """Answers the sender with the content of its message."""
+    exp = input.get_dest()
+    dest = input.get_exp()
+    content = input.get_content()
+    message = Message(exp, dest, next_state, content)
+    agent.send_message(message)
+
+    return message
+
+
+@standard_behavior.on_message(MessagePerformative.COMMIT, MessagePerformative.ACK)
+def build_commitment(
+    agent: ArgumentAgent,
+    preferences: Preferences,
+    input: Message,
+    next_state: MessagePerformative,
+    context: Optional[TransitionContext] = None,
+) -> Message:
+    """Records the item agreed on, then answers the sender."""
+    exp = input.get_exp()
+    item_name = get_item_name(input)
+
+    if exp not in agent.agreed_items:
+        agent.agreed_items[exp] = []
+    if item_name not in agent.agreed_items[exp]:
+        agent.agreed_items[exp].append(item_name)
+
+    return build_reply(agent, preferences, input, next_state, context)
+
 
-def standard_agent_message_builder(
+@standard_behavior.on_message(MessagePerformative.ARGUE)
+def build_argue(
     agent: ArgumentAgent,
     preferences: Preferences,
     input: Message,
     next_state: MessagePerformative,
+    context: Optional[TransitionContext] = None,
 ) -> Message:
-    """Builds a message for the given agent with the given input and next state.
-
-    To build a message for a performative <PERFORMATIVE>,
-    one simply needs to create an IF statement for the given performative
-    Practical example:
-
-        >>> if next_state == MessagePerformative.ARGUE:
-        ...    (do something on COMMIT)
-        ...    message = Message(agent, next_state, argument)
-        >>> return message
-
-    Args:
-        agent (ArgumentAgent): The agent for which the message is being built.
-        preferences (Preferences): The preferences of the agent.
-        input (Message): The input message received by the agent.
-        next_state (MessagePerformative): The next state the agent is transitioning.
-
-        Returns:
-            Message: The message for the given agent with the given input and next state
-    """
-
-    if (
-        next_state == MessagePerformative.IDLE
-        or next_state == MessagePerformative.FINISHED
-    ):
-        return None
-
-    if (
-        next_state == MessagePerformative.COMMIT
-        or next_state == MessagePerformative.ACK
-    ):
-        content: Argument | Item | str = input.get_content()
-        exp = input.get_exp()
-        item_name = get_item_name(input)
-
-        if exp not in agent.agreed_items:
-            agent.agreed_items[exp] = []
-        if item_name not in agent.agreed_items[exp]:
-            agent.agreed_items[exp].append(item_name)
-
-    if next_state == MessagePerformative.ARGUE:
-        item_name = get_item_name(input)
-        proposed_argument = input.get_content()
+    """Answers the argument received with the one chosen by the decision."""
+    proposed_argument = input.get_content()
+    if context is not None and context.argument is not None:
+        argument = context.argument
+    else:
         argument = agent.parse_argument(proposed_argument)
-        if input.get_exp() not in agent.argumentations:
-            agent.argumentations[input.get_exp()] = Argumentation(
-                agent.get_name(),
-                input.get_exp(),
-            )
-
-        agent.argumentations[input.get_exp()].add_argument(argument)
-
-        argument.set_parent(proposed_argument)
-        message = Message(agent.get_name(), input.get_exp(), next_state, argument)
-        agent.send_message(message)
-        return message
-
-    if next_state == MessagePerformative.BECAUSE:
-        item = input.get_content()
-        if input.get_exp() not in agent.argumentations:
-            agent.argumentations[input.get_exp()] = Argumentation(
-                agent.get_name(),
-                input.get_exp(),
-            )
-        argument = agent.support_proposal(item, input.get_exp())
-        agent.argumentations[input.get_exp()].add_argument(argument)
-        argument.set_parent(None)
-        message = Message(agent.get_name(), input.get_exp(), next_state, argument)
-        agent.send_message(message)
-        return message
-
-    if next_state == MessagePerformative.PROPOSE:
-        chosen_agent_name = input.get_dest()
-        already_agreed: List[str] = []
-        if chosen_agent_name in agent.agreed_items:
-            already_agreed = agent.agreed_items[chosen_agent_name]
-
-        already_proposed = []
-        if chosen_agent_name in agent.proposed_items:
-            already_proposed = agent.proposed_items[chosen_agent_name]
-
-        available_proposals = [
-            x
-            for x in agent.list_items
-            if x.get_name() not in already_agreed + already_proposed
-        ]
-        item = preferences.most_preferred(available_proposals)
-        if chosen_agent_name not in agent.proposed_items:
-            agent.proposed_items[chosen_agent_name] = []
-        agent.proposed_items[chosen_agent_name].append(item.get_name())
-
-        chosen_agent: CommunicatingAgent = [
-            x for x in agent.model.schedule.agents if x.get_name() == chosen_agent_name
-        ][0]
-        message = Message(
+    if input.get_exp() not in agent.argumentations:
+        agent.argumentations[input.get_exp()] = Argumentation(
             agent.get_name(),
-            chosen_agent.get_name(),
-            next_state,
-            item.get_name(),
+            input.get_exp(),
         )
-        agent.send_message(message)
-        return message
-
-    if next_state == MessagePerformative.ACCEPT:
-        item_name = get_item_name(input)
-
-        exp = input.get_dest()
-        dest = input.get_exp()
-        message = Message(exp, dest, next_state, item_name)
-        agent.send_message(message)
-        return message
-
-    if next_state == MessagePerformative.QUERY_REF:
-        item_name = get_item_name(input)
-        exp = input.get_dest()
-        dest = input.get_exp()
-        message = Message(exp, dest, next_state, item_name)
-        agent.send_message(message)
-        return message
 
+    agent.argumentations[input.get_exp()].add_argument(argument)
+
+    argument.set_parent(proposed_argument)
+    message = Message(agent.get_name(), input.get_exp(), next_state, argument)
+    agent.send_message(message)
+    return message
+
+
+@standard_behavior.on_message(MessagePerformative.BECAUSE)
+def build_because(
+    agent: ArgumentAgent,
+    preferences: Preferences,
+    input: Message,
+    next_state: MessagePerformative,
+    context: Optional[TransitionContext] = None,
+) -> Message:
+    """Supports the item proposed with the best argument not used yet."""
+    item = input.get_content()
+    if input.get_exp() not in agent.argumentations:
+        agent.argumentations[input.get_exp()] = Argumentation(
+            agent.get_name(),
+            input.get_exp(),
+        )
+    argument = agent.support_proposal(item, input.get_exp())
+    agent.argumentations[input.get_exp()].add_argument(argument)
+    argument.set_parent(None)
+    message = Message(agent.get_name(), input.get_exp(), next_state, argument)
+    agent.send_message(message)
+    return message
+
+
+@standard_behavior.on_message(MessagePerformative.PROPOSE)
+def build_propose(
+    agent: ArgumentAgent,
+    preferences: Preferences,
+    input: Message,
+    next_state: MessagePerformative,
+    context: Optional[TransitionContext] = None,
+) -> Message:
+    """Proposes the item chosen by the decision."""
+    chosen_agent_name = input.get_dest()
+    if context is not None and context.item is not None:
+        item = context.item
+    else:
+        item = preferences.most_preferred(
+            available_proposals(agent, chosen_agent_name),
+            agent.rng,
+            deterministic=agent.deterministic,
+        )
+    if chosen_agent_name not in agent.proposed_items:
+        agent.proposed_items[chosen_agent_name] = []
+    agent.proposed_items[chosen_agent_name].append(item.get_name())
+
+    message = Message(
+        agent.get_name(),
+        chosen_agent_name,
+        next_state,
+        item.get_name(),
+    )
+    agent.send_message(message)
+    return message
+
+
+@standard_behavior.on_message(MessagePerformative.ACCEPT, MessagePerformative.QUERY_REF)
+def build_item_reply(
+    agent: ArgumentAgent,
+    preferences: Preferences,
+    input: Message,
+    next_state: MessagePerformative,
+    context: Optional[TransitionContext] = None,
+) -> Message:
+    """Answers the sender with the name of the item discussed."""
+    item_name = get_item_name(input)
     exp = input.get_dest()
     dest = input.get_exp()
-    content = input.get_content()
-    message = Message(exp, dest, next_state, content)
+    message = Message(exp, dest, next_state, item_name)
     agent.send_message(message)
-
     return message
 
 
+def available_proposals(agent: ArgumentAgent, other_agent_name: str) -> List[Item]:
+    """Returns the items agent has neither agreed on nor proposed with the other
+    agent."""
+    excluded = set(agent.agreed_items.get(other_agent_name, ()))
+    excluded.update(agent.proposed_items.get(other_agent_name, ()))
+    return [x for x in agent.list_items if x.get_name() not in excluded]
+
+
 def get_item_name(input: Message) -> str:
     item_name: Argument | Item | str = input.get_content()
     if isinstance(item_name, Argument):
@@ -156,74 +213,88 @@ def get_item_name(input: Message) -> str:
     return item_name
 
 
-def standard_agent_decision_builder(
+@standard_behavior.on_decision(MessagePerformative.IDLE)
+def decide_idle(
     agent: ArgumentAgent,
     preferences: Preferences,
     input: Message,
     current_state: MessagePerformative,
     next_states: List[MessagePerformative],
+    context: Optional[TransitionContext] = None,
 ) -> MessagePerformative:
-    """This method is responsible for making the agent's decision
-    based on its current state, its preferences, and the message received.
-    The method returns the next state the agent should transition to.
-
-    Args:
-        agent (ArgumentAgent): The argument agent object making the decision.
-        preferences (Preferences): preferences object.
-        input (Message): The message received by the agent from another agent.
-        current_state (MessagePerformative): The current state of the agent.
-        next_states (List[MessagePerformative]): A list of the possible next states.
-
-    Returns:
-        MessagePerformative: The next state the agent should transition to.
-    """
-    if current_state == MessagePerformative.IDLE:
-        chosen_agent_name = input.get_dest()
-        already_agreed: List[str] = []
-        already_proposed: List[str] = []
-        if chosen_agent_name in agent.agreed_items:
-            already_agreed = agent.agreed_items[chosen_agent_name]
-        if chosen_agent_name in agent.proposed_items:
-            already_proposed = agent.proposed_items[chosen_agent_name]
-
-        available_proposals = [
-            x
-            for x in agent.list_items
-            if x.get_name() not in already_agreed + already_proposed
-        ]
-        if len(available_proposals) == 0:
-            return MessagePerformative.IDLE
-
-        item = agent.preferences.most_preferred(available_proposals)
-        argument = agent.support_proposal(item.get_name(), input.get_dest())
-        if not argument:
-            return MessagePerformative.IDLE
-
-        return np.random.choice(next_states, p=[0.5, 0.5])
-
-    if current_state == MessagePerformative.PROPOSE:
-        item_name = get_item_name(input)
-        item = [x for x in agent.list_items if x.get_name() == item_name][0]
-
-        if preferences.is_item_among_top_10_percent(item, agent.list_items):
-            return MessagePerformative.ACCEPT
+    """Proposes, or not, the preferred item that can be supported."""
+    proposals = available_proposals(agent, input.get_dest())
+    if len(proposals) == 0:
+        return MessagePerformative.IDLE
+
+    item = agent.preferences.most_preferred(
+        proposals,
+        agent.rng,
+        deterministic=agent.deterministic,
+    )
+    argument = agent.support_proposal(item.get_name(), input.get_dest())
+    if not argument:
+        return MessagePerformative.IDLE
+
+    if context is not None:
+        context.item = item
+    return agent.rng.choice(next_states)
+
+
+@standard_behavior.on_decision(MessagePerformative.PROPOSE)
+def decide_propose(
+    agent: ArgumentAgent,
+    preferences: Preferences,
+    input: Message,
+    current_state: MessagePerformative,
+    next_states: List[MessagePerformative],
+    context: Optional[TransitionContext] = None,
+) -> MessagePerformative:
+    """Accepts an item among the top 10 percent, asks why otherwise."""
+    item_name = get_item_name(input)
+    item = agent.get_item(item_name)
 
-        return MessagePerformative.ASK_WHY
+    if preferences.is_item_among_top_10_percent(item, agent.list_items):
+        return MessagePerformative.ACCEPT
 
-    if current_state == MessagePerformative.ACCEPT:
-        return MessagePerformative.COMMIT
+    return MessagePerformative.ASK_WHY
+
+
+@standard_behavior.on_decision(MessagePerformative.ACCEPT)
+def decide_accept(
+    agent: ArgumentAgent,
+    preferences: Preferences,
+    input: Message,
+    current_state: MessagePerformative,
+    next_states: List[MessagePerformative],
+    context: Optional[TransitionContext] = None,
+) -> MessagePerformative:
+    """Commits to an accepted item."""
+    return MessagePerformative.COMMIT
+
+
+@standard_behavior.on_decision(MessagePerformative.ARGUE, MessagePerformative.BECAUSE)
+def decide_argue(
+    agent: ArgumentAgent,
+    preferences: Preferences,
+    input: Message,
+    current_state: MessagePerformative,
+    next_states: List[MessagePerformative],
+    context: Optional[TransitionContext] = None,
+) -> MessagePerformative:
+    """Answers an argument, or gives up when there is no counter-argument."""
+    proposed_argument: Argument = input.get_content()
+    argument = agent.parse_argument(proposed_argument)
+    if context is not None:
+        context.argument = argument
+    if argument is None:
+        if proposed_argument.decision:
+            return MessagePerformative.ACCEPT
+        else:
+            return MessagePerformative.QUERY_REF
+
+    return MessagePerformative.ARGUE
 
-    if (
-        current_state == MessagePerformative.ARGUE
-        or current_state == MessagePerformative.BECAUSE
-    ):
-        item_name = get_item_name(input)
-        proposed_argument: Argument = input.get_content()
-        argument = agent.parse_argument(proposed_argument)
-        if argument is None:
-            if proposed_argument.decision:
-                return MessagePerformative.ACCEPT
-            else:
-                return MessagePerformative.QUERY_REF
 
-        return MessagePerformative.ARGUE
+standard_agent_message_builder = standard_behavior.build_message
+standard_agent_decision_builder = standard_behavior.decide
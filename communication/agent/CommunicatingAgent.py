@@ -22,7 +22,9 @@ class CommunicatingAgent(Agent):
         super().__init__(unique_id, model)
         self.__name = name
         self.__mailbox = Mailbox()
-        self.__messages_service = MessageService.get_instance()
+        self.__messages_service = getattr(model, "message_service", None)
+        if self.__messages_service is None:
+            self.__messages_service = MessageService.get_instance()
 
     def step(self):
         """The step methods of the agent called by the scheduler at each time tick."""
@@ -44,6 +46,10 @@ class CommunicatingAgent(Agent):
         """Return all the unread messages."""
         return self.__mailbox.get_new_messages()
 
+    def get_mailbox(self):
+        """Return the mailbox of the communicating agent."""
+        return self.__mailbox
+
     def get_messages(self):
         """Return all the received messages."""
         return self.__mailbox.get_messages()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+def commitment_matrix(
+    agreed_items: Dict[str, Dict[str, List[str]]],
+    agent_names: List[str],
+    item_names: List[str],
+) -> np.ndarray:
+    """Return which item (columns) each agent (rows) committed to, with any other
+    agent, from the agreed items of a run, per agent and per other agent."""
+    agent_ids = {name: idx for idx, name in enumerate(agent_names)}
+    item_ids = {name: idx for idx, name in enumerate(item_names)}
+    rows, columns = [], []
+    for agent, agreed in agreed_items.items():
+        for items in agreed.values():
+            rows.extend([agent_ids[agent]] * len(items))
+            columns.extend(item_ids[item] for item in items)
+    matrix = np.zeros((len(agent_names), len(item_names)), dtype=bool)
+    matrix[rows, columns] = True
+    return matrix
+
+
+class CommitmentAnalysis:
+    """CommitmentAnalysis class.
+    Class implementing the analysis of the commitments of a batch of runs, over the
+    same items. Each run is a boolean agents x items commitment matrix; the runs are
+    stacked into a runs x agents x items array padded with agents committing to
+    nothing, so that every statistic is one reduction over the batch:
+        - consensus: the items every agent of a run committed to,
+        - acceptance: the number of agents of a run committing to each item,
+        - coverage: the share of the items each agent of a run committed to.
+
+    attr:
+        item_names: the item names, indexed like the columns (list)
+        labels: a label for each run, such as its number of agents (list)
+    """
+
+    def __init__(self, item_names: List[str]):
+        """Create a new empty CommitmentAnalysis."""
+        self.item_names = list(item_names)
+        self.labels: List[int] = []
+        self.__matrices: List[np.ndarray] = []
+        self.__batch: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.__matrices)
+
+    def add_run(self, matrix: np.ndarray, label: Optional[int] = None) -> None:
+        """Add the commitment matrix of a run, labelled by default by its number of
+        agents."""
+        self.__matrices.append(np.asarray(matrix, dtype=bool))
+        self.labels.append(len(matrix) if label is None else label)
+        self.__batch = None
+
+    def add_model(self, model, label: Optional[int] = None) -> None:
+        """Add the commitments of a model that was run."""
+        agreed_items = model.get_agreed_items()
+        self.add_run(
+            commitment_matrix(agreed_items, list(agreed_items), self.item_names),
+            label,
+        )
+
+    @property
+    def agent_counts(self) -> np.ndarray:
+        """The number of agents of each run."""
+        return np.array([len(matrix) for matrix in self.__matrices], dtype=np.int64)
+
+    @property
+    def commitments(self) -> np.ndarray:
+        """The runs x agents x items commitments, padded with agents committing to
+        nothing."""
+        if self.__batch is None:
+            counts = self.agent_counts
+            self.__batch = np.zeros(
+                (len(counts), counts.max(initial=0), len(self.item_names)),
+                dtype=bool,
+            )
+            for run, matrix in enumerate(self.__matrices):
+                self.__batch[run, : len(matrix)] = matrix
+        return self.__batch
+
+    def agent_mask(self) -> np.ndarray:
+        """Return which agents of the padded array are agents of their run."""
+        commitments = self.commitments
+        return np.arange(commitments.shape[1]) < self.agent_counts[:, None]
+
+    def consensus(self) -> np.ndarray:
+        """Return, for each run, which items every agent committed to."""
+        counts = self.acceptance()
+        return (counts == self.agent_counts[:, None]) & (self.agent_counts[:, None] > 0)
+
+    def acceptance(self) -> np.ndarray:
+        """Return, for each run, how many agents committed to each item."""
+        return self.commitments.sum(axis=1)
+
+    def coverage(self) -> np.ndarray:
+        """Return, for each run, the share of the items each agent committed to, NaN
+        for the padding agents."""
+        coverage = self.commitments.mean(axis=2)
+        coverage[~self.agent_mask()] = np.nan
+        return coverage
+
+    def summary(self) -> Dict[str, np.ndarray]:
+        """Return the statistics of every run, as arrays indexed by run."""
+        acceptance = self.acceptance()
+        consensus = self.consensus()
+        return {
+            "labels": np.array(self.labels),
+            "agent_counts": self.agent_counts,
+            "acceptance": acceptance,
+            "consensus": consensus,
+            "consensus_size": consensus.sum(axis=1),
+            "coverage": self.coverage(),
+            "mean_coverage": np.nanmean(self.coverage(), axis=1),
+        }
+
+    def save(self, path: str) -> None:
+        """Write the commitments and the statistics of every run to a numpy .npz
+        archive, the item names being stored as a JSON "meta" entry."""
+        meta = {"items": self.item_names}
+        path = Path(path)
+        partial = path.with_name(path.name + ".partial")
+        with open(partial, "wb") as results_file:
+            np.savez_compressed(
+                results_file,
+                meta=np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8),
+                commitments=self.commitments,
+                **self.summary(),
+            )
+        os.replace(partial, path)
+
+    @staticmethod
+    def load(path: str) -> "CommitmentAnalysis":
+        """Read the runs written by save."""
+        with np.load(path) as archive:
+            meta = json.loads(archive["meta"].tobytes().decode("utf-8"))
+            analysis = CommitmentAnalysis(meta["items"])
+            for commitments, count, label in zip(
+                archive["commitments"],
+                archive["agent_counts"].tolist(),
+                archive["labels"].tolist(),
+            ):
+                analysis.add_run(commitments[:count], label)
+        return analysis
+
+    def plot_histograms(self, directory: str = "images") -> List[str]:
+        """Draw, for each run, the number of agents committing to each item, and
+        return the image files written. Files are named after the run labels, and
+        also after the run indices when labels repeat."""
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+
+        unique_labels = len(set(self.labels)) == len(self.labels)
+        filenames = []
+        for run, (label, count, acceptance) in enumerate(
+            zip(
+                self.labels,
+                self.agent_counts.tolist(),
+                self.acceptance(),
+            )
+        ):
+            figure, axes = plt.subplots(figsize=(20, 5))
+            axes.bar(self.item_names, acceptance)
+            axes.axhline(y=count, color="r", linestyle="-", label="Number of agents")
+            axes.set_title("Histogram of all accepted items")
+            axes.set_xlabel("Item")
+            axes.set_ylabel("Frequency")
+            name = f"histogram_{label}" if unique_labels else f"histogram_{label}_{run}"
+            filename = str(Path(directory) / f"{name}.png")
+            figure.savefig(filename)
+            plt.close(figure)
+            filenames.append(filename)
+        return filenames
@@ -4,6 +4,7 @@ from arguments.Comparison import Comparison
 from arguments.CoupleValue import CoupleValue
 from preferences.Item import Item
 from preferences.Preferences import Preferences
+from preferences.CriterionName import CriterionName
 from preferences.Value import Value
 
 
@@ -69,6 +70,47 @@ class Argument:
             + "] "
         )
 
+    def to_key(self) -> int:
+        """Returns a compact integer encoding the decision and the premisses.
+
+        Bit 0 holds the decision, then 4-bit fields hold, shifted by one so that 0
+        means "absent", the criterion and value of the couple value premiss and the
+        best and worst criteria of the comparison premiss. The item is not part of
+        the key. Arguments built in this package have at most one premiss of each
+        kind.
+        """
+        if len(self.__couple_value_list) > 1 or len(self.__comparison_list) > 1:
+            raise ValueError("Only arguments with one premiss of each kind have a key")
+
+        key = int(self.decision)
+        if self.__couple_value_list:
+            couple_value = self.__couple_value_list[0]
+            key |= (couple_value.criterion_name.value + 1) << 1
+            key |= (couple_value.value.value + 1) << 5
+        if self.__comparison_list:
+            comparison = self.__comparison_list[0]
+            key |= (comparison.best_criterion_name.value + 1) << 9
+            key |= (comparison.worst_criterion_name.value + 1) << 13
+        return key
+
+    @staticmethod
+    def from_key(key: int, item: Item, agent_name: str) -> "Argument":
+        """Rebuilds an argument about item from the key returned by to_key."""
+        argument = Argument(bool(key & 1), item, agent_name)
+        criterion, value = (key >> 1) & 0xF, (key >> 5) & 0xF
+        if criterion:
+            argument.add_premiss_couple_values(
+                CriterionName(criterion - 1),
+                Value(value - 1),
+            )
+        best, worst = (key >> 9) & 0xF, (key >> 13) & 0xF
+        if best:
+            argument.add_premiss_comparison(
+                CriterionName(best - 1),
+                CriterionName(worst - 1),
+            )
+        return argument
+
     def add_premiss_comparison(self, criterion_name_1, criterion_name_2):
         """Adds a premiss comparison in the comparison list ."""
         self.__comparison_list.append(Comparison(criterion_name_1, criterion_name_2))
@@ -95,15 +137,10 @@ class Argument:
         : return : list of all premisses PRO an item ( sorted by order of importance
         based on agent's preferences )
         """
-        supporting_proposals = []
-        criterion_names = preferences.get_criterion_name_list()
-        for criterion_name in criterion_names:
-            value = preferences.get_value(item, criterion_name)
-
-            if value == Value.VERY_GOOD or value == Value.GOOD:
-                supporting_proposals.append(CoupleValue(criterion_name, value))
-
-        return supporting_proposals
+        return [
+            CoupleValue(criterion_name, value)
+            for criterion_name, value in preferences.get_supporting_premisses(item)
+        ]
 
     def list_attacking_proposal(
         self,
@@ -114,12 +151,7 @@ class Argument:
         : return : list of all premisses CON an item ( sorted by order of importance
         based on preferences )
         """
-        attacking_proposals = []
-        criterion_names = preferences.get_criterion_name_list()
-        for criterion_name in criterion_names:
-            value = preferences.get_value(item, criterion_name)
-
-            if value == Value.VERY_BAD or value == Value.BAD:
-                attacking_proposals.append(CoupleValue(criterion_name, value))
-
-        return attacking_proposals
+        return [
+            CoupleValue(criterion_name, value)
+            for criterion_name, value in preferences.get_attacking_premisses(item)
+        ]
@@ -0,0 +1,33 @@
+from typing import Dict, List, Tuple
+
+from arguments.Argument import Argument
+
+
+class Argumentation:
+    def __init__(self, agent_a, agent_b):
+        self.agent_a = agent_a
+        self.agent_b = agent_b
+        self.__arguments: Dict[Argument, None] = {}
+        self.__attacks: List[Tuple[Argument, Argument]] = []
+
+    def add_argument(self, argument: Argument):
+        self.__arguments.setdefault(argument)
+
+        if argument.get_parent() is not None:
+            self.__arguments.setdefault(argument.get_parent())
+            self.__attacks.append((argument, argument.get_parent()))
+
+    def all_arguments(self):
+        return self.__arguments.keys()
+
+    def get_attacks(self) -> List[Tuple[Argument, Argument]]:
+        return self.__attacks
+
+    def to_graph(self):
+        """Returns the argumentation as an undirected networkx graph."""
+        import networkx as nx
+
+        graph = nx.Graph()
+        graph.add_nodes_from(self.__arguments)
+        graph.add_edges_from(self.__attacks)
+        return graph
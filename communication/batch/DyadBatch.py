@@ -0,0 +1,572 @@
+#!/usr/bin/env python3
+import copy
+import random
+from math import ceil
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from analysis.CommitmentAnalysis import commitment_matrix
+from conversational_model.Protocol import Protocol
+from message.MessagePerformative import MessagePerformative
+from preferences.CriterionName import CriterionName
+from preferences.ItemFactory import ItemCreatorCSV
+from preferences.PreferenceModel import PreferenceModel
+from preferences.Value import Value
+from rng.RandomStream import RandomStream
+from StandardAgentsBehavior import standard_behavior
+
+# One message waiting in a mailbox: the performative value, the item index, and for
+# the arguments their decision, the criterion and value of their couple value
+# premiss, and the worst criterion of their comparison premiss (-1 if none).
+MESSAGE_DTYPE = np.dtype(
+    [
+        ("performative", "u1"),
+        ("item", "<i2"),
+        ("decision", "?"),
+        ("criterion", "i1"),
+        ("value", "i1"),
+        ("worst", "i1"),
+    ]
+)
+
+
+class VectorRandom:
+    """VectorRandom class.
+    Class implementing the draws of a DyadBatch with one numpy Generator, every
+    draw of a step being made for all the dyads at once.
+
+    attr:
+        generator: the underlying numpy Generator (np.random.Generator)
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        """Create a new VectorRandom."""
+        self.generator = np.random.default_rng(seed)
+
+    def first_sides(self, num_dyads: int) -> np.ndarray:
+        """Return the side activated first in each dyad."""
+        return self.generator.integers(0, 2, num_dyads)
+
+    def uniform(self, dyads: np.ndarray, sides: np.ndarray) -> np.ndarray:
+        """Return a uniform float in [0, 1) for each of the given agents."""
+        return self.generator.random(len(dyads))
+
+
+class ModelRandom:
+    """ModelRandom class.
+    Class implementing the draws of a DyadBatch as the two-agent ArgumentModels it
+    was built from would make them: the activation order is shuffled with a copy of
+    the random generator of each model, and each agent draws from a copy of its
+    RandomStream. Draws are made one agent at a time.
+
+    attr:
+        shufflers: the copy of the random generator of each model (list)
+        streams: the copy of the RandomStream of the two agents of each model (list)
+    """
+
+    def __init__(
+        self,
+        shufflers: List[random.Random],
+        streams: List[Tuple[RandomStream, RandomStream]],
+    ):
+        """Create a new ModelRandom."""
+        self.shufflers = shufflers
+        self.streams = streams
+
+    def first_sides(self, num_dyads: int) -> np.ndarray:
+        """Return the side activated first in each dyad."""
+        first = np.empty(num_dyads, dtype=np.int64)
+        for dyad, shuffler in enumerate(self.shufflers):
+            # RandomActivation shuffles a new list of the agent keys each step.
+            order = [0, 1]
+            shuffler.shuffle(order)
+            first[dyad] = order[0]
+        return first
+
+    def uniform(self, dyads: np.ndarray, sides: np.ndarray) -> np.ndarray:
+        """Return a uniform float in [0, 1) for each of the given agents."""
+        return np.array(
+            [
+                self.streams[dyad][side].random()
+                for dyad, side in zip(dyads.tolist(), sides.tolist())
+            ],
+            dtype=float,
+        )
+
+
+class DyadBatch:
+    """DyadBatch class.
+    Class implementing a batch of independent negotiations between two agents
+    following the protocol with the standard behavior, in structure of arrays: the
+    state of every dyad is held in arrays whose first two axes are the dyad and the
+    side, and each step runs the transitions of all the dyads as masked numpy
+    operations, the agents of a dyad being activated in random order as in
+    ArgumentModel, and messages being delivered instantly.
+
+    The preferences of the agents are given as the Value of every item on every
+    criterion, the criteria being indexed by CriterionName value, and as the order
+    of their criteria. Built from_models, the batch makes the draws the models would
+    make, so that the items agreed and proposed after n steps are those of the
+    models after n steps. Built by generate, the draws are vectorized.
+
+    The argument budget and the topology of ArgumentModel are not supported: every
+    argument used is remembered, and from_models refuses such models. It also
+    refuses models with another behavior, deterministic ties or a conversation
+    cache, ties being always drawn at random and conversations run message by
+    message.
+
+    attr:
+        item_names: the item names, indexed like the items (list)
+        values: the index in VALUES of the Value of each item on each criterion
+            for each agent (np.ndarray)
+        criterion_orders: the criteria of each agent, most important first
+            (np.ndarray)
+        scores: the score of each item for each agent (np.ndarray)
+        states: the state of each agent in its conversation (np.ndarray)
+        agreed: the items each agent agreed on (np.ndarray)
+        proposed: the items each agent proposed (np.ndarray)
+        used: the supporting arguments, by item and criterion, each agent used
+            (np.ndarray)
+        num_messages: the number of messages sent in each dyad (np.ndarray)
+        steps: the number of steps run (int)
+    """
+
+    def __init__(
+        self,
+        item_names: List[str],
+        values: np.ndarray,
+        criterion_orders: np.ndarray,
+        rng=None,
+        protocol: Optional[Protocol] = None,
+    ):
+        """Create a new DyadBatch from (dyads, 2, items, criteria) values and
+        (dyads, 2, criteria) criterion orders, drawing from rng, a VectorRandom by
+        default."""
+        self.item_names = list(item_names)
+        self.values = np.asarray(values, dtype=np.int8)
+        self.criterion_orders = np.asarray(criterion_orders, dtype=np.int64)
+        self.rng = rng if rng is not None else VectorRandom()
+        self.protocol = protocol if protocol is not None else Protocol.load()
+        num_dyads, _, num_items, num_criteria = self.values.shape
+
+        self.ranks = np.empty_like(self.criterion_orders)
+        np.put_along_axis(
+            self.ranks,
+            self.criterion_orders,
+            np.arange(self.criterion_orders.shape[-1]),
+            axis=-1,
+        )
+        weights = np.zeros((num_dyads, 2, num_criteria))
+        np.put_along_axis(
+            weights,
+            self.criterion_orders,
+            100 / 2.0 ** np.arange(self.criterion_orders.shape[-1]),
+            axis=-1,
+        )
+        self.scores = np.einsum("bsic,bsc->bsi", self.values.astype(float), weights)
+        # The score an item must reach to be among the top 10 percent.
+        self.__top_scores = np.sort(self.scores, axis=-1)[
+            ..., num_items - ceil(num_items / 10)
+        ]
+
+        self.states = np.full(
+            (num_dyads, 2), self.protocol.initial_state.value, dtype=np.uint8
+        )
+        self.agreed = np.zeros((num_dyads, 2, num_items), dtype=bool)
+        self.proposed = np.zeros((num_dyads, 2, num_items), dtype=bool)
+        self.used = np.zeros((num_dyads, 2, num_items, num_criteria), dtype=bool)
+        self.num_messages = np.zeros(num_dyads, dtype=np.int64)
+        self.steps = 0
+        self.__mailboxes = np.zeros((num_dyads, 2, 2), dtype=MESSAGE_DTYPE)
+        self.__mailbox_sizes = np.zeros((num_dyads, 2), dtype=np.int64)
+        self.__dyads = np.arange(num_dyads)
+        self.__opening_states = np.array(
+            [
+                state.value
+                for state in self.protocol.successor_table[
+                    self.protocol.initial_state.value
+                ]
+            ]
+        )
+        self.__handlers = [
+            (MessagePerformative.PROPOSE, self.__on_propose),
+            (MessagePerformative.ACCEPT, self.__on_accept),
+            (MessagePerformative.COMMIT, self.__on_commit),
+            (MessagePerformative.ACK, self.__on_close),
+            (MessagePerformative.QUERY_REF, self.__on_close),
+            (MessagePerformative.ASK_WHY, self.__on_ask_why),
+            (MessagePerformative.BECAUSE, self.__on_argument),
+            (MessagePerformative.ARGUE, self.__on_argument),
+        ]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @staticmethod
+    def from_models(models: Sequence) -> "DyadBatch":
+        """Return the batch of the two-agent ArgumentModels given, before they are
+        run: the agents have the same preferences, and the batch draws from copies
+        of the random generators of the models."""
+        values, orders, shufflers, streams = [], [], [], []
+        for model in models:
+            agents = list(model.schedule.agent_buffer())
+            if len(agents) != 2 or model.schedule.steps:
+                raise ValueError("Only two-agent models that were not run are batched")
+            if (
+                model.behavior is not standard_behavior
+                or model.deterministic
+                or model.conversation_cache is not None
+            ):
+                raise ValueError(
+                    "Only models drawing their ties at random and exchanging the "
+                    "messages of the standard behavior are batched"
+                )
+            if model.argument_budget is not None or model.topology is not None:
+                raise ValueError(
+                    "Models with an argument budget or a topology are not batched"
+                )
+            values.append(
+                [
+                    agent.preferences.get_value_matrix(agents[0].list_items)
+                    for agent in agents
+                ]
+            )
+            orders.append(
+                [
+                    [
+                        criterion.value
+                        for criterion in agent.preferences.get_criterion_name_list()
+                    ]
+                    for agent in agents
+                ]
+            )
+            shufflers.append(copy.deepcopy(model.random))
+            side_streams = []
+            for agent in agents:
+                stream = RandomStream(block_size=agent.rng.block_size)
+                stream.set_state(agent.rng.get_state())
+                side_streams.append(stream)
+            streams.append(tuple(side_streams))
+        item_names = (
+            [item.get_name() for item in agents[0].list_items] if models else []
+        )
+        return DyadBatch(
+            item_names,
+            np.array(values).reshape(len(models), 2, len(item_names), -1),
+            np.array(orders).reshape(len(models), 2, -1),
+            ModelRandom(shufflers, streams),
+        )
+
+    @staticmethod
+    def generate(
+        num_dyads: int,
+        seed: Optional[int] = None,
+        path: str = ".",
+        filename: str = "items.csv",
+    ) -> "DyadBatch":
+        """Return a batch of dyads whose preferences are drawn like those of
+        ArgumentModel, with a random criterion order and random interval profiles
+        per agent, all at once."""
+        rng = VectorRandom(seed)
+        items, map_item_criterion = ItemCreatorCSV(path, filename).create()
+        item_names = [item.get_name() for item in items]
+        criteria = [CriterionName[name] for name in map_item_criterion[item_names[0]]]
+        real_values = np.array(
+            [
+                [map_item_criterion[name][criterion.name] for criterion in criteria]
+                for name in item_names
+            ],
+            dtype=float,
+        )
+        num_thresholds = len(PreferenceModel.VALUES) - 1
+        thresholds = np.sort(
+            real_values.max(axis=0)[:, None]
+            * rng.generator.random((num_dyads, 2, len(criteria), num_thresholds)),
+            axis=-1,
+        )
+        # The number of thresholds below each value, as searchsorted on the left.
+        value_idx = (
+            thresholds[:, :, None, :, :] < real_values[None, None, :, :, None]
+        ).sum(axis=-1)
+        costs = [not CriterionName.is_positive_criterion(c) for c in criteria]
+        value_idx[..., costs] = num_thresholds - value_idx[..., costs]
+
+        values = np.zeros((num_dyads, 2, len(items), len(CriterionName)), np.int8)
+        values[..., [criterion.value for criterion in criteria]] = value_idx
+        orders = np.array([criterion.value for criterion in criteria])[
+            np.argsort(rng.generator.random((num_dyads, 2, len(criteria))), axis=-1)
+        ]
+        return DyadBatch(item_names, values, orders, rng)
+
+    def step(self):
+        # Activates the two agents of every dyad, in random order.
+        first = self.rng.first_sides(len(self))
+        for side in (first, 1 - first):
+            self.__activate(self.__dyads, side)
+        self.steps += 1
+
+    def run_n_steps(self, n: int):
+        # Runs n steps of every dyad.
+        for _ in range(n):
+            self.step()
+
+    def acceptance(self) -> np.ndarray:
+        """Return the share of the items each agent proposed that were agreed on,
+        NaN for the agents that proposed nothing."""
+        proposed = self.proposed.sum(axis=-1)
+        accepted = (self.proposed & self.agreed).sum(axis=-1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(proposed > 0, accepted / proposed, np.nan)
+
+    def mismatches(self, models: Sequence) -> np.ndarray:
+        """Return the indices of the dyads whose agreed items, proposed items or
+        conversation states differ from those of the models they were built from,
+        run for as many steps."""
+        mismatch = np.zeros(len(self), dtype=bool)
+        for dyad, model in enumerate(models):
+            agents = list(model.schedule.agent_buffer())
+            names = [agent.get_name() for agent in agents]
+            agreed = commitment_matrix(
+                {agent.get_name(): agent.agreed_items for agent in agents},
+                names,
+                self.item_names,
+            )
+            proposed = commitment_matrix(
+                {agent.get_name(): agent.proposed_items for agent in agents},
+                names,
+                self.item_names,
+            )
+            states = [
+                agent.conversations[other].current_state.value
+                for agent, other in zip(agents, reversed(names))
+            ]
+            mismatch[dyad] = (
+                not np.array_equal(agreed, self.agreed[dyad])
+                or not np.array_equal(proposed, self.proposed[dyad])
+                or states != self.states[dyad].tolist()
+            )
+        return np.flatnonzero(mismatch)
+
+    def __activate(self, dyads: np.ndarray, sides: np.ndarray):
+        # Lets one agent of each dyad answer its messages, then open a conversation.
+        mailboxes = self.__mailboxes[dyads, sides]
+        sizes = self.__mailbox_sizes[dyads, sides]
+        self.__mailbox_sizes[dyads, sides] = 0
+        for position in range(int(sizes.max(initial=0))):
+            waiting = sizes > position
+            messages = mailboxes[waiting, position]
+            self.__receive(dyads[waiting], sides[waiting], messages)
+        self.__open(dyads, sides)
+
+    def __receive(self, dyads: np.ndarray, sides: np.ndarray, messages: np.ndarray):
+        # Answers one message per agent, each performative with its handler.
+        performatives = messages["performative"]
+        for performative, handler in self.__handlers:
+            received = performatives == performative.value
+            if received.any():
+                handler(dyads[received], sides[received], messages[received])
+
+    def __open(self, dyads: np.ndarray, sides: np.ndarray):
+        # decide_idle: the agents with no conversation under way propose their
+        # preferred item left, when they can support it, on a coin flip.
+        idle = self.states[dyads, sides] == self.protocol.initial_state.value
+        dyads, sides = dyads[idle], sides[idle]
+        # The partner is drawn among the only one there is.
+        self.rng.uniform(dyads, sides)
+
+        available = ~(self.agreed[dyads, sides] | self.proposed[dyads, sides])
+        left = available.any(axis=1)
+        dyads, sides, available = dyads[left], sides[left], available[left]
+        scores = np.where(available, self.scores[dyads, sides], -np.inf)
+        best = scores == scores.max(axis=1, initial=-np.inf)[:, None]
+        # Ties are broken as most_preferred does, in the order of the items.
+        choice = (self.rng.uniform(dyads, sides) * best.sum(axis=1)).astype(np.int64)
+        items = (np.cumsum(best, axis=1) > choice[:, None]).argmax(axis=1)
+
+        supported, _ = self.__support(dyads, sides, items)
+        dyads, sides, items = dyads[supported], sides[supported], items[supported]
+        next_states = self.__opening_states[
+            (self.rng.uniform(dyads, sides) * len(self.__opening_states)).astype(
+                np.int64
+            )
+        ]
+        propose = next_states == MessagePerformative.PROPOSE.value
+        dyads, sides, items = dyads[propose], sides[propose], items[propose]
+        self.proposed[dyads, sides, items] = True
+        self.__send(dyads, sides, MessagePerformative.PROPOSE, items)
+
+    def __on_propose(self, dyads, sides, messages):
+        # decide_propose: accepts an item among the top 10 percent.
+        items = messages["item"]
+        accept = self.scores[dyads, sides, items] >= self.__top_scores[dyads, sides]
+        self.__send(
+            dyads[accept], sides[accept], MessagePerformative.ACCEPT, items[accept]
+        )
+        ask = ~accept
+        self.__send(dyads[ask], sides[ask], MessagePerformative.ASK_WHY, items[ask])
+
+    def __on_accept(self, dyads, sides, messages):
+        # decide_accept, build_commitment.
+        self.agreed[dyads, sides, messages["item"]] = True
+        self.__send(dyads, sides, MessagePerformative.COMMIT, messages["item"])
+
+    def __on_commit(self, dyads, sides, messages):
+        # build_commitment.
+        self.agreed[dyads, sides, messages["item"]] = True
+        self.__send(dyads, sides, MessagePerformative.ACK, messages["item"])
+
+    def __on_close(self, dyads, sides, messages):
+        # The conversation goes back to IDLE, without a message.
+        self.states[dyads, sides] = self.protocol.initial_state.value
+
+    def __on_ask_why(self, dyads, sides, messages):
+        # build_because: the best supporting argument not used yet.
+        items = messages["item"]
+        _, criteria = self.__support(dyads, sides, items)
+        self.used[dyads, sides, items, criteria] = True
+        self.__send(
+            dyads,
+            sides,
+            MessagePerformative.BECAUSE,
+            items,
+            decisions=True,
+            criteria=criteria,
+            values=self.values[dyads, sides, items, criteria],
+        )
+
+    def __on_argument(self, dyads, sides, messages):
+        # decide_argue, build_argue: counter-argues, or gives up by accepting an
+        # argument for the item and by querying the item of an argument against it.
+        found, reply = self.__parse_argument(dyads, sides, messages)
+        decisions, items, criteria, values, worst = reply
+        supporting = found & decisions & (worst < 0)
+        self.used[
+            dyads[supporting],
+            sides[supporting],
+            items[supporting],
+            criteria[supporting],
+        ] = True
+        self.__send(
+            dyads[found],
+            sides[found],
+            MessagePerformative.ARGUE,
+            items[found],
+            decisions=decisions[found],
+            criteria=criteria[found],
+            values=values[found],
+            worst=worst[found],
+        )
+        accept = ~found & messages["decision"]
+        self.__send(
+            dyads[accept],
+            sides[accept],
+            MessagePerformative.ACCEPT,
+            messages["item"][accept],
+        )
+        query = ~found & ~messages["decision"]
+        self.__send(
+            dyads[query],
+            sides[query],
+            MessagePerformative.QUERY_REF,
+            messages["item"][query],
+        )
+
+    def __support(
+        self,
+        dyads: np.ndarray,
+        sides: np.ndarray,
+        items: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # support_proposal: whether each agent has a supporting premiss not used
+        # yet for its item, GOOD or VERY_GOOD, and the most important one.
+        orders = self.criterion_orders[dyads, sides]
+        values = np.take_along_axis(self.values[dyads, sides, items], orders, axis=1)
+        used = np.take_along_axis(self.used[dyads, sides, items], orders, axis=1)
+        candidates = (values >= Value.GOOD.value) & ~used
+        first = candidates.argmax(axis=1)
+        return candidates.any(axis=1), orders[np.arange(len(orders)), first]
+
+    def __parse_argument(self, dyads, sides, messages):
+        # parse_argument: returns which agents have a counter-argument, and the
+        # decisions, items, criteria, values and comparison worst criteria of the
+        # counter-arguments.
+        items = messages["item"].astype(np.int64)
+        criteria = messages["criterion"].astype(np.int64)
+        premisses = messages["value"].astype(np.int64)
+        count = len(dyads)
+        rows = np.arange(count)
+        own = self.values[dyads, sides]
+
+        # Against an argument attacking the item: the best support not used yet.
+        found, support = self.__support(dyads, sides, items)
+        found &= ~messages["decision"]
+        reply_decisions = np.ones(count, dtype=bool)
+        reply_items = items.copy()
+        reply_criteria = support
+        reply_worst = np.full(count, -1, dtype=np.int64)
+
+        # Against an argument for the item, the first that applies of: an other
+        # item better on the criterion, a worse value of the item on the
+        # criterion, a worse value on a more important criterion.
+        supporting = messages["decision"]
+        above = own[rows, :, criteria] > premisses[:, None]
+        above[rows, items] = False
+        better = supporting & above.any(axis=1)
+        worse = supporting & ~better & (own[rows, items, criteria] < premisses)
+
+        orders = self.criterion_orders[dyads, sides]
+        ranked = np.take_along_axis(own[rows, items], orders, axis=1)
+        rank = self.ranks[dyads, sides][rows, criteria]
+        lower = (np.arange(orders.shape[1]) < rank[:, None]) & (
+            ranked < premisses[:, None]
+        )
+        worse_other = supporting & ~better & ~worse & lower.any(axis=1)
+
+        reply_items[better] = above[better].argmax(axis=1)
+        reply_criteria[better | worse] = criteria[better | worse]
+        reply_decisions[worse | worse_other] = False
+        reply_criteria[worse_other] = orders[rows, lower.argmax(axis=1)][worse_other]
+        reply_worst[worse_other] = criteria[worse_other]
+        found |= better | worse | worse_other
+        reply_values = own[rows, reply_items, reply_criteria]
+        return found, (
+            reply_decisions,
+            reply_items,
+            reply_criteria,
+            reply_values,
+            reply_worst,
+        )
+
+    def __send(
+        self,
+        dyads: np.ndarray,
+        sides: np.ndarray,
+        performative: MessagePerformative,
+        items: np.ndarray,
+        decisions=False,
+        criteria=-1,
+        values=-1,
+        worst=-1,
+    ):
+        # Moves the agents to the state of the message, reset if it is final, and
+        # delivers the message to the mailbox of the other agent.
+        state = performative.value
+        if self.protocol.final_table[state]:
+            state = self.protocol.initial_state.value
+        self.states[dyads, sides] = state
+        others = 1 - sides
+        positions = self.__mailbox_sizes[dyads, others]
+        if len(positions) and positions.max() >= self.__mailboxes.shape[2]:
+            self.__mailboxes = np.concatenate(
+                (self.__mailboxes, np.zeros_like(self.__mailboxes)),
+                axis=2,
+            )
+        mailboxes = self.__mailboxes
+        mailboxes["performative"][dyads, others, positions] = performative.value
+        mailboxes["item"][dyads, others, positions] = items
+        mailboxes["decision"][dyads, others, positions] = decisions
+        mailboxes["criterion"][dyads, others, positions] = criteria
+        mailboxes["value"][dyads, others, positions] = values
+        mailboxes["worst"][dyads, others, positions] = worst
+        self.__mailbox_sizes[dyads, others] += 1
+        self.num_messages[dyads] += 1
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+import json
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, List
+
+import numpy as np
+from arguments.Argument import Argument
+from arguments.Argumentation import Argumentation
+from message.MessageCodec import MessageCodec
+from message.MessagePerformative import MessagePerformative
+from preferences.CriterionName import CriterionName
+from preferences.CriterionValue import CriterionValue
+from preferences.Item import Item
+from preferences.PreferenceModel import PreferenceModel
+from preferences.Value import Value
+
+if TYPE_CHECKING:
+    from ArgumentAgent import ArgumentAgent
+    from ArgumentModel import ArgumentModel
+
+CHECKPOINT_VERSION = 1
+
+
+def save_checkpoint(model: "ArgumentModel", path: str) -> None:
+    """Write the state of model to path.
+
+    A checkpoint is a numpy .npz archive of integer arrays, plus a JSON "meta" entry
+    holding the names, the step counters, the random generator states and the
+    settings changing the draws of the run, and the thresholds of the interval
+    profile of each agent, NaN when unknown. Agents, items and messages are referred
+    to by their index, messages being encoded with a MessageCodec. The data
+    collector history and the read messages are not saved: the restored model
+    continues the run identically, but only collects the steps run after the
+    restoration.
+
+    The archive is written next to path and moved over it once complete, so that a
+    job killed while checkpointing keeps its previous checkpoint.
+    """
+    agents = list(model.schedule.agent_buffer())
+    items: List[Item] = agents[0].list_items if agents else []
+    codec = MessageCodec([agent.get_name() for agent in agents], items)
+
+    preferences, agreed, proposed, conversations = [], [], [], []
+    arguments, attacks, unread = [], [], []
+    for idx, agent in enumerate(agents):
+        preferences.append(
+            [
+                (
+                    codec.item_id(value.get_item().get_name()),
+                    value.get_criterion_name().value,
+                    value.get_value().value,
+                )
+                for value in agent.preferences.get_criterion_value_list()
+            ]
+        )
+        for table, rows in (
+            (agent.agreed_items, agreed),
+            (agent.proposed_items, proposed),
+        ):
+            for other, item_names in table.items():
+                rows.extend(
+                    (idx, codec.agent_id(other), codec.item_id(name))
+                    for name in item_names
+                )
+        for other, fsm in agent.conversations.items():
+            conversations.append(
+                (idx, codec.agent_id(other), fsm.current_state.value, fsm.turn)
+            )
+        for other, argumentation in agent.argumentations.items():
+            nodes = {}
+            for argument in argumentation.all_arguments():
+                nodes[argument] = len(nodes)
+                arguments.append(
+                    (
+                        idx,
+                        codec.agent_id(other),
+                        codec.item_id(argument.get_item().get_name()),
+                        argument.to_key(),
+                        codec.agent_id(argument.get_agent()),
+                    )
+                )
+            attacks.extend(
+                (idx, codec.agent_id(other), nodes[attacker], nodes[attacked])
+                for attacker, attacked in argumentation.get_attacks()
+            )
+        unread.extend(
+            (idx, *codec.encode(message))
+            for message in agent.get_mailbox().peek_new_messages()
+        )
+
+    thresholds = np.full(
+        (len(agents), len(CriterionName), len(PreferenceModel.VALUES) - 1),
+        np.nan,
+    )
+    for idx, agent in enumerate(agents):
+        if agent.thresholds is not None:
+            thresholds[idx] = agent.thresholds
+
+    random_version, random_state, random_gauss = model.random.getstate()
+    rng_states = [agent.rng.get_state() for agent in agents]
+    meta = {
+        "version": CHECKPOINT_VERSION,
+        "steps": model.schedule.steps,
+        "time": model.schedule.time,
+        "current_id": model.current_id,
+        "deterministic": model.deterministic,
+        "max_conversations": model.max_conversations,
+        "agents": [agent.get_name() for agent in agents],
+        "unique_ids": [agent.unique_id for agent in agents],
+        "items": [item.get_name() for item in items],
+        "descriptions": [item.get_description() for item in items],
+        "criterion_orders": [
+            [
+                criterion.value
+                for criterion in agent.preferences.get_criterion_name_list()
+            ]
+            for agent in agents
+        ],
+        "random_version": random_version,
+        "random_gauss": random_gauss,
+        "rng_states": [state["bit_generator"] for state in rng_states],
+    }
+
+    arrays = {
+        "meta": np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8),
+        "random_state": np.array(random_state, dtype=np.uint32),
+        "preferences": np.array(preferences, dtype=np.int32).reshape(
+            len(agents), -1, 3
+        ),
+        "agreed": np.array(agreed, dtype=np.int32).reshape(-1, 3),
+        "proposed": np.array(proposed, dtype=np.int32).reshape(-1, 3),
+        "conversations": np.array(conversations, dtype=np.int32).reshape(-1, 4),
+        "arguments": np.array(arguments, dtype=np.int32).reshape(-1, 5),
+        "attacks": np.array(attacks, dtype=np.int32).reshape(-1, 4),
+        "unread": np.array(unread, dtype=np.int32).reshape(-1, 6),
+        "pending": np.array(
+            [codec.encode(x) for x in model.message_service.get_messages_to_proceed()],
+            dtype=np.int32,
+        ).reshape(-1, 5),
+        "rng_block_sizes": np.array(
+            [len(state["block"]) for state in rng_states], dtype=np.int64
+        ),
+        "rng_blocks": np.array(
+            [x for state in rng_states for x in state["block"]], dtype=np.float64
+        ),
+        "thresholds": thresholds,
+    }
+
+    path = Path(path)
+    partial = path.with_name(path.name + ".partial")
+    with open(partial, "wb") as checkpoint_file:
+        np.savez(checkpoint_file, **arrays)
+    os.replace(partial, path)
+
+
+def read_checkpoint(path: str) -> dict:
+    """Read a checkpoint written by save_checkpoint."""
+    with np.load(path) as archive:
+        state = {key: archive[key] for key in archive.files}
+    state["meta"] = json.loads(state["meta"].tobytes().decode("utf-8"))
+    if state["meta"]["version"] != CHECKPOINT_VERSION:
+        raise ValueError(f"{path} is not a version {CHECKPOINT_VERSION} checkpoint")
+    state["items"] = [
+        Item(name, description)
+        for name, description in zip(
+            state["meta"]["items"], state["meta"]["descriptions"]
+        )
+    ]
+    return state
+
+
+def restore_checkpoint(
+    model: "ArgumentModel",
+    agents: List["ArgumentAgent"],
+    state: dict,
+) -> None:
+    """Restore a state returned by read_checkpoint into model. The agents must have
+    been created in the checkpoint order, and neither given preferences nor added
+    to the schedule, and the model must have the deterministic and max_conversations
+    settings of the checkpoint."""
+    meta = state["meta"]
+    items = state["items"]
+    names = [agent.get_name() for agent in agents]
+    if names != meta["agents"]:
+        raise ValueError("The model agents do not match the checkpoint agents")
+    for setting, default in (("deterministic", False), ("max_conversations", None)):
+        if meta.get(setting, default) != getattr(model, setting):
+            raise ValueError(
+                f"The checkpoint was run with {setting}={meta.get(setting, default)}"
+            )
+    codec = MessageCodec(names, items)
+
+    model.random.setstate(
+        (
+            meta["random_version"],
+            tuple(state["random_state"].tolist()),
+            meta["random_gauss"],
+        )
+    )
+    model.schedule.steps = meta["steps"]
+    model.schedule.time = meta["time"]
+    model.current_id = meta["current_id"]
+
+    # Checkpoints written before the thresholds were saved have none.
+    thresholds = state.get("thresholds")
+    block_ends = np.cumsum(state["rng_block_sizes"]).tolist()
+    for idx, agent in enumerate(agents):
+        agent.set_preferences(
+            items,
+            [CriterionName(x) for x in meta["criterion_orders"][idx]],
+            [
+                CriterionValue(items[item], CriterionName(criterion), Value(value))
+                for item, criterion, value in state["preferences"][idx].tolist()
+            ],
+            thresholds=(
+                None
+                if thresholds is None or np.isnan(thresholds[idx]).all()
+                else np.array(thresholds[idx])
+            ),
+        )
+        start = block_ends[idx - 1] if idx > 0 else 0
+        agent.rng.set_state(
+            {
+                "bit_generator": meta["rng_states"][idx],
+                "block": state["rng_blocks"][start : block_ends[idx]].tolist(),
+            }
+        )
+        model.schedule.add(agent)
+
+    for key, attribute in (("agreed", "agreed_items"), ("proposed", "proposed_items")):
+        for idx, other, item in state[key].tolist():
+            getattr(agents[idx], attribute).setdefault(names[other], []).append(
+                items[item].get_name()
+            )
+
+    for idx, other, performative, turn in state["conversations"].tolist():
+        fsm = agents[idx].new_conversation(names[other])
+        fsm.current_state = MessagePerformative(performative)
+        fsm.turn = turn
+        agents[idx].conversations[names[other]] = fsm
+
+    nodes = {}
+    for idx, other, item, key, owner in state["arguments"].tolist():
+        argumentation = agents[idx].argumentations.get(names[other])
+        if argumentation is None:
+            argumentation = Argumentation(names[idx], names[other])
+            agents[idx].argumentations[names[other]] = argumentation
+            nodes[(idx, other)] = []
+        argument = Argument.from_key(key, items[item], names[owner])
+        argumentation.add_argument(argument)
+        nodes[(idx, other)].append(argument)
+    for idx, other, attacker, attacked in state["attacks"].tolist():
+        argument = nodes[(idx, other)][attacker]
+        argument.set_parent(nodes[(idx, other)][attacked])
+        agents[idx].argumentations[names[other]].add_argument(argument)
+
+    for idx, *encoded in state["unread"].tolist():
+        agents[idx].receive_message(codec.decode(*encoded))
+    model.message_service.set_messages_to_proceed(
+        [codec.decode(*encoded) for encoded in state["pending"].tolist()]
+    )
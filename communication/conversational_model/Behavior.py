@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+from typing import Callable, Dict, Optional
+
+from message.MessagePerformative import MessagePerformative
+
+DecisionHandler = Callable[..., MessagePerformative]
+MessageHandler = Callable[..., object]
+
+
+def _no_decision(agent, preferences, input, current_state, next_states, context):
+    raise ValueError(f"No decision handler registered for {current_state}")
+
+
+def _no_message(agent, preferences, input, next_state, context):
+    return None
+
+
+class Behavior:
+    """Behavior class.
+    Class implementing the behavior of an agent as handlers registered per
+    performative:
+        - a decision handler per current state, called as
+          handler(agent, preferences, input, current_state, next_states, context)
+          and returning the next state,
+        - a message handler per next state, called as
+          handler(agent, preferences, input, next_state, context)
+          and sending and returning the message of the transition, or None.
+    States without a handler use the default handlers.
+
+    Handlers are resolved into tables indexed by performative value when they are
+    registered, so a decision or a message costs one list lookup whatever the number
+    of handlers. A behavior can be copied and its copy extended or overridden
+    without changing the original.
+
+    attr:
+        name: the name of the behavior (str)
+    """
+
+    __TABLE_SIZE = max(performative.value for performative in MessagePerformative) + 1
+
+    def __init__(self, name: str = ""):
+        """Create a new Behavior without handlers."""
+        self.name = name
+        self.__decisions: Dict[MessagePerformative, DecisionHandler] = {}
+        self.__messages: Dict[MessagePerformative, MessageHandler] = {}
+        self.__default_decision: DecisionHandler = _no_decision
+        self.__default_message: MessageHandler = _no_message
+        self.__resolve()
+
+    def __resolve(self) -> None:
+        self.__decision_table = [self.__default_decision] * Behavior.__TABLE_SIZE
+        for performative, handler in self.__decisions.items():
+            self.__decision_table[performative.value] = handler
+        self.__message_table = [self.__default_message] * Behavior.__TABLE_SIZE
+        for performative, handler in self.__messages.items():
+            self.__message_table[performative.value] = handler
+
+    def on_decision(self, *performatives: MessagePerformative) -> Callable:
+        """Decorator registering a decision handler for the given current states."""
+
+        def register(handler: DecisionHandler) -> DecisionHandler:
+            for performative in performatives:
+                self.__decisions[performative] = handler
+            self.__resolve()
+            return handler
+
+        return register
+
+    def on_message(self, *performatives: MessagePerformative) -> Callable:
+        """Decorator registering a message handler for the given next states."""
+
+        def register(handler: MessageHandler) -> MessageHandler:
+            for performative in performatives:
+                self.__messages[performative] = handler
+            self.__resolve()
+            return handler
+
+        return register
+
+    def default_decision(self, handler: DecisionHandler) -> DecisionHandler:
+        """Decorator registering the decision handler of states without one."""
+        self.__default_decision = handler
+        self.__resolve()
+        return handler
+
+    def default_message(self, handler: MessageHandler) -> MessageHandler:
+        """Decorator registering the message handler of states without one."""
+        self.__default_message = handler
+        self.__resolve()
+        return handler
+
+    def copy(self, name: Optional[str] = None) -> "Behavior":
+        """Return a new behavior with the same handlers."""
+        behavior = Behavior(self.name if name is None else name)
+        for performative, handler in self.__decisions.items():
+            behavior.on_decision(performative)(handler)
+        for performative, handler in self.__messages.items():
+            behavior.on_message(performative)(handler)
+        behavior.default_decision(self.__default_decision)
+        behavior.default_message(self.__default_message)
+        return behavior
+
+    def decide(
+        self,
+        agent,
+        preferences,
+        input,
+        current_state: MessagePerformative,
+        next_states,
+        context=None,
+    ) -> MessagePerformative:
+        """Return the next state chosen by the handler of the current state."""
+        return self.__decision_table[current_state.value](
+            agent,
+            preferences,
+            input,
+            current_state,
+            next_states,
+            context,
+        )
+
+    def build_message(
+        self,
+        agent,
+        preferences,
+        input,
+        next_state: MessagePerformative,
+        context=None,
+    ):
+        """Build and send the message of the handler of the next state."""
+        return self.__message_table[next_state.value](
+            agent,
+            preferences,
+            input,
+            next_state,
+            context,
+        )
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from arguments.Argumentation import Argumentation
+from conversational_model.ConversationTable import Conversation, Conversations
+
+
+class ConversationManager:
+    """ConversationManager class.
+    Class implementing the lifecycle of the conversations of one agent. There is one
+    conversation per partner, opened from its initial state, and reset in place as
+    soon as it is closed.
+
+    The argumentation of a closed conversation is kept, so that the agent does not
+    repeat its arguments the next time it talks with the same partner. When the
+    argumentations of the closed conversations hold more arguments than the budget,
+    the least recently closed ones are evicted. The argumentation of a conversation
+    under way is never evicted.
+
+    attr:
+        conversations: the conversations of the agent (Conversations)
+        argumentations: the argumentation of the agent with each partner (dict)
+        argument_budget: the number of arguments kept for the closed
+            conversations, None for no limit (int)
+        evicted: the number of argumentations evicted so far (int)
+    """
+
+    def __init__(
+        self,
+        conversations: Conversations,
+        argumentations: Dict[str, Argumentation],
+        argument_budget: Optional[int] = None,
+    ):
+        """Create a new ConversationManager."""
+        self.conversations = conversations
+        self.argumentations = argumentations
+        self.argument_budget = argument_budget
+        self.evicted = 0
+        self.__closed: OrderedDict[str, int] = OrderedDict()
+        self.__closed_arguments = 0
+
+    def open(self, other: str) -> Conversation:
+        """Return the conversation with other, ready to start from its initial
+        state."""
+        conversation = self.conversations[other]
+        if conversation.has_finished():
+            conversation.reset()
+        self.__reopen(other)
+        return conversation
+
+    def update(self, other: str) -> None:
+        """Record the progress of the conversation with other after a step: a closed
+        conversation is reset, and its argumentation becomes evictable."""
+        conversation = self.conversations[other]
+        if conversation.has_finished():
+            conversation.reset()
+        elif not conversation.is_start():
+            self.__reopen(other)
+            return
+
+        argumentation = self.argumentations.get(other)
+        if argumentation is None:
+            return
+        self.__reopen(other)
+        size = len(argumentation.all_arguments())
+        self.__closed[other] = size
+        self.__closed_arguments += size
+        self.__evict()
+
+    def reset_finished(self) -> int:
+        """Reset every finished conversation, and return how many there were."""
+        return self.conversations.reset_finished()
+
+    def __reopen(self, other: str) -> None:
+        # The argumentation with other is in use again.
+        size = self.__closed.pop(other, None)
+        if size is not None:
+            self.__closed_arguments -= size
+
+    def __evict(self) -> None:
+        # Evicts the least recently closed argumentations down to the budget.
+        if self.argument_budget is None:
+            return
+        while self.__closed_arguments > self.argument_budget:
+            other, size = self.__closed.popitem(last=False)
+            self.__closed_arguments -= size
+            del self.argumentations[other]
+            self.evicted += 1
@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+from bisect import bisect_left
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from conversational_model.FSM import Turn
+from conversational_model.Protocol import Protocol
+from conversational_model.TransitionContext import TransitionContext
+from message.Message import Message
+from message.MessagePerformative import MessagePerformative
+from preferences.Preferences import Preferences
+from topology.Topology import Topology
+
+
+class ConversationTable:
+    """ConversationTable class.
+    Class implementing the state of the conversations between every pair of agents
+    of a population, in two arrays of bytes indexed by (agent id, partner id): the
+    value of the current state and the turn. All the conversations follow the same
+    compiled Protocol, so that a conversation costs two bytes.
+
+    Agents are given their id when they are added. The rows of an agent are read and
+    written through the Conversations mapping returned by add_agent, holding
+    Conversation handles with the interface of a FiniteStateMachine.
+
+    With a Topology, agents only converse with their neighbours: the row of an agent
+    only holds the conversations with its neighbours, and the table costs two bytes
+    per edge end instead of two per pair. The agents must then be added in the
+    topology order.
+
+    With rows, a range of ids, only those agents have a row, and may act in their
+    conversations: the others are only partners, and the table costs two bytes per
+    pair of a row agent and a partner. The capacity is then fixed.
+
+    attr:
+        protocol: the protocol followed by the conversations (Protocol)
+        names: the agent names, indexed by id (list)
+        trace: logs the transitions when not None (MessageTrace)
+        topology: the interaction graph, None when every pair may converse
+            (Topology)
+        rows: the ids of the agents with a row, None when every agent has one
+            (range)
+    """
+
+    def __init__(
+        self,
+        capacity: int = 0,
+        protocol: Optional[Protocol] = None,
+        trace=None,
+        topology: Optional[Topology] = None,
+        rows: Optional[range] = None,
+    ):
+        """Create a new ConversationTable with room for capacity agents, or for the
+        agents of topology."""
+        if topology is not None and rows is not None:
+            raise ValueError("A table with a topology has a row for every agent")
+        self.protocol = protocol if protocol is not None else Protocol.load()
+        self.topology = topology
+        self.rows = rows
+        self.names: List[str] = []
+        self.trace = trace
+        self.__ids: Dict[str, int] = {}
+        self.__performatives: List[Optional[MessagePerformative]] = [None] * len(
+            self.protocol.successor_table
+        )
+        for performative in MessagePerformative:
+            self.__performatives[performative.value] = performative
+        self.__initial = self.protocol.initial_state.value
+        self.__capacity = 0
+        self.__states = bytearray()
+        self.__turns = bytearray()
+        # The id of the agent of the first row of a dense table.
+        self.__first_row = 0
+        if rows is not None:
+            self.__first_row = rows.start
+            self.__capacity = capacity
+            self.__states = bytearray([self.__initial]) * (len(rows) * capacity)
+            self.__turns = bytearray(len(rows) * capacity)
+        elif topology is None:
+            self.__grow(capacity)
+        else:
+            # Plain lists, faster than arrays for the lookups of single cells.
+            self.__indptr: List[int] = topology.indptr.tolist()
+            self.__indices: List[int] = topology.indices.tolist()
+            self.__capacity = topology.num_agents
+            self.__states = bytearray([self.__initial]) * len(self.__indices)
+            self.__turns = bytearray(len(self.__indices))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add_agent(self, name: str) -> "Conversations":
+        """Give an id to an agent, and return the mapping of its conversations."""
+        if name not in self.__ids:
+            if len(self.names) == self.__capacity:
+                if self.topology is not None or self.rows is not None:
+                    raise ValueError(
+                        f"The topology has no room for more than "
+                        f"{self.__capacity} agents"
+                    )
+                self.__grow(max(1, 2 * self.__capacity))
+            self.__ids[name] = len(self.names)
+            self.names.append(name)
+        return Conversations(self, self.__ids[name])
+
+    def agent_id(self, name: str) -> int:
+        """Return the id of an agent, adding it if it is unknown."""
+        agent = self.__ids.get(name)
+        if agent is None:
+            agent = self.add_agent(name).agent
+        return agent
+
+    def has_agent(self, name: str) -> bool:
+        """Return whether an agent was given an id."""
+        return name in self.__ids
+
+    def are_neighbours(self, agent: int, other: int) -> bool:
+        """Return whether agent may converse with other."""
+        if self.topology is None:
+            return agent != other
+        start, stop = self.__indptr[agent], self.__indptr[agent + 1]
+        position = bisect_left(self.__indices, other, start, stop)
+        return position < stop and self.__indices[position] == other
+
+    def cell(self, agent: int, other: int) -> int:
+        """Return the index of the conversation of agent with other in the
+        arrays of the table."""
+        if self.topology is None:
+            return (agent - self.__first_row) * self.__capacity + other
+        start, stop = self.__indptr[agent], self.__indptr[agent + 1]
+        position = bisect_left(self.__indices, other, start, stop)
+        if position == stop or self.__indices[position] != other:
+            raise ValueError(
+                f"{self.names[agent]} and {self.names[other]} are not neighbours"
+            )
+        return position
+
+    def get_state(self, agent: int, other: int) -> MessagePerformative:
+        """Return the state of agent in its conversation with other."""
+        return self.__performatives[self.__states[self.cell(agent, other)]]
+
+    def set_state(self, agent: int, other: int, state: MessagePerformative) -> None:
+        """Set the state of agent in its conversation with other."""
+        self.__states[self.cell(agent, other)] = state.value
+
+    def get_turn(self, agent: int, other: int) -> int:
+        """Return whose turn it is in the conversation of agent with other."""
+        return self.__turns[self.cell(agent, other)]
+
+    def set_turn(self, agent: int, other: int, turn: int) -> None:
+        """Set whose turn it is in the conversation of agent with other."""
+        self.__turns[self.cell(agent, other)] = turn
+
+    def reset(self, agent: int, other: int) -> None:
+        """Bring the conversation of agent with other back to its initial state."""
+        cell = self.cell(agent, other)
+        self.__states[cell] = self.__initial
+        self.__turns[cell] = Turn.Me
+
+    def is_start(self, agent: int, other: int) -> bool:
+        """Return whether the conversation of agent with other is in the initial
+        state."""
+        return self.__states[self.cell(agent, other)] == self.__initial
+
+    def has_finished(self, agent: int, other: int) -> bool:
+        """Return whether the conversation of agent with other reached a final
+        state, the last message having been sent by agent."""
+        cell = self.cell(agent, other)
+        return bool(
+            self.protocol.final_table[self.__states[cell]]
+            and self.__turns[cell] == Turn.Other
+        )
+
+    def step(
+        self,
+        agent: int,
+        other: int,
+        input: Message = None,
+        preferences: Preferences = None,
+    ) -> Optional[Message]:
+        """Advance the conversation of agent with other. With preferences, agent
+        acts and the message it sends is returned; without, agent infers the
+        state from the input message of other."""
+        cell = self.cell(agent, other)
+        if not preferences:
+            self.__states[cell] = input.get_performative().value
+            self.__turns[cell] = Turn.Me
+            return None
+
+        self.__turns[cell] = Turn.Other
+        current_state = self.__performatives[self.__states[cell]]
+        context = TransitionContext()
+        next_state = self.protocol.next_state(
+            current_state,
+            input,
+            preferences,
+            context,
+        )
+        if self.trace is not None:
+            self.trace.log(
+                self.trace.EVENTS,
+                "[FiniteStateMachine]: Agents: %s %s Current state: %s Next state: %s",
+                self.names[agent],
+                self.names[other],
+                current_state,
+                next_state,
+            )
+        msg = preferences.build_message(input, next_state, context)
+        self.__states[cell] = next_state.value
+        return msg
+
+    def states(self) -> np.ndarray:
+        """Return the state values as an (agents, agents) array, (rows, agents)
+        with rows, or with a topology as an array of one entry per edge end, in the
+        topology order. The array is a view of the table, valid until an agent is
+        added."""
+        return self.__view(self.__states)
+
+    def turns(self) -> np.ndarray:
+        """Return the turns, in an array shaped like the one of states."""
+        return self.__view(self.__turns)
+
+    def partners(self, agent: int) -> np.ndarray:
+        """Return the ids of the agents agent may converse with, in the order of its
+        row, itself included when there is no topology."""
+        if self.topology is None:
+            return np.arange(len(self.names))
+        return self.topology.neighbours(agent)
+
+    def row_size(self, agent: int) -> int:
+        """Return the number of conversations in the row of agent."""
+        if self.topology is None:
+            return len(self.names)
+        return self.__indptr[agent + 1] - self.__indptr[agent]
+
+    def started(self) -> np.ndarray:
+        """Return which conversations left the initial state."""
+        return self.states() != self.__initial
+
+    def finished(self) -> np.ndarray:
+        """Return which conversations reached a final state, the last message
+        having been sent by the row agent."""
+        return self.protocol.final_table[self.states()] & (self.turns() == Turn.Other)
+
+    def active(self) -> np.ndarray:
+        """Return which conversations are under way, started but not finished."""
+        return self.started() & ~self.finished()
+
+    def available_partners(
+        self,
+        agent: int,
+        buffers: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    ) -> np.ndarray:
+        """Return the ids of the agents agent has no conversation under way with,
+        itself excluded, in increasing order. The intermediate masks are computed
+        in buffers, two boolean arrays of row_size(agent) entries, when given."""
+        states, turns = self.__row(self.__states, agent), self.__row(
+            self.__turns, agent
+        )
+        if buffers is None:
+            buffers = (
+                np.empty(len(states), dtype=bool),
+                np.empty(len(states), dtype=bool),
+            )
+        available, finished = buffers
+        # available is used for the busy conversations, then inverted.
+        np.equal(turns, Turn.Other, out=available)
+        np.take(self.protocol.final_table, states, out=finished)
+        np.logical_and(finished, available, out=finished)
+        np.not_equal(states, self.__initial, out=available)
+        np.greater(available, finished, out=available)
+        np.logical_not(available, out=available)
+        if self.topology is not None:
+            return self.topology.neighbours(agent)[available]
+        available[agent] = False
+        return np.flatnonzero(available)
+
+    def reset_finished(self, agent: Optional[int] = None) -> int:
+        """Bring every finished conversation, or those of agent, back to its initial
+        state, and return how many there were."""
+        states, turns = self.states(), self.turns()
+        if agent is not None:
+            states = self.__row(self.__states, agent)
+            turns = self.__row(self.__turns, agent)
+        finished = self.protocol.final_table[states] & (turns == Turn.Other)
+        states[finished] = self.__initial
+        turns[finished] = Turn.Me
+        return int(np.count_nonzero(finished))
+
+    def touched(self, agent: int) -> np.ndarray:
+        """Return the ids of the partners whose conversation with agent is not in
+        its initial state and turn, in increasing order."""
+        touched = (self.__row(self.__states, agent) != self.__initial) | (
+            self.__row(self.__turns, agent) != Turn.Me
+        )
+        if self.topology is not None:
+            return self.topology.neighbours(agent)[touched]
+        return np.flatnonzero(touched)
+
+    def __view(self, buffer: bytearray) -> np.ndarray:
+        # Views the used part of a buffer as a square array, or as the array of
+        # the edge ends.
+        if self.topology is not None:
+            return np.frombuffer(buffer, dtype=np.uint8)
+        count = len(self.names)
+        if self.rows is not None:
+            return np.frombuffer(buffer, dtype=np.uint8).reshape(
+                len(self.rows), self.__capacity
+            )[:, :count]
+        return np.frombuffer(buffer, dtype=np.uint8).reshape(
+            self.__capacity, self.__capacity
+        )[:count, :count]
+
+    def __row(self, buffer: bytearray, agent: int) -> np.ndarray:
+        # Views the row of an agent in a buffer.
+        if self.topology is not None:
+            start, stop = self.__indptr[agent], self.__indptr[agent + 1]
+        else:
+            start = (agent - self.__first_row) * self.__capacity
+            stop = start + len(self.names)
+        return np.frombuffer(buffer, dtype=np.uint8, count=stop - start, offset=start)
+
+    def __grow(self, capacity: int) -> None:
+        # Moves the table to buffers with room for capacity agents.
+        if capacity <= self.__capacity:
+            return
+        states = bytearray([self.__initial]) * (capacity * capacity)
+        turns = bytearray(capacity * capacity)
+        for agent in range(len(self.names)):
+            old = agent * self.__capacity
+            new = agent * capacity
+            states[new : new + self.__capacity] = self.__states[
+                old : old + self.__capacity
+            ]
+            turns[new : new + self.__capacity] = self.__turns[
+                old : old + self.__capacity
+            ]
+        self.__states, self.__turns = states, turns
+        self.__capacity = capacity
+
+
+class Conversation:
+    """Conversation class.
+    Class implementing a handle on the conversation of an agent with another in a
+    ConversationTable, with the interface of a FiniteStateMachine. Handles hold no
+    state: two handles on the same pair see the same conversation.
+
+    attr:
+        table: the table holding the conversation (ConversationTable)
+        agent: the id of the agent (int)
+        other: the id of the other agent (int)
+        control: the IDLE message driving the opening transition, created on the
+            first tick and shared by the following ones (Message)
+    """
+
+    __slots__ = ("table", "agent", "other", "control")
+
+    def __init__(self, table: ConversationTable, agent: int, other: int):
+        """Create a new Conversation handle."""
+        self.table = table
+        self.agent = agent
+        self.other = other
+        self.control: Optional[Message] = None
+
+    @property
+    def current_state(self) -> MessagePerformative:
+        return self.table.get_state(self.agent, self.other)
+
+    @current_state.setter
+    def current_state(self, state: MessagePerformative) -> None:
+        self.table.set_state(self.agent, self.other, state)
+
+    @property
+    def turn(self) -> int:
+        return self.table.get_turn(self.agent, self.other)
+
+    @turn.setter
+    def turn(self, turn: int) -> None:
+        self.table.set_turn(self.agent, self.other, turn)
+
+    def step(self, input: Message = None, preferences: Preferences = None):
+        return self.table.step(self.agent, self.other, input, preferences)
+
+    def tick(self, preferences: Preferences) -> Optional[Message]:
+        """Let the agent act in the conversation without having received a message,
+        as when it opens it."""
+        if self.control is None:
+            names = self.table.names
+            self.control = Message(
+                names[self.agent],
+                names[self.other],
+                MessagePerformative.IDLE,
+                None,
+            )
+        return self.table.step(self.agent, self.other, self.control, preferences)
+
+    def reset(self) -> None:
+        self.table.reset(self.agent, self.other)
+
+    def has_finished(self) -> bool:
+        return self.table.has_finished(self.agent, self.other)
+
+    def is_start(self) -> bool:
+        return self.table.is_start(self.agent, self.other)
+
+
+class Conversations(Mapping):
+    """Conversations class.
+    Class implementing the conversations of one agent, as a mapping from partner
+    names to Conversation handles over its row of a ConversationTable.
+
+    Every partner has a conversation, in its initial state until it is stepped; the
+    mapping only lists, and only contains, the conversations that left their initial
+    state and turn. Looking up a name the table does not know raises KeyError:
+    agents are only added by ConversationTable.add_agent. The handle of each partner
+    is created once and reused. Assigning a conversation copies its state and turn.
+
+    attr:
+        table: the table holding the conversations (ConversationTable)
+        agent: the id of the agent (int)
+    """
+
+    def __init__(self, table: ConversationTable, agent: int):
+        """Create a new Conversations mapping."""
+        self.table = table
+        self.agent = agent
+        self.__handles: Dict[str, Conversation] = {}
+        self.__buffers: Tuple[np.ndarray, np.ndarray] = (
+            np.empty(0, dtype=bool),
+            np.empty(0, dtype=bool),
+        )
+
+    def __getitem__(self, name: str) -> Conversation:
+        conversation = self.__handles.get(name)
+        if conversation is None:
+            conversation = Conversation(self.table, self.agent, self.__partner(name))
+            self.__handles[name] = conversation
+        return conversation
+
+    def __setitem__(self, name: str, conversation) -> None:
+        other = self.__partner(name)
+        self.table.set_state(self.agent, other, conversation.current_state)
+        self.table.set_turn(self.agent, other, conversation.turn)
+
+    def __contains__(self, name) -> bool:
+        if not isinstance(name, str) or not self.table.has_agent(name):
+            return False
+        other = self.table.agent_id(name)
+        if not self.table.are_neighbours(self.agent, other):
+            return False
+        return not (
+            self.table.is_start(self.agent, other)
+            and self.table.get_turn(self.agent, other) == Turn.Me
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        names = self.table.names
+        return iter([names[other] for other in self.table.touched(self.agent)])
+
+    def __len__(self) -> int:
+        return len(self.table.touched(self.agent))
+
+    def __partner(self, name: str) -> int:
+        # The id of a partner; names the table does not know are not partners.
+        if not self.table.has_agent(name):
+            raise KeyError(name)
+        return self.table.agent_id(name)
+
+    def available_partners(self) -> np.ndarray:
+        """Return the ids of the partners with no conversation under way, in
+        increasing order, reusing the same buffers from one call to the next."""
+        count = self.table.row_size(self.agent)
+        if len(self.__buffers[0]) != count:
+            self.__buffers = (np.empty(count, dtype=bool), np.empty(count, dtype=bool))
+        return self.table.available_partners(self.agent, self.__buffers)
+
+    def reset_finished(self) -> int:
+        """Reset the finished conversations, and return how many there were."""
+        return self.table.reset_finished(self.agent)
@@ -1,43 +1,20 @@
 #!/usr/bin/env python3
-import inspect
-from typing import Dict, List, Optional, TypedDict
+from typing import Dict, List
 from abc import ABC, abstractmethod
-import json
-from pathlib import Path
 from typing import Any
-import networkx as nx
-import matplotlib.pyplot as plt
-from networkx.readwrite import json_graph
 import pprint
 
 import sys
 import os
 
 sys.path.append(os.getcwd())
+from conversational_model.Protocol import Protocol  # nopep8
+from conversational_model.TransitionContext import TransitionContext  # nopep8
 from message.Message import Message  # nopep8
 from message.MessagePerformative import MessagePerformative  # nopep8
 from preferences.Preferences import Preferences  # nopep8
 
 
-class GraphNode(TypedDict):
-    id: MessagePerformative
-    initial: Optional[bool]
-    final: Optional[bool]
-
-
-class Links(TypedDict):
-    source: MessagePerformative
-    target: MessagePerformative
-
-
-class ConversationalGraph(TypedDict):
-    directed: bool
-    multigraph: bool
-    graph: Dict
-    nodes: List[GraphNode]
-    links: List[Links]
-
-
 class FiniteStateMachineBase(ABC):
     def __init__(self) -> None:
         super().__init__()
@@ -68,69 +45,40 @@ class FiniteStateMachine(FiniteStateMachineBase):
         path: str = ".",
         filename: str = "conversational_graph.json",
         verbose: int = 0,
+        trace=None,
     ) -> None:
-        filename = Path(path) / Path(filename)
-        with open(filename, "r") as json_file:
-            graph_data: ConversationalGraph = json.load(json_file)
-
-        self.graph = json_graph.node_link_graph(graph_data)
-
-        self.__sanity_check(graph_data)
-
-        initial_states = [
-            node["id"] for node in graph_data["nodes"] if "initial" in node
-        ]
-
-        final_states = [
-            MessagePerformative[node["id"]]
-            for node in graph_data["nodes"]
-            if "final" in node
-        ]
-
-        # TODO: Could there be more than one initial state?
-        assert len(initial_states) == 1, "More than one initial state"
-
-        self.initial_state: MessagePerformative = MessagePerformative[initial_states[0]]
-        self.final_states: List[MessagePerformative] = final_states
+        self.protocol = Protocol.load(path, filename)
+        self.successors: Dict[MessagePerformative, List[MessagePerformative]] = (
+            self.protocol.successors
+        )
+        self.initial_state: MessagePerformative = self.protocol.initial_state
+        self.final_states: List[MessagePerformative] = self.protocol.final_states
         self.current_state: MessagePerformative = self.initial_state
         self.turn: Turn = Turn.Me
         self.agent_a = agent_a
         self.agent_b = agent_b
         self.verbose = verbose
+        self.trace = trace
 
         if self.verbose == 2:
             print("-" * 80)
             print("Graph data: ")
-            pprint.pprint(graph_data)
+            pprint.pprint(self.protocol.graph_data)
             print("-" * 80)
 
-        plt.figure(1, figsize=(5, 5))
-        nx.draw(self.graph, pos=nx.circular_layout(self.graph), with_labels=True)
-        plt.savefig("conversational_graph.png")
-
-    def __sanity_check(self, graph_data):
-        attributes = inspect.getmembers(
-            MessagePerformative, lambda a: not (inspect.isroutine(a))
-        )
+    @property
+    def graph(self):
+        """The protocol as a networkx DiGraph, built on first access."""
+        return self.protocol.graph
 
-        performatives = sorted(
-            set(
-                [
-                    a[0]
-                    for a in attributes
-                    if not (
-                        (a[0].startswith("__") and a[0].endswith("__"))
-                        or "name" in a[0]
-                        or "value" in a[0]
-                    )
-                ]
-            )
-        )
+    def draw(self, filename: str = "conversational_graph.png") -> None:
+        """Renders the protocol graph to an image file."""
+        import matplotlib.pyplot as plt
+        import networkx as nx
 
-        nodes = sorted([node["id"] for node in graph_data["nodes"]])
-        assert (
-            nodes == performatives
-        ), f"Performatives in graph do not match those in MessagePerformative: {[x for x in nodes if x not in performatives]} - {[x for x in performatives if x not in nodes]}"
+        plt.figure(1, figsize=(5, 5))
+        nx.draw(self.graph, pos=nx.circular_layout(self.graph), with_labels=True)
+        plt.savefig(filename)
 
     def step(self, input: Message = None, preferences: Preferences = None):
         if preferences:
@@ -155,25 +103,29 @@ class FiniteStateMachine(FiniteStateMachineBase):
                 end=" ",
             )
 
-        next_states = [
-            MessagePerformative[x]
-            for x in list(self.graph.successors(self.current_state.name))
-        ]
-
-        if len(next_states) > 1:
-            next_state = preferences.decide(input, self.current_state, next_states)
-            assert (
-                next_state in next_states
-            ), f"Next state was not defined in the graph: {next_state} not in {next_states}"
-        else:
-            next_state = next_states[0]
+        context = TransitionContext()
+        next_state = self.protocol.next_state(
+            self.current_state,
+            input,
+            preferences,
+            context,
+        )
 
         if self.verbose >= 1:
             print(
                 "Current state: {}".format(self.current_state),
                 "Next state: {}".format(next_state),
             )
-        msg = preferences.build_message(input, next_state)
+        if self.trace is not None:
+            self.trace.log(
+                self.trace.EVENTS,
+                "[FiniteStateMachine]: Agents: %s %s Current state: %s Next state: %s",
+                self.agent_a,
+                self.agent_b,
+                self.current_state,
+                next_state,
+            )
+        msg = preferences.build_message(input, next_state, context)
 
         self.current_state = next_state
 
@@ -191,4 +143,5 @@ class FiniteStateMachine(FiniteStateMachineBase):
 
 
 if __name__ == "__main__":
-    fsm = FiniteStateMachine()
+    fsm = FiniteStateMachine("Agent A", "Agent B")
+    fsm.draw("images/conversational_graph.png")
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+import inspect
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, TypedDict
+
+import numpy as np
+from conversational_model.TransitionContext import TransitionContext
+from message.Message import Message
+from message.MessagePerformative import MessagePerformative
+from preferences.Preferences import Preferences
+
+
+class GraphNode(TypedDict):
+    id: MessagePerformative
+    initial: Optional[bool]
+    final: Optional[bool]
+
+
+class Links(TypedDict):
+    source: MessagePerformative
+    target: MessagePerformative
+
+
+class ConversationalGraph(TypedDict):
+    directed: bool
+    multigraph: bool
+    graph: Dict
+    nodes: List[GraphNode]
+    links: List[Links]
+
+
+class Protocol:
+    """Protocol class.
+    Class implementing a conversational graph compiled into lookup tables indexed by
+    performative value, shared by every conversation following it.
+
+    attr:
+        graph_data: the graph as read from its JSON file (dict)
+        successors: the successors of each state, in declaration order (dict)
+        initial_state: the state conversations start in (MessagePerformative)
+        final_states: the states ending a conversation (list)
+        successor_table: the successors of each state, indexed by value (list)
+        final_table: whether each state is final, indexed by value (np.ndarray)
+    """
+
+    __loaded: Dict[Path, "Protocol"] = {}
+
+    def __init__(self, graph_data: ConversationalGraph):
+        """Compile a conversational graph."""
+        Protocol.__sanity_check(graph_data)
+        self.graph_data = graph_data
+        self.__graph = None
+
+        # Successors are kept in the order the links are declared, which is the
+        # order networkx used to report them.
+        self.successors: Dict[MessagePerformative, List[MessagePerformative]] = {
+            MessagePerformative[node["id"]]: [] for node in graph_data["nodes"]
+        }
+        for link in graph_data["links"]:
+            self.successors[MessagePerformative[link["source"]]].append(
+                MessagePerformative[link["target"]]
+            )
+
+        initial_states = [
+            node["id"] for node in graph_data["nodes"] if "initial" in node
+        ]
+        # TODO: Could there be more than one initial state?
+        assert len(initial_states) == 1, "More than one initial state"
+
+        self.initial_state = MessagePerformative[initial_states[0]]
+        self.final_states: List[MessagePerformative] = [
+            MessagePerformative[node["id"]]
+            for node in graph_data["nodes"]
+            if "final" in node
+        ]
+
+        size = max(performative.value for performative in MessagePerformative) + 1
+        self.successor_table: List[Tuple[MessagePerformative, ...]] = [()] * size
+        for state, next_states in self.successors.items():
+            self.successor_table[state.value] = tuple(next_states)
+        self.final_table = np.zeros(size, dtype=bool)
+        self.final_table[[state.value for state in self.final_states]] = True
+
+    @staticmethod
+    def load(
+        path: str = ".",
+        filename: str = "conversational_graph.json",
+    ) -> "Protocol":
+        """Return the protocol of a graph file, read and compiled on first use."""
+        filename = (Path(path) / Path(filename)).resolve()
+        protocol = Protocol.__loaded.get(filename)
+        if protocol is None:
+            with open(filename, "r") as json_file:
+                protocol = Protocol(json.load(json_file))
+            Protocol.__loaded[filename] = protocol
+        return protocol
+
+    @property
+    def graph(self):
+        """The protocol as a networkx DiGraph, built on first access."""
+        if self.__graph is None:
+            from networkx.readwrite import json_graph
+
+            self.__graph = json_graph.node_link_graph(self.graph_data)
+        return self.__graph
+
+    def next_state(
+        self,
+        current_state: MessagePerformative,
+        input: Message,
+        preferences: Preferences,
+        context: TransitionContext,
+    ) -> MessagePerformative:
+        """Return the state following current_state, asking preferences to decide
+        when the protocol allows several."""
+        next_states = self.successor_table[current_state.value]
+        if len(next_states) <= 1:
+            return next_states[0]
+
+        next_state = preferences.decide(input, current_state, next_states, context)
+        assert (
+            next_state in next_states
+        ), f"Next state was not defined in the graph: {next_state} not in {next_states}"
+        return next_state
+
+    @staticmethod
+    def __sanity_check(graph_data: ConversationalGraph):
+        attributes = inspect.getmembers(
+            MessagePerformative, lambda a: not (inspect.isroutine(a))
+        )
+
+        performatives = sorted(
+            set(
+                [
+                    a[0]
+                    for a in attributes
+                    if not (
+                        (a[0].startswith("__") and a[0].endswith("__"))
+                        or "name" in a[0]
+                        or "value" in a[0]
+                    )
+                ]
+            )
+        )
+
+        nodes = sorted([node["id"] for node in graph_data["nodes"]])
+        assert (
+            nodes == performatives
+        ), f"Performatives in graph do not match those in MessagePerformative: {[x for x in nodes if x not in performatives]} - {[x for x in performatives if x not in nodes]}"
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+
+
+class TransitionContext:
+    """TransitionContext class.
+    Class carrying what the decision function computed for a transition of a
+    conversation to the message builder of the same transition, so that the message
+    is built from the same results instead of computing them again.
+
+    A new context is created for each transition; its attributes are None when the
+    decision function did not compute them, the next state being forced by the
+    protocol or the decision not needing them.
+
+    attr:
+        item: the item chosen to be proposed (Item)
+        argument: the argument chosen to answer the input message (Argument)
+    """
+
+    __slots__ = ("item", "argument")
+
+    def __init__(self):
+        """Create a new empty TransitionContext."""
+        self.item = None
+        self.argument = None
@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+import threading
 
 
 class Mailbox:
@@ -8,6 +9,8 @@ class Mailbox:
     attr:
         unread_messages: The list of unread messages
         read_messages: The list of read messages
+
+    Messages may be received and read from different threads.
      """
 
     def __init__(self):
@@ -15,23 +18,37 @@ class Mailbox:
         """
         self.__unread_messages = []
         self.__read_messages = []
+        self.__lock = threading.Lock()
 
     def receive_messages(self, message):
         """ Receive a message and add it in the unread messages list.
         """
-        self.__unread_messages.append(message)
+        with self.__lock:
+            self.__unread_messages.append(message)
 
     def get_new_messages(self):
         """ Return all the messages from unread messages list.
         """
-        unread_messages = self.__unread_messages.copy()
+        with self.__lock:
+            unread_messages = self.__unread_messages
+            self.__unread_messages = []
         if len(unread_messages) > 0:
             for messages in unread_messages:
                 self.__read_messages.append(messages)
 
-        self.__unread_messages.clear()
         return unread_messages
 
+    def peek_new_messages(self):
+        """ Return the unread messages without marking them as read.
+        """
+        with self.__lock:
+            return self.__unread_messages.copy()
+
+    def has_new_messages(self):
+        """ Return whether there are unread messages.
+        """
+        return len(self.__unread_messages) > 0
+
     def get_messages(self):
         """ Return all the messages from both unread and read messages list.
         """
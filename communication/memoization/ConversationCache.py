@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+import hashlib
+from collections import OrderedDict
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from arguments.Argument import Argument
+from arguments.Argumentation import Argumentation
+from conversational_model.FSM import Turn
+from message.MessagePerformative import MessagePerformative
+from preferences.Item import Item
+
+if TYPE_CHECKING:
+    from ArgumentAgent import ArgumentAgent
+
+
+def conversation_key(
+    agent: "ArgumentAgent", other: "ArgumentAgent", item: Item
+) -> bytes:
+    """Return the digest of what the outcome of a conversation opened by agent with
+    other, proposing item, depends on: the items and preferences of both agents, and
+    the items each agreed on, proposed and the arguments each used with the other.
+    Agent names are left out, so that agents with the same data share outcomes."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update("\0".join(x.get_name() for x in agent.list_items).encode("utf-8"))
+    digest.update(b"\1" + item.get_name().encode("utf-8"))
+    for first, second in ((agent, other), (other, agent)):
+        preferences = first.preferences
+        digest.update(b"\1" + preferences.get_value_matrix(first.list_items).tobytes())
+        digest.update(bytes(x.value for x in preferences.get_criterion_name_list()))
+        partner = second.get_name()
+        argumentation = first.argumentations.get(partner)
+        for names in (
+            first.agreed_items.get(partner, ()),
+            first.proposed_items.get(partner, ()),
+            (
+                ()
+                if argumentation is None
+                else [str(x) for x in argumentation.all_arguments()]
+            ),
+        ):
+            digest.update(b"\1" + "\0".join(sorted(names)).encode("utf-8"))
+    return digest.digest()
+
+
+class ConversationOutcome:
+    """ConversationOutcome class.
+    Class implementing the result of a conversation following the standard behavior,
+    from the proposal of the opening agent, side 0, to its close, without agent
+    names: it is replayed on any pair of agents with the same key.
+
+    attr:
+        item: the name of the item proposed (str)
+        agreed: the name of the item agreed on, None if there is none (str)
+        arguments: the arguments used, in order, as (side, item name, key given by
+            Argument.to_key, index of the parent argument or -1) (list)
+        states: the final state and turn of each side (tuple)
+        num_messages: the number of messages of the conversation (int)
+    """
+
+    __slots__ = ("item", "agreed", "arguments", "states", "num_messages")
+
+    def __init__(self, item: str):
+        """Create a new ConversationOutcome for a proposal of item."""
+        self.item = item
+        self.agreed: Optional[str] = None
+        self.arguments: List[Tuple[int, str, int, int]] = []
+        self.states: Tuple[Tuple[MessagePerformative, int], ...] = ()
+        self.num_messages = 0
+
+    def performatives(self) -> List[MessagePerformative]:
+        """Return the performatives of the messages of the conversation, in
+        order."""
+        performatives = [MessagePerformative.PROPOSE]
+        if self.arguments:
+            performatives += [MessagePerformative.ASK_WHY, MessagePerformative.BECAUSE]
+            performatives += [MessagePerformative.ARGUE] * (len(self.arguments) - 1)
+        if self.agreed is None:
+            return performatives + [MessagePerformative.QUERY_REF]
+        return performatives + [
+            MessagePerformative.ACCEPT,
+            MessagePerformative.COMMIT,
+            MessagePerformative.ACK,
+        ]
+
+    def apply(
+        self,
+        agent: "ArgumentAgent",
+        other: "ArgumentAgent",
+        arguments: bool = True,
+    ) -> None:
+        """Record the outcome in the two agents, agent having opened the
+        conversation: the proposal, the arguments used unless arguments is False, the
+        item agreed on, and the final states of the conversation. Its messages are
+        counted in the metrics of the model of agent, if any."""
+        sides = (agent, other)
+        agent.proposed_items.setdefault(other.get_name(), []).append(self.item)
+        if arguments:
+            used: List[Argument] = []
+            for side, item_name, key, parent in self.arguments:
+                sender = sides[side]
+                argument = Argument.from_key(
+                    key, sender.get_item(item_name), sender.get_name()
+                )
+                add_argument(
+                    sender,
+                    sides[1 - side].get_name(),
+                    argument,
+                    used[parent] if parent >= 0 else None,
+                )
+                used.append(argument)
+        for side, (state, turn) in enumerate(self.states):
+            first, partner = sides[side], sides[1 - side].get_name()
+            if self.agreed is not None:
+                agreed = first.agreed_items.setdefault(partner, [])
+                if self.agreed not in agreed:
+                    agreed.append(self.agreed)
+            conversation = first.conversations[partner]
+            conversation.current_state = state
+            conversation.turn = turn
+        other.conversation_manager.update(agent.get_name())
+        metrics = getattr(agent.model, "metrics", None)
+        if metrics is not None:
+            for performative in self.performatives():
+                metrics.count_message(performative)
+
+
+def add_argument(
+    agent: "ArgumentAgent",
+    partner: str,
+    argument: Argument,
+    parent: Optional[Argument],
+) -> None:
+    """Record an argument agent used with partner, as build_argue and build_because
+    do."""
+    if partner not in agent.argumentations:
+        agent.argumentations[partner] = Argumentation(agent.get_name(), partner)
+    agent.argumentations[partner].add_argument(argument)
+    argument.set_parent(parent)
+
+
+def negotiate(
+    agent: "ArgumentAgent",
+    other: "ArgumentAgent",
+    item: Item,
+) -> ConversationOutcome:
+    """Run at once the conversation of the standard behavior opened by agent
+    proposing item to other, and return its outcome. The arguments are recorded in
+    the agents as they are used, the rest of the outcome is left to apply."""
+    sides = (agent, other)
+    outcome = ConversationOutcome(item.get_name())
+    outcome.num_messages = 1
+    if other.preferences.is_item_among_top_10_percent(item, other.list_items):
+        closing, closed_on = 1, item.get_name()
+        performative = MessagePerformative.ACCEPT
+    else:
+        # ASK_WHY, then BECAUSE with the best support of the item.
+        used = [agent.support_proposal(item.get_name(), other.get_name())]
+        outcome.arguments.append((0, item.get_name(), used[0].to_key(), -1))
+        add_argument(agent, other.get_name(), used[0], None)
+        outcome.num_messages += 2
+        sender = 0
+        while True:
+            receiver = 1 - sender
+            argument = used[-1]
+            reply = sides[receiver].parse_argument(argument)
+            if reply is None:
+                closing, closed_on = receiver, argument.get_item().get_name()
+                performative = (
+                    MessagePerformative.ACCEPT
+                    if argument.decision
+                    else MessagePerformative.QUERY_REF
+                )
+                break
+            outcome.arguments.append(
+                (receiver, reply.get_item().get_name(), reply.to_key(), len(used) - 1)
+            )
+            add_argument(sides[receiver], sides[sender].get_name(), reply, argument)
+            used.append(reply)
+            outcome.num_messages += 1
+            sender = receiver
+
+    initial = MessagePerformative.IDLE
+    if performative == MessagePerformative.ACCEPT:
+        # ACCEPT, COMMIT, then ACK closing the conversation of the accepting side.
+        outcome.agreed = closed_on
+        outcome.num_messages += 3
+        states = {closing: (initial, Turn.Me), 1 - closing: (initial, Turn.Other)}
+    else:
+        # QUERY_REF leaves the querying side waiting.
+        outcome.num_messages += 1
+        states = {
+            closing: (performative, Turn.Other),
+            1 - closing: (initial, Turn.Other),
+        }
+    outcome.states = (states[0], states[1])
+    return outcome
+
+
+class ConversationCache:
+    """ConversationCache class.
+    Class implementing the memoization of whole conversations following the standard
+    behavior. A conversation is resolved at once when it is opened with a proposal:
+    its outcome is looked up by conversation_key, or computed by negotiate, and
+    recorded in the two agents. Outcomes are kept for the maxsize least recently
+    used keys; the cache may be shared by several models.
+
+    attr:
+        maxsize: the number of outcomes kept, None for no limit (int)
+        hits: the number of conversations resolved from the cache (int)
+        misses: the number of conversations negotiated (int)
+        evictions: the number of outcomes evicted (int)
+    """
+
+    def __init__(self, maxsize: Optional[int] = 4096):
+        """Create a new empty ConversationCache."""
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__outcomes: OrderedDict[bytes, ConversationOutcome] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.__outcomes)
+
+    @property
+    def hit_rate(self) -> float:
+        """The share of the conversations resolved from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        """Return the counters of the cache."""
+        return {
+            "size": len(self),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
+
+    def resolve(
+        self,
+        agent: "ArgumentAgent",
+        other: "ArgumentAgent",
+        item: Item,
+    ) -> ConversationOutcome:
+        """Resolve the conversation opened by agent proposing item to other, and
+        return its outcome."""
+        key = conversation_key(agent, other, item)
+        outcome = self.__outcomes.get(key)
+        if outcome is not None:
+            self.hits += 1
+            self.__outcomes.move_to_end(key)
+            outcome.apply(agent, other)
+            return outcome
+
+        self.misses += 1
+        outcome = negotiate(agent, other, item)
+        outcome.apply(agent, other, arguments=False)
+        self.__outcomes[key] = outcome
+        if self.maxsize is not None:
+            while len(self.__outcomes) > self.maxsize:
+                self.__outcomes.popitem(last=False)
+                self.evictions += 1
+        return outcome
+
+    def clear(self) -> None:
+        """Forget every outcome, keeping the counters."""
+        self.__outcomes.clear()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+from typing import List, Tuple
+
+from arguments.Argument import Argument
+from message.Message import Message
+from message.MessagePerformative import MessagePerformative
+from preferences.Item import Item
+
+
+class MessageCodec:
+    """MessageCodec class.
+    Class converting messages to and from compact integer tuples
+    (sender, receiver, performative, item, argument):
+        - sender and receiver are indices in the agent name list,
+        - performative is the MessagePerformative value,
+        - item is an index in the item list, or -1 if the message has no content,
+        - argument is the key of the argument carried (see Argument.to_key), or -1.
+
+    The parent of an argument is not encoded.
+
+    attr:
+        agent_names: the agent names, in index order (list)
+        items: the items, in index order (list)
+    """
+
+    def __init__(self, agent_names: List[str], items: List[Item]):
+        """Create a new MessageCodec."""
+        self.agent_names = list(agent_names)
+        self.items = list(items)
+        self.__agent_ids = {name: idx for idx, name in enumerate(self.agent_names)}
+        self.__item_ids = {item.get_name(): idx for idx, item in enumerate(self.items)}
+
+    def agent_id(self, name: str) -> int:
+        """Return the index of an agent name."""
+        return self.__agent_ids[name]
+
+    def item_id(self, name: str) -> int:
+        """Return the index of an item name, or -1 if it is unknown."""
+        return self.__item_ids.get(name, -1)
+
+    def encode(self, message: Message) -> Tuple[int, int, int, int, int]:
+        """Return the integer tuple describing a message."""
+        content = message.get_content()
+        item, argument = -1, -1
+        if isinstance(content, Argument):
+            item = self.__item_ids[content.get_item().get_name()]
+            argument = content.to_key()
+        elif content is not None:
+            item = self.__item_ids.get(content, -1)
+
+        return (
+            self.__agent_ids[message.get_exp()],
+            self.__agent_ids[message.get_dest()],
+            message.get_performative().value,
+            item,
+            argument,
+        )
+
+    def decode(
+        self,
+        sender: int,
+        receiver: int,
+        performative: int,
+        item: int,
+        argument: int,
+    ) -> Message:
+        """Rebuild a message from its integer tuple."""
+        sender_name = self.agent_names[sender]
+        content = None
+        if argument >= 0:
+            content = Argument.from_key(argument, self.items[item], sender_name)
+        elif item >= 0:
+            content = self.items[item].get_name()
+
+        return Message(
+            sender_name,
+            self.agent_names[receiver],
+            MessagePerformative(performative),
+            content,
+        )
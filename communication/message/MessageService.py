@@ -1,15 +1,24 @@
 #!/usr/bin/env python3
+import threading
 
 
 class MessageService:
     """MessageService class.
     Class implementing the message service used to dispatch messages between communicating agents.
 
-    Not intended to be created more than once: it's a singleton.
+    Each model creates its own service; get_instance() returns the last one created,
+    for agents whose model does not expose a message_service attribute.
+
+    Messages may be sent from several threads; the messages to proceed are then
+    queued in the order the threads send them.
 
     attr:
         scheduler: the scheduler of the sma (Scheduler)
         messages_to_proceed: the list of message to proceed mailbox of the agent (list)
+        profiler: counts the messages sent per performative when set (Profiler)
+        trace: records the messages sent, instead of printing them, when set (MessageTrace)
+        metrics: counts the messages sent per performative for the live metrics when
+            set (RunMetrics)
     """
 
     __instance = None
@@ -21,14 +30,16 @@ class MessageService:
 
     def __init__(self, scheduler, instant_delivery=True, verbose: bool = False):
         """Create a new MessageService object."""
-        if MessageService.__instance is not None:
-            raise Exception("This class is a singleton!")
-        else:
-            MessageService.__instance = self
-            self.__scheduler = scheduler
-            self.__instant_delivery = instant_delivery
-            self.__messages_to_proceed = []
-            self.verbose = verbose
+        MessageService.__instance = self
+        self.__scheduler = scheduler
+        self.__instant_delivery = instant_delivery
+        self.__messages_to_proceed = []
+        self.__agents_by_name = {}
+        self.__lock = threading.RLock()
+        self.verbose = verbose
+        self.profiler = None
+        self.trace = None
+        self.metrics = None
 
     def set_instant_delivery(self, instant_delivery):
         """Set the instant delivery parameter."""
@@ -36,12 +47,19 @@ class MessageService:
 
     def send_message(self, message):
         """Dispatch message if instant delivery active, otherwise add the message to proceed list."""
-        if self.verbose:
-            print("[MessageService] Message sent: " + str(message))
-        if self.__instant_delivery:
-            self.dispatch_message(message)
-        else:
-            self.__messages_to_proceed.append(message)
+        with self.__lock:
+            if self.trace is not None:
+                self.trace.record_message(self.__scheduler.steps, message)
+            elif self.verbose:
+                print("[MessageService] Message sent: " + str(message))
+            if self.profiler is not None:
+                self.profiler.count_message(message.get_performative())
+            if self.metrics is not None:
+                self.metrics.count_message(message.get_performative())
+            if not self.__instant_delivery:
+                self.__messages_to_proceed.append(message)
+                return
+        self.dispatch_message(message)
 
     def dispatch_message(self, message):
         """Dispatch the message to the right agent."""
@@ -49,14 +67,31 @@ class MessageService:
 
     def dispatch_messages(self):
         """Proceed each message received by the message service."""
-        if len(self.__messages_to_proceed) > 0:
-            for message in self.__messages_to_proceed:
+        with self.__lock:
+            messages_to_proceed = self.__messages_to_proceed
+            self.__messages_to_proceed = []
+        if len(messages_to_proceed) > 0:
+            for message in messages_to_proceed:
                 self.dispatch_message(message)
 
-        self.__messages_to_proceed.clear()
+    def get_messages_to_proceed(self):
+        """Return the messages waiting for the next dispatch."""
+        with self.__lock:
+            return self.__messages_to_proceed.copy()
+
+    def set_messages_to_proceed(self, messages):
+        """Replace the messages waiting for the next dispatch."""
+        with self.__lock:
+            self.__messages_to_proceed = list(messages)
 
     def find_agent_from_name(self, agent_name):
         """Return the agent according to the agent name given."""
-        for agent in self.__scheduler.agents:
-            if agent.get_name() == agent_name:
-                return agent
+        agent = self.__agents_by_name.get(agent_name)
+        if agent is None:
+            # Agents are added to the scheduler after the service is created.
+            with self.__lock:
+                self.__agents_by_name = {
+                    agent.get_name(): agent for agent in self.__scheduler.agents
+                }
+            agent = self.__agents_by_name.get(agent_name)
+        return agent
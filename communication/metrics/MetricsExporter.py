@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+import atexit
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional
+
+import numpy as np
+from message.MessagePerformative import MessagePerformative
+
+if TYPE_CHECKING:
+    from ArgumentModel import ArgumentModel
+
+
+def resident_set_size() -> int:
+    """Return the resident set size of the process in bytes, or its peak where
+    /proc is not available."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class RunMetrics:
+    """RunMetrics class.
+    Class implementing the counters of a running model: the steps run, the messages
+    sent per performative and the commitments, an ACK closing each of them. They are
+    plain integers incremented by ArgumentModel.step and by the MessageService,
+    within the lock it already holds, or by ConversationOutcome.apply for the
+    conversations resolved by a cache, whose messages are counted as if they had
+    been sent. A MetricsExporter reads them without locking: a sample may miss the
+    increments made while it is taken.
+
+    attr:
+        steps: the number of steps run (int)
+        messages: the number of messages sent, indexed by performative value (list)
+        commitments: the number of items agreed on by two agents (int)
+    """
+
+    __TABLE_SIZE = max(performative.value for performative in MessagePerformative) + 1
+
+    def __init__(self):
+        """Create new RunMetrics, all counters at 0."""
+        self.steps = 0
+        self.messages: List[int] = [0] * RunMetrics.__TABLE_SIZE
+        self.commitments = 0
+
+    def count_message(self, performative: MessagePerformative) -> None:
+        """Count a message sent, and the commitment an ACK closes."""
+        self.messages[performative.value] += 1
+        if performative == MessagePerformative.ACK:
+            self.commitments += 1
+
+
+class MetricsExporter:
+    """MetricsExporter class.
+    Class publishing the metrics of a running model from a background thread. Every
+    interval seconds the thread takes a sample:
+        - steps_total, steps_per_second,
+        - messages_total and messages_per_second, per performative,
+        - active_conversations: the conversations started and not finished,
+        - commitments_total: the items agreed on,
+        - mailbox_backlog: the messages sent and not read yet,
+        - resident_memory_bytes,
+    the rates being measured over the interval. The sample is rewritten as JSON to
+    path, and served in the Prometheus text format on http://host:port/metrics, when
+    they are given.
+
+    attr:
+        model: the model observed (ArgumentModel)
+        metrics: the counters of the model (RunMetrics)
+        interval: the time between two samples, in seconds (float)
+        path: the JSON file rewritten at each sample, or None (Path)
+        sample: the last sample taken (dict)
+    """
+
+    def __init__(
+        self,
+        model: "ArgumentModel",
+        metrics: RunMetrics,
+        interval: float = 1.0,
+        path: Optional[str] = None,
+        port: Optional[int] = None,
+        host: str = "127.0.0.1",
+    ):
+        """Create a new MetricsExporter and start its thread and its server."""
+        self.model = model
+        self.metrics = metrics
+        self.interval = interval
+        self.path = Path(path) if path is not None else None
+        self.__previous = (time.perf_counter(), 0, list(metrics.messages))
+        self.sample = None
+        self.take_sample()
+        self.__stopped = threading.Event()
+        self.__server: Optional[ThreadingHTTPServer] = None
+        if port is not None:
+            self.__server = ThreadingHTTPServer((host, port), self.__handler())
+            self.__server.daemon_threads = True
+            threading.Thread(
+                target=self.__server.serve_forever,
+                name="MetricsServer",
+                daemon=True,
+            ).start()
+        self.__sampler = threading.Thread(
+            target=self.__run,
+            name="MetricsSampler",
+            daemon=True,
+        )
+        self.__sampler.start()
+        atexit.register(self.close)
+
+    @property
+    def port(self) -> Optional[int]:
+        """The port the metrics are served on, None when they are not served."""
+        return None if self.__server is None else self.__server.server_address[1]
+
+    def take_sample(self) -> dict:
+        """Take a new sample of the metrics of the model, the rates being measured
+        since the previous sample, and return it."""
+        now = time.perf_counter()
+        steps, messages = self.metrics.steps, list(self.metrics.messages)
+        commitments = self.metrics.commitments
+        start, previous_steps, previous_messages = self.__previous
+        self.__previous = (now, steps, messages)
+        elapsed = max(now - start, 1e-9)
+
+        model = self.model
+        backlog = len(model.message_service.get_messages_to_proceed())
+        for agent in model.schedule.agent_buffer():
+            backlog += len(agent.get_mailbox().peek_new_messages())
+        self.sample = {
+            "steps_total": steps,
+            "steps_per_second": (steps - previous_steps) / elapsed,
+            "messages_total": {
+                performative.name: messages[performative.value]
+                for performative in MessagePerformative
+            },
+            "messages_per_second": {
+                performative.name: (
+                    messages[performative.value] - previous_messages[performative.value]
+                )
+                / elapsed
+                for performative in MessagePerformative
+            },
+            "active_conversations": int(np.count_nonzero(model.conversations.active())),
+            "commitments_total": commitments,
+            "mailbox_backlog": backlog,
+            "resident_memory_bytes": resident_set_size(),
+        }
+        return self.sample
+
+    def to_prometheus(self, sample: Optional[dict] = None) -> str:
+        """Return a sample, the last one by default, in the Prometheus text
+        format."""
+        sample = sample if sample is not None else self.sample
+        lines = []
+        for name, kind in (
+            ("steps_total", "counter"),
+            ("steps_per_second", "gauge"),
+            ("messages_total", "counter"),
+            ("messages_per_second", "gauge"),
+            ("active_conversations", "gauge"),
+            ("commitments_total", "counter"),
+            ("mailbox_backlog", "gauge"),
+            ("resident_memory_bytes", "gauge"),
+        ):
+            lines.append(f"# TYPE sma_{name} {kind}")
+            value = sample[name]
+            if isinstance(value, dict):
+                lines.extend(
+                    f'sma_{name}{{performative="{performative}"}} {count}'
+                    for performative, count in value.items()
+                )
+            else:
+                lines.append(f"sma_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def close(self) -> None:
+        """Take a last sample, and stop the thread and the server."""
+        if self.__stopped.is_set():
+            return
+        self.__stopped.set()
+        self.__sampler.join()
+        self.__publish()
+        if self.__server is not None:
+            self.__server.shutdown()
+            self.__server.server_close()
+        atexit.unregister(self.close)
+
+    def __run(self) -> None:
+        # Samples the metrics every interval until closed.
+        while not self.__stopped.wait(self.interval):
+            self.__publish()
+
+    def __publish(self) -> None:
+        # Takes a sample, and rewrites the JSON file.
+        self.take_sample()
+        if self.path is None:
+            return
+        partial = self.path.with_name(self.path.name + ".partial")
+        with open(partial, "w", encoding="utf-8") as metrics_file:
+            json.dump(self.sample, metrics_file)
+        os.replace(partial, self.path)
+
+    def __handler(self) -> type:
+        # The request handler serving the last sample.
+        exporter = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = exporter.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return MetricsHandler
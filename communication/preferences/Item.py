@@ -29,13 +29,7 @@ class Item:
         return preferences.get_value(self, criterion_name)
 
     def get_score(self, preferences):
-        """Returns the score of the Item according to agent preferences."""
-        criterion_weight = 100
-        sum_result = 0
-        for criterion_name in preferences.get_criterion_name_list():
-            sum_result = (
-                sum_result
-                + criterion_weight * self.get_value(preferences, criterion_name).value
-            )
-            criterion_weight = criterion_weight / 2
-        return sum_result
+        """Returns the score of the Item according to agent preferences: the sum of
+        its values weighted by 100 for the most important criterion, halved at each
+        rank."""
+        return preferences.get_score(self)
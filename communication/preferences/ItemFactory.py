@@ -1,9 +1,9 @@
+import csv
 import inspect
 from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import List
 
-import pandas as pd
 from preferences.CriterionName import CriterionName
 from preferences.Item import Item
 
@@ -21,12 +21,13 @@ class ItemCreatorCSV(ItemFactory):
         filename: str = "items.csv",
         file_separator: str = ",",
     ):
-        self.items_df = None
+        self.items_rows = None
+        self.columns = None
         self.filename = Path(path, filename)
         self.item_criterion = {}
         self.file_separator = file_separator
 
-        self.items_df = self.__get_data()
+        self.columns, self.items_rows = self.__get_data()
         self.__sanity_check_criteria()
 
     def create(self) -> tuple[List[Item], dict[Item, CriterionName]]:
@@ -34,28 +35,37 @@ class ItemCreatorCSV(ItemFactory):
 
     def __create_items(self) -> List[Item]:
         self.items_list = []
-        for idx, item in self.items_df.iterrows():
-            self.items_list.append(Item(idx, item["DESCRIPTION"]))
+        for item_name, item in self.items_rows:
+            self.items_list.append(Item(item_name, item["DESCRIPTION"]))
 
         return self.items_list
 
     def __create_item_criterion_map(
         self,
     ) -> dict[Item, dict[CriterionName, int | float]]:
-        criteria = set(self.items_df.columns) - {"ITEM_NAME", "DESCRIPTION"}
-        for item_name, item in self.items_df.iterrows():
+        # Keep the column order so that the criteria are listed identically in
+        # every run, whatever the string hash seed.
+        criteria = [x for x in self.columns if x not in {"ITEM_NAME", "DESCRIPTION"}]
+        for item_name, item in self.items_rows:
             self.item_criterion[item_name] = {}
             for criterion in criteria:
                 self.item_criterion[item_name][criterion] = item[criterion]
 
         return self.item_criterion
 
-    def __get_data(self):
-        return pd.read_csv(
-            self.filename,
-            sep=self.file_separator,
-            index_col="ITEM_NAME",
-        )
+    def __get_data(self) -> tuple[List[str], List[tuple[str, dict]]]:
+        # Plain csv parsing keeps pandas out of the model start-up path.
+        with open(self.filename, newline="", encoding="utf-8") as csv_file:
+            reader = csv.DictReader(csv_file, delimiter=self.file_separator)
+            columns = [x for x in reader.fieldnames if x != "ITEM_NAME"]
+            rows = []
+            for row in reader:
+                item_name = row.pop("ITEM_NAME")
+                for column in columns:
+                    if column != "DESCRIPTION":
+                        row[column] = float(row[column])
+                rows.append((item_name, row))
+        return columns, rows
 
     def __sanity_check_criteria(self) -> None:
         # https://stackoverflow.com/questions/9058305/getting-attributes-of-a-class
@@ -77,7 +87,7 @@ class ItemCreatorCSV(ItemFactory):
         )
 
         columns = sorted(
-            set(self.items_df.columns) - {"ITEM_NAME", "DESCRIPTION"},
+            set(self.columns) - {"ITEM_NAME", "DESCRIPTION"},
         )
 
         assert (
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+import json
+import os
+import struct
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Tuple
+
+import numpy as np
+from preferences.CriterionName import CriterionName
+from preferences.CriterionValue import CriterionValue
+from preferences.Item import Item
+from preferences.PreferenceModel import PreferenceModel
+
+if TYPE_CHECKING:
+    from ArgumentAgent import ArgumentAgent
+
+PROFILES_MAGIC = b"SMAPROFS"
+PROFILES_VERSION = 1
+
+_HEADER_PREFIX = struct.Struct("<8sII")
+# The records start on a multiple of this offset, for memory mapping.
+_ALIGNMENT = 64
+
+
+def profile_record_dtype(num_items: int) -> np.dtype:
+    """Return the dtype of the record of one agent: the values of its criteria, most
+    important first, the thresholds of its interval profile on each criterion (NaN
+    when unknown) and the index in PreferenceModel.VALUES of the Value of each item
+    on each criterion, criteria being indexed by CriterionName value."""
+    num_criteria = len(CriterionName)
+    return np.dtype(
+        [
+            ("criterion_order", "u1", (num_criteria,)),
+            ("thresholds", "<f8", (num_criteria, len(PreferenceModel.VALUES) - 1)),
+            ("values", "u1", (num_items, num_criteria)),
+        ]
+    )
+
+
+class PopulationProfiles:
+    """PopulationProfiles class.
+    Class implementing the preferences of a whole population, as one record of
+    profile_record_dtype per agent, so that a population generated once can be
+    saved, and given to ArgumentModel to skip the generation of the preferences.
+
+    A profiles file holds a header (magic, version, length of a JSON header giving
+    the agent names and the items) and the records, aligned so that they can be
+    memory-mapped: the record of an agent is then only read from the disk when it is
+    used.
+
+    attr:
+        agent_names: the agent names, indexed like the records (list)
+        items: the items the preferences are about (list)
+        records: one record per agent (np.ndarray)
+    """
+
+    def __init__(
+        self,
+        agent_names: List[str],
+        items: List[Item],
+        records: np.ndarray,
+    ):
+        """Create new PopulationProfiles."""
+        self.agent_names = list(agent_names)
+        self.items = list(items)
+        self.records = records
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @staticmethod
+    def from_agents(agents: List["ArgumentAgent"]) -> "PopulationProfiles":
+        """Return the profiles of agents whose preferences were set."""
+        items = agents[0].list_items if agents else []
+        records = np.zeros(len(agents), dtype=profile_record_dtype(len(items)))
+        records["thresholds"] = np.nan
+        for idx, agent in enumerate(agents):
+            records["criterion_order"][idx] = [
+                criterion.value
+                for criterion in agent.preferences.get_criterion_name_list()
+            ]
+            if agent.thresholds is not None:
+                records["thresholds"][idx] = agent.thresholds
+            records["values"][idx] = agent.preferences.get_value_matrix(items)
+        return PopulationProfiles([x.get_name() for x in agents], items, records)
+
+    def get_agent_preferences(
+        self,
+        idx: int,
+    ) -> Tuple[List[CriterionName], List[CriterionValue], np.ndarray]:
+        """Return the criterion names, most important first, the criterion values
+        and the thresholds of an agent, as ArgumentAgent.set_preferences takes
+        them."""
+        record = self.records[idx]
+        values = record["values"].tolist()
+        return (
+            [CriterionName(x) for x in record["criterion_order"].tolist()],
+            [
+                CriterionValue(
+                    item, criterion, PreferenceModel.VALUES[row[criterion.value]]
+                )
+                for criterion in CriterionName
+                for item, row in zip(self.items, values)
+            ],
+            np.array(record["thresholds"]),
+        )
+
+    def save(self, path: str) -> None:
+        """Write the profiles to path, next to it first and then moved over it."""
+        header = json.dumps(
+            {
+                "agents": self.agent_names,
+                "items": [item.get_name() for item in self.items],
+                "descriptions": [item.get_description() for item in self.items],
+                "criteria": [criterion.name for criterion in CriterionName],
+            }
+        ).encode("utf-8")
+        prefix_size = _HEADER_PREFIX.size + len(header)
+        padding = -prefix_size % _ALIGNMENT
+
+        path = Path(path)
+        partial = path.with_name(path.name + ".partial")
+        with open(partial, "wb") as profiles_file:
+            profiles_file.write(
+                _HEADER_PREFIX.pack(PROFILES_MAGIC, PROFILES_VERSION, len(header))
+            )
+            profiles_file.write(header + b" " * padding)
+            profiles_file.write(
+                np.ascontiguousarray(
+                    self.records,
+                    dtype=profile_record_dtype(len(self.items)),
+                ).tobytes()
+            )
+        os.replace(partial, path)
+
+    @staticmethod
+    def load(path: str, mmap: bool = True) -> "PopulationProfiles":
+        """Read profiles written by save, memory-mapped unless mmap is False."""
+        with open(path, "rb") as profiles_file:
+            magic, version, header_length = _HEADER_PREFIX.unpack(
+                profiles_file.read(_HEADER_PREFIX.size)
+            )
+            if magic != PROFILES_MAGIC or version != PROFILES_VERSION:
+                raise ValueError(f"{path} is not a version {PROFILES_VERSION} profiles")
+            header = json.loads(profiles_file.read(header_length).decode("utf-8"))
+        if header["criteria"] != [criterion.name for criterion in CriterionName]:
+            raise ValueError(f"The criteria of {path} are not those of CriterionName")
+
+        items = [
+            Item(name, description)
+            for name, description in zip(header["items"], header["descriptions"])
+        ]
+        dtype = profile_record_dtype(len(items))
+        prefix_size = _HEADER_PREFIX.size + header_length
+        offset = prefix_size + (-prefix_size % _ALIGNMENT)
+        count = len(header["agents"])
+        if mmap and count:
+            records = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=count)
+        else:
+            records = np.fromfile(path, dtype=dtype, count=count, offset=offset)
+        return PopulationProfiles(header["agents"], items, records)
@@ -1,31 +1,96 @@
-import inspect
 from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Dict, List
 
 import numpy as np
-import pandas as pd
 from preferences.CriterionName import CriterionName
 from preferences.Item import Item
 from preferences.Value import Value
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 class PreferenceModel(ABC):
+    """PreferenceModel class.
+    Class turning the real values of the items on the criteria into Values, each
+    criterion being cut into len(Value) intervals by increasing thresholds. On a
+    benefit criterion the highest interval is VERY_GOOD, on a cost criterion it is
+    VERY_BAD.
+
+    attr:
+        map_item_criterion: the real value of each item on each criterion (dict)
+    """
+
+    # The values, worst first.
+    VALUES: List[Value] = sorted(Value, key=lambda value: value.value)
+
     def __init__(self) -> None:
         super().__init__()
 
     @abstractmethod
-    def get_value_from_data(self, item: Item, criterion_name: CriterionName) -> Value:
+    def get_thresholds(self, criterion_name: CriterionName) -> np.ndarray:
+        """Returns the len(Value) - 1 increasing thresholds of a criterion."""
         pass
 
+    def classify(
+        self,
+        criterion_name: CriterionName,
+        real_values: np.ndarray,
+    ) -> np.ndarray:
+        """Returns the index in VALUES of the Value of real values on a criterion:
+        the number of thresholds they exceed, reversed on cost criteria."""
+        value_idx = np.searchsorted(
+            self.get_thresholds(criterion_name),
+            real_values,
+            side="left",
+        )
+        if not CriterionName.is_positive_criterion(criterion_name):
+            value_idx = len(PreferenceModel.VALUES) - 1 - value_idx
+        return value_idx
+
+    def get_value_from_data(self, item: Item, criterion_name: CriterionName) -> Value:
+        """Returns the Value of an item on a criterion."""
+        real_value = self.map_item_criterion[item.get_name()][criterion_name.name]
+        return PreferenceModel.VALUES[int(self.classify(criterion_name, real_value))]
+
+    def get_values_from_data(
+        self,
+        items: List[Item],
+        criterion_names: List[CriterionName],
+    ) -> np.ndarray:
+        """Returns the index in VALUES of the Value of every item (rows) on every
+        criterion (columns)."""
+        real_values = np.array(
+            [
+                [
+                    self.map_item_criterion[item.get_name()][criterion_name.name]
+                    for criterion_name in criterion_names
+                ]
+                for item in items
+            ],
+            dtype=float,
+        ).reshape(len(items), len(criterion_names))
+        value_idx = np.empty(real_values.shape, dtype=np.int64)
+        for column, criterion_name in enumerate(criterion_names):
+            value_idx[:, column] = self.classify(criterion_name, real_values[:, column])
+        return value_idx
+
 
 class IntervalProfileCSV(PreferenceModel):
     def __init__(
         self,
         map_item_criterion: dict[Item, dict[CriterionName, int | float]],
         verbose: bool = True,
+        filename: str = "profiles.csv",
     ) -> None:
         super().__init__()
         self.map_item_criterion = map_item_criterion
-        self.profile_df = self.__get_profile()
+        self.profile_df = self.__get_profile(filename)
+        # The thresholds of each criterion, compiled once.
+        self.criterion_profile: Dict[str, np.ndarray] = {
+            criterion: np.sort(self.profile_df.loc[criterion].to_numpy(dtype=float))
+            for criterion in self.profile_df.index
+        }
 
         if verbose:
             print("Profiles: ")
@@ -33,37 +98,13 @@ class IntervalProfileCSV(PreferenceModel):
             print(self.profile_df)
             print("---------------------------")
 
-    def __get_profile(self, filename: str = "profiles.csv") -> pd.DataFrame:
-        return pd.read_csv(filename, sep=",", index_col="CRITERIA")
-
-    def get_value_from_data(self, item: Item, criterion_name: CriterionName) -> Value:
-        value_attributes = inspect.getmembers(
-            Value,
-            lambda a: not (inspect.isroutine(a)),
-        )
-
-        value_list = [
-            a
-            for a in value_attributes
-            if not (
-                (a[0].startswith("__") and a[0].endswith("__"))
-                or "name" in a[0]
-                or "value" in a[0]
-            )
-        ]
-
-        value_list = sorted(value_list, key=lambda x: x[1].value)
+    def __get_profile(self, filename: str = "profiles.csv") -> "pd.DataFrame":
+        import pandas as pd
 
-        profiles = self.profile_df.loc[criterion_name.name].to_numpy()
-        profiles = np.concatenate(([-np.inf], profiles, [np.inf]))
-
-        real_value = self.map_item_criterion[item.get_name()][criterion_name.name]
-
-        value_idx = np.argwhere(real_value > profiles)[-1][0]
-
-        value = value_list[value_idx][1]
+        return pd.read_csv(filename, sep=",", index_col="CRITERIA")
 
-        return value
+    def get_thresholds(self, criterion_name: CriterionName) -> np.ndarray:
+        return self.criterion_profile[criterion_name.name]
 
 
 class RandomIntervalProfile(PreferenceModel):
@@ -71,67 +112,49 @@ class RandomIntervalProfile(PreferenceModel):
         self,
         map_item_criterion: dict[Item, dict[CriterionName, int | float]],
         verbose: int = 0,
+        rng: np.random.Generator = None,
     ) -> None:
         super().__init__()
-        self.map_item_criterion = pd.DataFrame(map_item_criterion)
-
-        value_attributes = inspect.getmembers(
-            Value,
-            lambda a: not (inspect.isroutine(a)),
-        )
-
-        self.value_list = [
-            a
-            for a in value_attributes
-            if not (
-                (a[0].startswith("__") and a[0].endswith("__"))
-                or "name" in a[0]
-                or "value" in a[0]
-            )
-        ]
-
-        self.value_list = sorted(self.value_list, key=lambda x: x[1].value)
+        self.map_item_criterion = map_item_criterion
+        self.rng = rng if rng is not None else np.random.default_rng()
 
         self.__get_profile()
 
         if verbose == 2:
+            import pandas as pd
+
             print("Generated Random Profiles: ")
             print("---------------------------")
             print(
                 pd.DataFrame(self.criterion_profile)[1:-1]
                 .transpose()
                 .rename(
-                    columns={i + 1: f"P{i+1}" for i in range(len(self.value_list) - 1)},
+                    columns={
+                        i + 1: f"P{i+1}" for i in range(len(PreferenceModel.VALUES) - 1)
+                    },
                 ),
             )
             print("---------------------------")
 
     def __get_profile(self):
         self.criterion_profile = {}
-        criteria_list = self.map_item_criterion.index
+        criteria_list = next(iter(self.map_item_criterion.values())).keys()
 
         for criterion in criteria_list:
-            max_value = self.map_item_criterion.loc[criterion].max()
+            max_value = max(
+                item_criterion[criterion]
+                for item_criterion in self.map_item_criterion.values()
+            )
 
             profiles = np.concatenate(
                 (
                     [-np.inf],
-                    max_value * np.random.random(len(self.value_list) - 1),
+                    max_value * self.rng.random(len(PreferenceModel.VALUES) - 1),
                     [np.inf],
                 ),
             )
             profiles.sort()
             self.criterion_profile[criterion] = profiles
 
-    def get_value_from_data(self, item: Item, criterion_name: CriterionName) -> Value:
-        real_value = self.map_item_criterion[item.get_name()][criterion_name.name]
-
-        profiles = self.criterion_profile[criterion_name.name]
-        value_idx = np.argwhere(real_value > profiles)[-1][0]
-
-        if not CriterionName.is_positive_criterion(criterion_name):
-            value_idx = len(self.value_list) - 1 - value_idx
-
-        value = self.value_list[value_idx][1]
-
-        return value
+    def get_thresholds(self, criterion_name: CriterionName) -> np.ndarray:
+        return self.criterion_profile[criterion_name.name][1:-1]
@@ -1,7 +1,7 @@
 import os
 import sys
 from math import ceil
-from typing import Callable, List
+from typing import Callable, Dict, List, Optional, Tuple
 
 import numpy as np
 from preferences.CriterionName import CriterionName
@@ -21,6 +21,10 @@ class Preferences:
     attr:
         criterion_name_list: the list of criterion name (ordered by importance)
         criterion_value_list: the list of criterion value
+
+    Values, criterion ranks, item scores and the premisses supporting and attacking
+    each item are read from an index, built by build_index or on first use, and
+    built again after the preferences change.
     """
 
     def __init__(
@@ -31,6 +35,7 @@ class Preferences:
         """Creates a new Preferences object."""
         self.__criterion_name_list: list[CriterionName] = []
         self.__criterion_value_list: list[CriterionValue] = []
+        self.__invalidate_index()
         self.__decide: Callable[
             [Preferences, Message, MessagePerformative, List[MessagePerformative]],
             MessagePerformative,
@@ -46,11 +51,20 @@ class Preferences:
         input: Message,
         current_state: MessagePerformative,
         next_states: List[MessagePerformative],
+        context=None,
     ) -> MessagePerformative:
-        return self.__decide(self, input, current_state, next_states)
+        """Returns the next state; what it computes may be kept in context, a
+        TransitionContext."""
+        return self.__decide(self, input, current_state, next_states, context)
 
-    def build_message(self, input: Message, next_state: MessagePerformative) -> Message:
-        return self.__build_message(self, input, next_state)
+    def build_message(
+        self,
+        input: Message,
+        next_state: MessagePerformative,
+        context=None,
+    ) -> Message:
+        """Builds the message of the transition to next_state, reusing context."""
+        return self.__build_message(self, input, next_state, context)
 
     def get_criterion_name_list(self) -> list[CriterionName]:
         """Returns the list of criterion name."""
@@ -63,20 +77,132 @@ class Preferences:
     def set_criterion_name_list(self, criterion_name_list: list[CriterionName]) -> None:
         """Sets the list of criterion name."""
         self.__criterion_name_list = criterion_name_list
+        self.__invalidate_index()
 
     def add_criterion_value(self, criterion_value: list[CriterionValue]) -> None:
         """Adds a criterion value in the list."""
         self.__criterion_value_list.append(criterion_value)
+        self.__invalidate_index()
+
+    def build_index(self) -> None:
+        """Indexes the preferences: the value of each item on each criterion, the
+        rank and weight of each criterion, the score of each item, and for each item
+        the (criterion name, value) premisses supporting it (GOOD or VERY_GOOD
+        values) and attacking it (BAD or VERY_BAD values), ordered by importance of
+        the criterion."""
+        self.__values = {}
+        for value in self.__criterion_value_list:
+            self.__values.setdefault(
+                (value.get_item().get_name(), value.get_criterion_name()),
+                value.get_value(),
+            )
+
+        self.__ranks = [None] * len(CriterionName)
+        self.__weights = np.zeros(len(CriterionName))
+        weight = 100
+        for rank, criterion_name in enumerate(self.__criterion_name_list):
+            if self.__ranks[criterion_name.value] is None:
+                self.__ranks[criterion_name.value] = rank
+            self.__weights[criterion_name.value] += weight
+            weight = weight / 2
+
+        # One row per item, in the order the items were first given a value, and
+        # one column per criterion, indexed by its value. Missing values are 0.
+        self.__item_rows = {}
+        for item_name, _ in self.__values:
+            self.__item_rows.setdefault(item_name, len(self.__item_rows))
+        self.__value_matrix = np.zeros(
+            (len(self.__item_rows), len(CriterionName)),
+            dtype=np.uint8,
+        )
+        if self.__values:
+            self.__value_matrix[
+                [self.__item_rows[name] for name, _ in self.__values],
+                [criterion_name.value for _, criterion_name in self.__values],
+            ] = [value.value for value in self.__values.values()]
+        self.__scores = dict(
+            zip(self.__item_rows, (self.__value_matrix @ self.__weights).tolist())
+        )
+
+        self.__premisses = {}
+        for item_name in self.__item_rows:
+            supporting, attacking = [], []
+            for criterion_name in self.__criterion_name_list:
+                value = self.__values.get((item_name, criterion_name))
+                if value == Value.VERY_GOOD or value == Value.GOOD:
+                    supporting.append((criterion_name, value))
+                elif value == Value.VERY_BAD or value == Value.BAD:
+                    attacking.append((criterion_name, value))
+            self.__premisses[item_name] = (tuple(supporting), tuple(attacking))
+
+    def __invalidate_index(self) -> None:
+        self.__values: Optional[Dict[Tuple[str, CriterionName], Value]] = None
+        self.__ranks: Optional[List[Optional[int]]] = None
+        self.__weights: Optional[np.ndarray] = None
+        self.__item_rows: Optional[Dict[str, int]] = None
+        self.__value_matrix: Optional[np.ndarray] = None
+        self.__scores: Optional[Dict[str, float]] = None
+        self.__premisses: Optional[Dict[str, Tuple[tuple, tuple]]] = None
 
     def get_value(self, item: Item, criterion_name: CriterionName) -> Value:
         """Gets the value for a given item and a given criterion name."""
-        for value in self.__criterion_value_list:
-            if (
-                value.get_item().get_name() == item.get_name()
-                and value.get_criterion_name() == criterion_name
-            ):
-                return value.get_value()
-        return None
+        if self.__values is None:
+            self.build_index()
+        return self.__values.get((item.get_name(), criterion_name))
+
+    def get_criterion_rank(self, criterion_name: CriterionName) -> Optional[int]:
+        """Gets the rank of a criterion name, 0 being the most important, or None if
+        it is not in the list."""
+        if self.__ranks is None:
+            self.build_index()
+        return self.__ranks[criterion_name.value]
+
+    def get_criterion_weights(self) -> np.ndarray:
+        """Gets the weight of each criterion in the item scores, indexed by criterion
+        value: 100 for the most important criterion, halved at each rank."""
+        if self.__weights is None:
+            self.build_index()
+        return self.__weights
+
+    def get_value_matrix(self, item_list: Optional[list[Item]] = None) -> np.ndarray:
+        """Gets the values of the items, one row per item and one column per
+        criterion value, for all the items valued by default."""
+        if self.__value_matrix is None:
+            self.build_index()
+        if item_list is None:
+            return self.__value_matrix
+        rows = [self.__item_rows[item.get_name()] for item in item_list]
+        if rows == list(range(len(self.__item_rows))):
+            return self.__value_matrix
+        return self.__value_matrix[rows]
+
+    def get_score(self, item: Item) -> float:
+        """Gets the score of an item."""
+        if self.__scores is None:
+            self.build_index()
+        return self.__scores[item.get_name()]
+
+    def get_scores(self, item_list: list[Item]) -> np.ndarray:
+        """Gets the scores of a list of items."""
+        return self.get_value_matrix(item_list) @ self.get_criterion_weights()
+
+    def get_supporting_premisses(
+        self,
+        item: Item,
+    ) -> Tuple[Tuple[CriterionName, Value], ...]:
+        """Returns the premisses supporting an item, most important first."""
+        if self.__premisses is None:
+            self.build_index()
+        return self.__premisses.get(item.get_name(), ((), ()))[0]
+
+    def get_attacking_premisses(
+        self,
+        item: Item,
+    ) -> Tuple[Tuple[CriterionName, Value], ...]:
+        """Returns the premisses attacking an item, most important first."""
+        if self.__premisses is None:
+            self.build_index()
+        return self.__premisses.get(item.get_name(), ((), ()))[1]
 
     def is_preferred_criterion(
         self,
@@ -84,23 +210,37 @@ class Preferences:
         criterion_name_2: CriterionName,
     ) -> bool:
         """Returns if a criterion 1 is preferred to the criterion 2."""
-        for criterion_name in self.__criterion_name_list:
-            if criterion_name == criterion_name_1:
-                return True
-            if criterion_name == criterion_name_2:
-                return False
+        rank_1 = self.get_criterion_rank(criterion_name_1)
+        rank_2 = self.get_criterion_rank(criterion_name_2)
+        if rank_1 is not None and (rank_2 is None or rank_1 <= rank_2):
+            return True
+        if rank_2 is not None:
+            return False
 
     def is_preferred_item(self, item_1: Item, item_2: Item) -> bool:
         """Returns if the item 1 is preferred to the item 2."""
         return item_1.get_score(self) > item_2.get_score(self)
 
-    def most_preferred(self, item_list: list[Item]) -> Item:
-        """Returns the most preferred item from a list."""
+    def most_preferred(
+        self,
+        item_list: list[Item],
+        rng=None,
+        deterministic: bool = False,
+    ) -> Item:
+        """Returns the most preferred item from a list, ties being broken with rng
+        (a RandomStream) or, by default, the global numpy random state. When
+        deterministic, the first of the tied items in the list is returned, without
+        drawing."""
         liste = [(item.get_score(self), item) for item in item_list]
         max_val = liste[0][0]
         for val in liste:
             max_val = max(max_val, val[0])
-        return np.random.choice([item[1] for item in liste if item[0] == max_val])
+        best_items = [item[1] for item in liste if item[0] == max_val]
+        if deterministic:
+            return best_items[0]
+        if rng is None:
+            return np.random.choice(best_items)
+        return rng.choice(best_items)
 
     # Sort the items by their score
     def sort_items(self, item_list: list[Item]) -> list[tuple[float, Item]]:
@@ -115,9 +255,9 @@ class Preferences:
 
         :return: a boolean, True means that the item is among the favourite ones
         """
-        sorted_list = self.sort_items(item_list)
         max_index = ceil(len(item_list) / 10) - 1
-        return item.get_score(self) >= sorted_list[max_index][0]
+        scores = -self.get_scores(item_list)
+        return item.get_score(self) >= -np.partition(scores, max_index)[max_index]
 
 
 if __name__ == "__main__":
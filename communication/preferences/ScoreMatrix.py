@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+from typing import TYPE_CHECKING, List
+
+import numpy as np
+from preferences.Item import Item
+from preferences.Preferences import Preferences
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class ScoreMatrix:
+    """ScoreMatrix class.
+    Class implementing the score of every item for every agent of a population, as
+    an agents x items array computed in one batched product of the value tensor of
+    the population (agents x items x criteria) by the criterion weights of each agent
+    (agents x criteria). The scores are those of Item.get_score.
+
+    attr:
+        agent_names: the agent names, indexed like the rows (list)
+        item_names: the item names, indexed like the columns (list)
+        scores: the score of each item for each agent (np.ndarray)
+    """
+
+    def __init__(
+        self,
+        agent_names: List[str],
+        item_names: List[str],
+        scores: np.ndarray,
+    ):
+        """Create a new ScoreMatrix."""
+        self.agent_names = list(agent_names)
+        self.item_names = list(item_names)
+        self.scores = scores
+        self.__agent_rows = {name: idx for idx, name in enumerate(self.agent_names)}
+        self.__item_columns = {name: idx for idx, name in enumerate(self.item_names)}
+
+    @staticmethod
+    def from_preferences(
+        agent_names: List[str],
+        preferences_list: List[Preferences],
+        items: List[Item],
+    ) -> "ScoreMatrix":
+        """Compute the scores of items for agents with the given preferences."""
+        values = np.stack(
+            [preferences.get_value_matrix(items) for preferences in preferences_list]
+        )
+        weights = np.stack(
+            [preferences.get_criterion_weights() for preferences in preferences_list]
+        )
+        return ScoreMatrix(
+            agent_names,
+            [item.get_name() for item in items],
+            np.einsum("aic,ac->ai", values, weights),
+        )
+
+    def get_scores(self, agent_name: str) -> np.ndarray:
+        """Return the scores of the items for an agent."""
+        return self.scores[self.__agent_rows[agent_name]]
+
+    def get_score(self, agent_name: str, item_name: str) -> float:
+        """Return the score of an item for an agent."""
+        return float(
+            self.scores[self.__agent_rows[agent_name], self.__item_columns[item_name]]
+        )
+
+    def to_dataframe(self) -> "pd.DataFrame":
+        """Return the scores as a DataFrame, one row per agent."""
+        import pandas as pd
+
+        return pd.DataFrame(
+            self.scores,
+            index=self.agent_names,
+            columns=self.item_names,
+        )
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+import cProfile
+import threading
+import time
+from collections import Counter
+from functools import wraps
+from typing import Callable, Dict, List, Optional
+
+
+class Profiler:
+    """Profiler class.
+    Class accumulating the wall time and the number of calls of each phase of
+    ArgumentModel.step, and the number of messages sent per performative at each step.
+
+    Phases are measured inclusively: "init_conversation" contains the "decide" and
+    "build_message" calls made while opening a conversation.
+
+    Measures may be taken from several threads, the wall time of a phase then being
+    the sum over the threads.
+
+    Profiling is switched off by not creating a Profiler at all: the model and the
+    agents only wrap their hot functions when one is given, so a run without
+    profiling executes exactly the same code as before.
+
+    attr:
+        phase_times: cumulative wall time of each phase, in seconds (dict)
+        phase_calls: number of calls of each phase (dict)
+        messages_per_step: number of messages sent per performative, one Counter per step (list)
+        cprofile_phase: the phase for which cProfile statistics are collected (str)
+    """
+
+    PHASES = (
+        "dispatch_messages",
+        "collect",
+        "fsm_inference",
+        "decide",
+        "build_message",
+        "init_conversation",
+    )
+
+    def __init__(self, cprofile_phase: Optional[str] = None):
+        """Create a new Profiler."""
+        if cprofile_phase is not None and cprofile_phase not in Profiler.PHASES:
+            raise ValueError(
+                f"Unknown phase {cprofile_phase}, expected one of {Profiler.PHASES}"
+            )
+        self.phase_times: Dict[str, float] = {phase: 0.0 for phase in Profiler.PHASES}
+        self.phase_calls: Dict[str, int] = {phase: 0 for phase in Profiler.PHASES}
+        self.messages_per_step: List[Counter] = []
+        self.cprofile_phase = cprofile_phase
+        self.__cprofile = cProfile.Profile() if cprofile_phase else None
+        self.__lock = threading.Lock()
+
+    def wrap(self, phase: str, function: Callable) -> Callable:
+        """Return function instrumented as a call of the given phase."""
+        times = self.phase_times
+        calls = self.phase_calls
+        clock = time.perf_counter
+        lock = self.__lock
+
+        if phase == self.cprofile_phase:
+            cprofile = self.__cprofile
+
+            @wraps(function)
+            def profiled(*args, **kwargs):
+                start = clock()
+                cprofile.enable()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    cprofile.disable()
+                    elapsed = clock() - start
+                    with lock:
+                        times[phase] += elapsed
+                        calls[phase] += 1
+
+            return profiled
+
+        @wraps(function)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                with lock:
+                    times[phase] += elapsed
+                    calls[phase] += 1
+
+        return timed
+
+    def begin_step(self) -> None:
+        """Open the message counters of a new step."""
+        self.messages_per_step.append(Counter())
+
+    def count_message(self, performative) -> None:
+        """Count a message sent during the current step."""
+        with self.__lock:
+            if not self.messages_per_step:
+                self.messages_per_step.append(Counter())
+            self.messages_per_step[-1][performative.name] += 1
+
+    def report(self) -> dict:
+        """Return the collected measures as a structured report."""
+        total_messages = Counter()
+        for counter in self.messages_per_step:
+            total_messages.update(counter)
+
+        return {
+            "steps": len(self.messages_per_step),
+            "phases": {
+                phase: {
+                    "calls": self.phase_calls[phase],
+                    "total_s": self.phase_times[phase],
+                    "mean_us": (
+                        1e6 * self.phase_times[phase] / self.phase_calls[phase]
+                        if self.phase_calls[phase]
+                        else 0.0
+                    ),
+                }
+                for phase in Profiler.PHASES
+            },
+            "messages": {
+                "total": dict(total_messages),
+                "per_step": [dict(counter) for counter in self.messages_per_step],
+            },
+        }
+
+    def format_report(self) -> str:
+        """Return the report as a human readable table."""
+        report = self.report()
+        lines = [
+            f"Profile over {report['steps']} steps",
+            f"{'phase':<20}{'calls':>10}{'total (s)':>12}{'mean (us)':>12}",
+        ]
+        for phase, measures in report["phases"].items():
+            lines.append(
+                f"{phase:<20}{measures['calls']:>10}"
+                f"{measures['total_s']:>12.4f}{measures['mean_us']:>12.1f}"
+            )
+        lines.append("Messages sent per performative:")
+        for performative, count in sorted(report["messages"]["total"].items()):
+            lines.append(f"  {performative:<18}{count:>10}")
+        return "\n".join(lines)
+
+    def dump_stats(self, filename: str) -> None:
+        """Write the cProfile statistics of the chosen phase to a file."""
+        if self.__cprofile is None:
+            raise ValueError("No phase was selected for cProfile statistics")
+        self.__cprofile.dump_stats(filename)
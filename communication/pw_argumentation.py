@@ -1,6 +1,29 @@
 import argparse
+import os
 
 from ArgumentModel import ArgumentModel
+from memoization.ConversationCache import ConversationCache
+from runtime.AsyncArgumentModel import AsyncArgumentModel
+from runtime.ThreadedArgumentModel import ThreadedArgumentModel
+from sharding.ShardedArgumentModel import ShardedArgumentModel
+from topology.Topology import Topology
+from tracing.MessageTrace import MessageTrace
+
+
+def make_topology(args, num_agents: int):
+    # Builds the interaction graph requested on the command line, if any.
+    if args.topology is None:
+        return None
+    if args.topology == "ring":
+        return Topology.ring(num_agents, args.degree)
+    if args.topology == "regular":
+        return Topology.regular(num_agents, args.degree, seed=args.seed)
+    if args.topology == "small_world":
+        return Topology.small_world(
+            num_agents, args.degree, args.rewiring, seed=args.seed
+        )
+    return Topology.from_edge_list(args.topology, num_agents)
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run the ArgumentModel.")
@@ -23,12 +46,245 @@ if __name__ == "__main__":
         type=int,
         help="Number of iterations to run the model.",
     )
+    parser.add_argument(
+        r"--seed",
+        default=None,
+        type=int,
+        help="Seed of the random streams, for reproducible runs.",
+    )
+    parser.add_argument(
+        r"--checkpoint",
+        default=None,
+        type=str,
+        help="Checkpoint file, resumed if it exists and saved during the run.",
+    )
+    parser.add_argument(
+        r"--checkpoint_every",
+        default=10,
+        type=int,
+        help="Number of steps between two checkpoints.",
+    )
+    parser.add_argument(
+        r"--profile",
+        action="store_true",
+        help="Prints the time spent in each phase of a step at the end of the run.",
+    )
+    parser.add_argument(
+        r"--profile_phase",
+        default=None,
+        type=str,
+        help="Phase for which cProfile statistics are written to --profile_output.",
+    )
+    parser.add_argument(
+        r"--profile_output",
+        default="argument_model.prof",
+        type=str,
+        help="File receiving the cProfile statistics of --profile_phase.",
+    )
+    parser.add_argument(
+        r"--trace",
+        default=None,
+        type=str,
+        help="Records every message sent in this binary trace file.",
+    )
+    parser.add_argument(
+        r"--trace_events",
+        action="store_true",
+        help="Also logs FSM transitions and preferences next to the trace file.",
+    )
+    parser.add_argument(
+        r"--asynchronous",
+        action="store_true",
+        help="Runs the agents as asyncio coroutines answering messages on arrival.",
+    )
+    parser.add_argument(
+        r"--latency",
+        default=0.0,
+        type=float,
+        help="Delivery delay of the messages in steps, with --asynchronous.",
+    )
+    parser.add_argument(
+        r"--threads",
+        default=None,
+        type=int,
+        help="Takes the decisions of each step on this number of threads.",
+    )
+    parser.add_argument(
+        r"--shards",
+        default=None,
+        type=int,
+        help="Splits the agents between this number of worker processes.",
+    )
+    parser.add_argument(
+        r"--argument_budget",
+        default=None,
+        type=int,
+        help="Number of arguments each agent keeps for its closed conversations.",
+    )
+    parser.add_argument(
+        r"--topology",
+        default=None,
+        type=str,
+        help="Interaction graph: ring, regular, small_world, or an edge list file.",
+    )
+    parser.add_argument(
+        r"--degree",
+        default=4,
+        type=int,
+        help="Number of neighbours of each agent, with --topology.",
+    )
+    parser.add_argument(
+        r"--rewiring",
+        default=0.1,
+        type=float,
+        help="Rewiring probability of the edges, with --topology small_world.",
+    )
+    parser.add_argument(
+        r"--deterministic",
+        action="store_true",
+        help="Breaks the ties between preferred items by the order of the items.",
+    )
+    parser.add_argument(
+        r"--conversation_cache",
+        default=None,
+        type=int,
+        help="Resolves conversations at once, memoizing this number of outcomes.",
+    )
+    parser.add_argument(
+        r"--profiles",
+        default=None,
+        type=str,
+        help="Preferences of the agents, loaded if the file exists, saved otherwise.",
+    )
+    parser.add_argument(
+        r"--max_conversations",
+        default=None,
+        type=int,
+        help="Conversations under way each agent keeps, with different partners.",
+    )
+    parser.add_argument(
+        r"--metrics_port",
+        default=None,
+        type=int,
+        help="Serves the live metrics of the run in the Prometheus text format.",
+    )
+    parser.add_argument(
+        r"--metrics_file",
+        default=None,
+        type=str,
+        help="JSON file rewritten with the live metrics of the run.",
+    )
+    parser.add_argument(
+        r"--metrics_interval",
+        default=1.0,
+        type=float,
+        help="Seconds between two samples of the live metrics.",
+    )
     args, _ = parser.parse_known_args()
 
     verbose = args.verbose
     num_agents = args.num_agents
     num_iter = args.num_iter
 
-    model = ArgumentModel(num_agents=num_agents, verbose=verbose)
+    if args.shards is not None:
+        unsupported = [
+            "--" + name
+            for name in (
+                "checkpoint",
+                "profile",
+                "profile_phase",
+                "trace",
+                "asynchronous",
+                "threads",
+                "argument_budget",
+                "topology",
+                "deterministic",
+                "conversation_cache",
+                "profiles",
+                "max_conversations",
+                "metrics_port",
+                "metrics_file",
+            )
+            if getattr(args, name) != parser.get_default(name)
+        ]
+        if unsupported:
+            parser.error("--shards cannot be combined with " + ", ".join(unsupported))
+        model = ShardedArgumentModel(
+            num_agents=num_agents,
+            shards=args.shards,
+            seed=args.seed,
+            verbose=verbose,
+        )
+        model.run_n_steps(num_iter)
+        agreed_items = model.get_agreed_items()
+        model.close()
+        print(
+            "Items agreed on:",
+            sum(len(x) for agent in agreed_items.values() for x in agent.values()),
+        )
+        raise SystemExit
+
+    if args.threads is not None and args.conversation_cache is not None:
+        parser.error("--threads cannot be combined with --conversation_cache")
+
+    model_options = {}
+    model_class = ArgumentModel
+    if args.asynchronous:
+        model_class = AsyncArgumentModel
+        model_options["latency"] = args.latency
+    elif args.threads is not None:
+        model_class = ThreadedArgumentModel
+        model_options["workers"] = args.threads
+
+    model = model_class(
+        num_agents=num_agents,
+        verbose=verbose,
+        profile=args.profile,
+        profile_phase=args.profile_phase,
+        trace_path=args.trace,
+        trace_level=MessageTrace.EVENTS if args.trace_events else MessageTrace.MESSAGES,
+        seed=args.seed,
+        argument_budget=args.argument_budget,
+        topology=make_topology(args, num_agents),
+        deterministic=args.deterministic,
+        conversation_cache=(
+            ConversationCache(args.conversation_cache)
+            if args.conversation_cache is not None
+            else None
+        ),
+        checkpoint=(
+            args.checkpoint
+            if args.checkpoint is not None and os.path.exists(args.checkpoint)
+            else None
+        ),
+        profiles=(
+            args.profiles
+            if args.profiles is not None and os.path.exists(args.profiles)
+            else None
+        ),
+        max_conversations=args.max_conversations,
+        metrics_port=args.metrics_port,
+        metrics_path=args.metrics_file,
+        metrics_interval=args.metrics_interval,
+        **model_options,
+    )
+    if args.profiles is not None and not os.path.exists(args.profiles):
+        model.save_profiles(args.profiles)
+
+    if args.checkpoint is not None:
+        num_iter = max(num_iter - model.schedule.steps, 0)
+    model.run_n_steps(
+        num_iter,
+        checkpoint_every=args.checkpoint_every if args.checkpoint else None,
+        checkpoint_path=args.checkpoint,
+    )
+    model.close_trace()
+    model.close_metrics()
+
+    if model.conversation_cache is not None:
+        print("Conversation cache:", model.conversation_cache.stats())
 
-    model.run_n_steps(num_iter)
+    if model.profiler is not None:
+        print(model.profiler.format_report())
+        if args.profile_phase is not None:
+            model.profiler.dump_stats(args.profile_output)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+from typing import List, MutableSequence, Optional, Sequence, TypeVar
+
+import numpy as np
+
+T = TypeVar("T")
+
+
+class RandomStream:
+    """RandomStream class.
+    Class implementing an independent stream of random numbers for one agent.
+
+    The scalar draws made in the hot paths (choosing a partner, breaking ties,
+    flipping the IDLE coin) are served from a block of uniform numbers drawn in one
+    vectorized call, as plain Python floats. Vector draws use the generator
+    directly.
+
+    attr:
+        generator: the underlying numpy Generator (np.random.Generator)
+        block_size: the number of uniform numbers drawn at once (int)
+    """
+
+    def __init__(
+        self,
+        seed: Optional[int | np.random.SeedSequence] = None,
+        block_size: int = 1024,
+    ):
+        """Create a new RandomStream seeded by an int or a SeedSequence."""
+        self.generator = np.random.default_rng(seed)
+        self.block_size = block_size
+        self.__block: List[float] = []
+        self.__position = 0
+
+    def random(self) -> float:
+        """Return a uniform float in [0, 1)."""
+        if self.__position == len(self.__block):
+            self.__block = self.generator.random(self.block_size).tolist()
+            self.__position = 0
+        value = self.__block[self.__position]
+        self.__position += 1
+        return value
+
+    def choice(self, sequence: Sequence[T]) -> T:
+        """Return an element of a non-empty sequence, chosen uniformly."""
+        return sequence[int(self.random() * len(sequence))]
+
+    def shuffle(self, sequence: MutableSequence) -> None:
+        """Shuffle a sequence in place."""
+        self.generator.shuffle(sequence)
+
+    def get_state(self) -> dict:
+        """Return the state of the stream, including the unused part of the block."""
+        return {
+            "bit_generator": self.generator.bit_generator.state,
+            "block": self.__block[self.__position :],
+        }
+
+    def set_state(self, state: dict) -> None:
+        """Restore a state returned by get_state."""
+        self.generator.bit_generator.state = state["bit_generator"]
+        self.__block = list(state["block"])
+        self.__position = 0
+
+    @staticmethod
+    def spawn(
+        seed: Optional[int],
+        count: int,
+        indices: Optional[Sequence[int]] = None,
+    ) -> List["RandomStream"]:
+        """Return count independent streams derived from a single seed, or only
+        those of the given indices among them."""
+        children = np.random.SeedSequence(seed).spawn(count)
+        if indices is not None:
+            children = [children[idx] for idx in indices]
+        return [RandomStream(child) for child in children]
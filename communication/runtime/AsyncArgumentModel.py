@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+import asyncio
+from typing import Dict, List, Optional
+
+from ArgumentAgent import ArgumentAgent
+from ArgumentModel import ArgumentModel
+from runtime.AsyncMessageService import AsyncMailbox, AsyncMessageService
+from runtime.VirtualClock import VirtualClock
+
+
+class AsyncArgumentModel(ArgumentModel):
+    """
+    The AsyncArgumentModel class runs the agents of an ArgumentModel as asyncio
+    coroutines instead of stepping them in turn.
+
+    Each agent awaits its mailbox and answers a message as soon as it is delivered,
+    so that a conversation goes on within a step instead of advancing by one message
+    per step. Steps are units of a virtual clock: at every step each agent, in a
+    random order, runs ArgumentAgent.step to take the initiative of a conversation,
+    and the clock only moves to the next step once every agent waits. Runs with the
+    same seed are therefore identical, and their results can be compared step for
+    step with those of an ArgumentModel.
+
+    Agents with nothing to answer stay suspended: no mailbox is polled between two
+    steps.
+    """
+
+    def __init__(self, num_agents: int = 2, latency: float = 0.0, **kwargs):
+        """
+        Initializes a new AsyncArgumentModel object.
+
+        Args:
+            num_agents (int): The number of agents in the simulation.
+            latency (float): The delivery delay of the messages, in steps. With a
+            latency of 0 a reply is answered within the step it is sent, with a
+            latency of 1 at the beginning of the next step.
+            **kwargs: The other arguments of ArgumentModel.
+
+        Attributes:
+            clock (VirtualClock): The virtual time of the run, in steps.
+            mailboxes (dict): The awaitable mailbox of each agent name.
+        """
+        self.clock = VirtualClock()
+        self.latency = latency
+        super().__init__(num_agents, **kwargs)
+        self.clock.advance_to(self.schedule.time)
+
+        self.__awake = 0
+        self.__failure: Optional[BaseException] = None
+        self.mailboxes: Dict[str, AsyncMailbox] = {
+            agent.get_name(): AsyncMailbox(
+                agent.get_mailbox(),
+                self.__on_wait,
+                self.__on_wake,
+            )
+            for agent in self.schedule.agent_buffer()
+        }
+        self.message_service.set_mailboxes(self.mailboxes)
+
+        self.__collect = self.datacollector.collect
+        if self.profiler is not None:
+            self.__collect = self.profiler.wrap("collect", self.__collect)
+
+    def new_message_service(self) -> AsyncMessageService:
+        # Creates the router delivering the messages to the awaitable mailboxes.
+        return AsyncMessageService(
+            self.schedule,
+            self.clock,
+            latency=self.latency,
+            verbose=self.verbose,
+        )
+
+    def __on_wait(self):
+        self.__awake -= 1
+
+    def __on_wake(self):
+        self.__awake += 1
+
+    def __on_done(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            self.__failure = task.exception()
+
+    async def __live(self, agent: ArgumentAgent):
+        # The coroutine of an agent: answers its messages as they arrive, and takes
+        # an initiative when the clock notifies it of a new step.
+        mailbox = self.mailboxes[agent.get_name()]
+        while True:
+            if await mailbox.wait():
+                agent.step()
+            else:
+                agent.process_messages(agent.get_new_messages())
+
+    async def __settle(self):
+        # Lets the woken agents run until every agent waits.
+        while self.__awake > 0:
+            await asyncio.sleep(0)
+            if self.__failure is not None:
+                raise self.__failure
+
+    async def __advance_to(self, time: float):
+        # Delivers the messages due up to time, in time order.
+        while self.clock.next_time() is not None and self.clock.next_time() <= time:
+            self.clock.advance()
+            await self.__settle()
+        self.clock.advance_to(time)
+
+    async def run(
+        self,
+        n: int,
+        checkpoint_every: Optional[int] = None,
+        checkpoint_path: Optional[str] = None,
+    ):
+        """Runs n steps of the simulation in the running event loop, saving a
+        checkpoint to checkpoint_path every checkpoint_every steps."""
+        self.__awake = len(self.mailboxes)
+        self.__failure = None
+        tasks: List[asyncio.Task] = []
+        for agent in self.schedule.agent_buffer():
+            task = asyncio.create_task(self.__live(agent))
+            task.add_done_callback(self.__on_done)
+            tasks.append(task)
+
+        try:
+            await self.__settle()
+            for _ in range(n):
+                if self.profiler is not None:
+                    self.profiler.begin_step()
+                self.__collect(self)
+                for agent in self.schedule.agent_buffer(shuffled=True):
+                    self.mailboxes[agent.get_name()].notify()
+                await self.__settle()
+
+                self.schedule.steps += 1
+                self.schedule.time += 1
+                if self.metrics is not None:
+                    self.metrics.steps += 1
+                await self.__advance_to(self.schedule.time)
+                if checkpoint_every and self.schedule.steps % checkpoint_every == 0:
+                    self.save_checkpoint(checkpoint_path)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def step(self):
+        # Runs one step of the simulation.
+        self.run_n_steps(1)
+
+    def run_n_steps(
+        self,
+        n: int,
+        checkpoint_every: Optional[int] = None,
+        checkpoint_path: Optional[str] = None,
+    ):
+        # Runs n steps of the simulation in a new event loop.
+        asyncio.run(self.run(n, checkpoint_every, checkpoint_path))
+
+    def save_checkpoint(self, path: str):
+        # Saves the state of the run. Messages in flight are not saved, which
+        # restricts checkpoints to runs without latency.
+        if self.clock.pending():
+            raise ValueError("Cannot checkpoint while messages are in flight")
+        super().save_checkpoint(path)
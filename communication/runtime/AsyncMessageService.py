@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+import asyncio
+from mailbox.Mailbox import Mailbox
+from typing import Callable, Dict, Optional
+
+from message.MessageService import MessageService
+from runtime.VirtualClock import VirtualClock
+
+
+class AsyncMailbox:
+    """AsyncMailbox class.
+    Class implementing an awaitable view of the mailbox of an agent.
+
+    A coroutine awaiting wait() is suspended until a message is delivered or the
+    mailbox is notified. The runtime is told through on_wait and on_wake each time
+    the owner is suspended and woken, which lets it know when every agent waits.
+
+    attr:
+        mailbox: the mailbox of the agent (Mailbox)
+    """
+
+    def __init__(
+        self,
+        mailbox: Mailbox,
+        on_wait: Callable[[], None],
+        on_wake: Callable[[], None],
+    ):
+        """Create a new AsyncMailbox."""
+        self.mailbox = mailbox
+        self.__on_wait = on_wait
+        self.__on_wake = on_wake
+        self.__waiter: Optional[asyncio.Future] = None
+        self.__notified = False
+
+    def deliver(self, message) -> None:
+        """Store a message in the mailbox and wake its owner."""
+        self.mailbox.receive_messages(message)
+        self.__wake()
+
+    def notify(self) -> None:
+        """Wake the owner without a message."""
+        self.__notified = True
+        self.__wake()
+
+    def __wake(self) -> None:
+        if self.__waiter is not None and not self.__waiter.done():
+            self.__waiter.set_result(None)
+            self.__on_wake()
+
+    async def wait(self) -> bool:
+        """Wait for a message or a notification. Return whether the mailbox was
+        notified since the last call."""
+        if not self.__notified and not self.mailbox.has_new_messages():
+            self.__waiter = asyncio.get_running_loop().create_future()
+            self.__on_wait()
+            try:
+                await self.__waiter
+            finally:
+                self.__waiter = None
+        notified, self.__notified = self.__notified, False
+        return notified
+
+
+class AsyncMessageService(MessageService):
+    """AsyncMessageService class.
+    Class implementing a message service routing each message to the awaitable
+    mailbox of its receiver, which wakes the receiver as soon as it lands.
+
+    Messages are delivered after latency units of virtual time: with no latency the
+    receiver answers within the same step, with a latency of 1 at the beginning of
+    the next one, like the step-based service without instant delivery.
+
+    attr:
+        clock: the virtual clock of the run (VirtualClock)
+        latency: the delivery delay, in virtual time (float)
+    """
+
+    def __init__(
+        self,
+        scheduler,
+        clock: VirtualClock,
+        latency: float = 0.0,
+        verbose: bool = False,
+    ):
+        """Create a new AsyncMessageService object."""
+        super().__init__(scheduler, instant_delivery=True, verbose=verbose)
+        self.clock = clock
+        self.latency = latency
+        self.__mailboxes: Dict[str, AsyncMailbox] = {}
+
+    def set_mailboxes(self, mailboxes: Dict[str, AsyncMailbox]) -> None:
+        """Set the awaitable mailbox of each agent name."""
+        self.__mailboxes = mailboxes
+
+    def dispatch_message(self, message):
+        """Deliver the message to its receiver, now or after the latency."""
+        mailbox = self.__mailboxes[message.get_dest()]
+        if self.latency:
+            self.clock.call_later(self.latency, lambda: mailbox.deliver(message))
+        else:
+            mailbox.deliver(message)
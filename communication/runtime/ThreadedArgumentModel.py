@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from ArgumentModel import ArgumentModel
+from mesa.time import RandomActivation
+from runtime.TwoPhaseMessageService import TwoPhaseMessageService
+
+
+class TwoPhaseActivation(RandomActivation):
+    """TwoPhaseActivation class.
+    Class implementing a scheduler stepping the agents in two phases.
+
+    In the decision phase the agents, in a random order, are stepped concurrently on
+    a thread pool: each one reads its inbox and updates its own state, which no
+    other agent reads, while the messages it sends are held in its outbox. In the
+    commit phase the outboxes are sent serially in the activation order, and
+    delivered at the beginning of the next step.
+
+    A run therefore gives the same result whatever the number of threads.
+
+    attr:
+        executor: the thread pool of the decision phase (ThreadPoolExecutor)
+    """
+
+    def __init__(self, model, workers: Optional[int] = None):
+        """Create a new TwoPhaseActivation."""
+        super().__init__(model)
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="TwoPhaseActivation",
+        )
+
+    def step(self) -> None:
+        """Run the decision phase, then the commit phase, of every agent."""
+        agents = list(self.agent_buffer(shuffled=True))
+        names = [agent.get_name() for agent in agents]
+        message_service: TwoPhaseMessageService = self.model.message_service
+
+        message_service.hold_messages(names)
+        try:
+            for _ in self.executor.map(self.__decide, agents):
+                pass
+        finally:
+            message_service.commit_messages(names)
+        self.steps += 1
+        self.time += 1
+
+    @staticmethod
+    def __decide(agent) -> None:
+        agent.step()
+
+
+class ThreadedArgumentModel(ArgumentModel):
+    """
+    The ThreadedArgumentModel class steps the agents of an ArgumentModel with a
+    TwoPhaseActivation: decisions are taken on a thread pool, and the messages they
+    produce are sent in a deterministic order once every agent has decided.
+
+    Unlike ArgumentModel, which delivers a message as soon as it is sent, messages
+    are delivered at the beginning of the step after they are sent.
+
+    Conversation caches are not supported: resolving a conversation writes to both
+    agents, while the decision phase relies on each agent only writing its own
+    state.
+    """
+
+    def __init__(self, num_agents: int = 2, workers: Optional[int] = None, **kwargs):
+        """
+        Initializes a new ThreadedArgumentModel object.
+
+        Args:
+            num_agents (int): The number of agents in the simulation.
+            workers (int): The number of threads of the decision phase, by default
+            the ThreadPoolExecutor default.
+            **kwargs: The other arguments of ArgumentModel.
+        """
+        if kwargs.get("conversation_cache") is not None:
+            raise ValueError("Conversations are not memoized on a thread pool")
+        self.workers = workers
+        super().__init__(num_agents, **kwargs)
+
+    def new_schedule(self) -> TwoPhaseActivation:
+        # Creates the scheduler stepping the agents on the thread pool.
+        return TwoPhaseActivation(self, workers=self.workers)
+
+    def new_message_service(self) -> TwoPhaseMessageService:
+        # Creates the service holding the messages during the decision phase.
+        return TwoPhaseMessageService(self.schedule, verbose=self.verbose)
+
+    def close(self):
+        # Stops the threads of the decision phase.
+        self.schedule.executor.shutdown()
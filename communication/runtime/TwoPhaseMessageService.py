@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+from typing import Dict, Iterable, List
+
+from message.Message import Message
+from message.MessageService import MessageService
+
+
+class TwoPhaseMessageService(MessageService):
+    """TwoPhaseMessageService class.
+    Class implementing a message service that can hold the messages sent by each
+    agent in its own outbox, and send them later in an order chosen by the caller.
+
+    While messages are held, agents stepped concurrently only append to their own
+    outbox, so the order of the messages sent does not depend on the order the
+    threads run in. Messages are delivered at the next dispatch.
+
+    attr:
+        holding: whether sent messages are kept in the outboxes (bool)
+    """
+
+    def __init__(self, scheduler, verbose: bool = False):
+        """Create a new TwoPhaseMessageService object."""
+        super().__init__(scheduler, instant_delivery=False, verbose=verbose)
+        self.holding = False
+        self.__outboxes: Dict[str, List[Message]] = {}
+
+    def hold_messages(self, agent_names: Iterable[str]) -> None:
+        """Start keeping the messages sent by the given agents in their outboxes."""
+        self.__outboxes = {name: [] for name in agent_names}
+        self.holding = True
+
+    def send_message(self, message):
+        """Keep message in the outbox of its sender while holding, otherwise send it."""
+        if self.holding:
+            self.__outboxes[message.get_exp()].append(message)
+        else:
+            super().send_message(message)
+
+    def commit_messages(self, agent_names: Iterable[str]) -> None:
+        """Send the held messages, outbox by outbox in the given order, and stop
+        holding."""
+        self.holding = False
+        for name in agent_names:
+            for message in self.__outboxes.pop(name, ()):
+                super().send_message(message)
+        self.__outboxes = {}
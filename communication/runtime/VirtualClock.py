@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+import heapq
+from itertools import count
+from typing import Callable, List, Optional, Tuple
+
+
+class VirtualClock:
+    """VirtualClock class.
+    Class implementing the virtual time of an asynchronous run.
+
+    Callbacks are scheduled at a virtual time and run when the clock is advanced to
+    it, in the order they were scheduled. The clock never moves by itself: the
+    runtime advances it once every agent waits, so that a run does not depend on
+    the wall time it takes.
+
+    attr:
+        now: the current virtual time (float)
+    """
+
+    def __init__(self, start: float = 0.0):
+        """Create a new VirtualClock."""
+        self.now = start
+        self.__timers: List[Tuple[float, int, Callable[[], None]]] = []
+        self.__order = count()
+
+    def call_at(self, time: float, callback: Callable[[], None]) -> None:
+        """Schedule callback to run when the clock reaches time."""
+        if time < self.now:
+            raise ValueError(f"Cannot schedule at {time}, the clock is at {self.now}")
+        heapq.heappush(self.__timers, (time, next(self.__order), callback))
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> None:
+        """Schedule callback to run after delay units of virtual time."""
+        self.call_at(self.now + delay, callback)
+
+    def next_time(self) -> Optional[float]:
+        """Return the time of the next scheduled callback, or None."""
+        return self.__timers[0][0] if self.__timers else None
+
+    def pending(self) -> int:
+        """Return the number of scheduled callbacks."""
+        return len(self.__timers)
+
+    def advance(self) -> None:
+        """Move to the time of the next scheduled callbacks and run them all."""
+        time = self.__timers[0][0]
+        self.now = time
+        while self.__timers and self.__timers[0][0] == time:
+            heapq.heappop(self.__timers)[2]()
+
+    def advance_to(self, time: float) -> None:
+        """Move to time, which must not be past a scheduled callback."""
+        if self.__timers and self.__timers[0][0] < time:
+            raise ValueError(f"Callbacks are scheduled before {time}")
+        self.now = max(self.now, time)
@@ -1,9 +1,5 @@
 #! /bin/bash
 
-# For loop for the number of agents
+# All the numbers of agents are run and analysed in one batch
 
-for i in {5..50..5}
-do
-    # Save the image
-    python save_images.py --num_agent "$i"
-done
\ No newline at end of file
+python save_images.py --num_agents $(seq 5 5 50)
@@ -1,55 +1,59 @@
-import matplotlib.pyplot as plt
-import numpy as np
-import pandas as pd
-import seaborn as sns
-from ArgumentModel import ArgumentModel
-from message.MessageService import MessageService
 import argparse
 
+from analysis.CommitmentAnalysis import CommitmentAnalysis
+from ArgumentModel import ArgumentModel
 
-def main(n_agents: int):
-    print(f"Number of agents: {n_agents}")
-    model = ArgumentModel(num_agents=n_agents, verbose=False)
-    model.run_n_steps(50)
-    df_model = model.datacollector.get_model_vars_dataframe()
-    df = pd.DataFrame(dict(df_model.iloc[-1]["Commited"]))
-    df = df.applymap(lambda x: [] if not type(x) == list else x)
-
-    total = {}
-    df["total"] = np.zeros(len(df))
-    for agent in df:
-        total[agent] = set()
-        for val in df[agent].values:
-            total[agent] = total[agent].union(set(val))
-
-        df["total"][agent] = total[agent]
-
-    agreed = df["total"][0]
-    for i in df["total"][1:]:
-        agreed = agreed.intersection(i)
-    print(f"Agreed: {list(agreed)}")
-
-    all_accepted = []
-    for i in df["total"]:
-        for j in i:
-            all_accepted.append(j)
-
-    plt.figure(figsize=(20, 5))
-    sns.histplot(all_accepted, bins=len(set(all_accepted)))
-    plt.title("Histogram of all accepted items")
-    plt.xlabel("Item")
-    plt.ylabel("Frequency")
 
-    plt.axhline(y=n_agents, color="r", linestyle="-", label="Number of agents")
-    plt.savefig(f"images/histogram_{n_agents}.png")
-    del model
+def main(
+    agent_counts: list,
+    runs: int = 1,
+    num_iter: int = 50,
+    seed: int = None,
+    output: str = "images/results.npz",
+    figures: bool = True,
+):
+    analysis = None
+    for n_agents in agent_counts:
+        for run in range(runs):
+            print(f"Number of agents: {n_agents}, run {run}")
+            model = ArgumentModel(
+                num_agents=n_agents,
+                verbose=False,
+                seed=None if seed is None else seed + run,
+            )
+            model.run_n_steps(num_iter)
+            if analysis is None:
+                analysis = CommitmentAnalysis(
+                    [item.get_name() for item in model.schedule.agents[0].list_items]
+                )
+            analysis.add_model(model, label=n_agents)
+            del model
+
+    for label, consensus in zip(analysis.labels, analysis.consensus()):
+        agreed = [name for name, x in zip(analysis.item_names, consensus) if x]
+        print(f"Agreed ({label} agents): {agreed}")
+
+    analysis.save(output)
+    if figures:
+        analysis.plot_histograms("images")
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run the ArgumentModel.")
 
-    parser.add_argument(r"--num_agents", default=3, type=int)
+    parser.add_argument(r"--num_agents", default=[3], type=int, nargs="+")
+    parser.add_argument(r"--runs", default=1, type=int)
+    parser.add_argument(r"--num_iter", default=50, type=int)
+    parser.add_argument(r"--seed", default=None, type=int)
+    parser.add_argument(r"--output", default="images/results.npz", type=str)
+    parser.add_argument(r"--no_figures", action="store_true")
 
     args, _ = parser.parse_known_args()
-    num_agents = args.num_agents
-    main(num_agents)
+    main(
+        args.num_agents,
+        runs=args.runs,
+        num_iter=args.num_iter,
+        seed=args.seed,
+        output=args.output,
+        figures=not args.no_figures,
+    )
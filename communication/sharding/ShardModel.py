@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+from typing import List, Optional, Sequence
+
+import numpy as np
+from ArgumentModel import ArgumentModel
+from conversational_model.ConversationTable import ConversationTable
+from message.Message import Message
+from message.MessageCodec import MessageCodec
+from message.MessageService import MessageService
+from topology.Topology import Topology
+
+
+class ShardModel(ArgumentModel):
+    """
+    The ShardModel class is the slice of a ShardedArgumentModel run by one worker
+    process.
+
+    A shard only creates its own agents, a contiguous slice of the population, each
+    with the name and the random stream it has in the whole population, and its
+    ConversationTable only holds their rows; the other agents are only known by
+    their names. Messages are delivered at the beginning of the step after they are
+    sent, and each mailbox receives its messages ordered by sender: an agent only
+    reads its own state during a step, so the run does not depend on the order the
+    agents are stepped in, nor on how they are split between shards.
+    """
+
+    def __init__(
+        self,
+        num_agents: int,
+        local_agents: List[int],
+        seed: Optional[int] = None,
+        verbose: bool = False,
+    ):
+        """
+        Initializes a new ShardModel object.
+
+        Args:
+            num_agents (int): The number of agents of the whole population.
+            local_agents (list): The indices of the agents stepped by this shard,
+            consecutive and increasing.
+            seed (int): The seed of the whole population.
+
+        Attributes:
+            codec (MessageCodec): Encodes the messages exchanged with other shards.
+            local_agents (list): The agents stepped by this shard, in index order.
+        """
+        self.__local = range(local_agents[0], local_agents[-1] + 1)
+        if list(self.__local) != list(local_agents):
+            raise ValueError("A shard steps a contiguous slice of the agents")
+        super().__init__(num_agents, verbose=verbose, seed=seed)
+        self.local_agents = list(self.schedule.agent_buffer())
+        self.codec = MessageCodec(
+            self.conversations.names,
+            self.local_agents[0].list_items,
+        )
+        self.__pending: List[Message] = []
+
+    def new_message_service(self) -> MessageService:
+        # Messages wait for the next step, where they are sorted before delivery.
+        return MessageService(
+            self.schedule,
+            instant_delivery=False,
+            verbose=self.verbose,
+        )
+
+    def new_conversation_table(
+        self,
+        num_agents: int,
+        topology: Optional[Topology],
+    ) -> ConversationTable:
+        # Only the local agents have a row, every agent being a partner.
+        table = ConversationTable(num_agents, rows=self.__local)
+        for idx in range(num_agents):
+            table.add_agent(self.agent_name(idx))
+        return table
+
+    def agent_indices(self, num_agents: int) -> Sequence[int]:
+        # Only the local agents are created.
+        return self.__local
+
+    def step(self, inbound: Optional[np.ndarray] = None) -> np.ndarray:
+        """Runs one step of the local agents.
+
+        Args:
+            inbound (np.ndarray): The messages sent to the local agents by the other
+            shards during the previous step, encoded by the codec.
+
+        Returns:
+            np.ndarray: The messages sent to the other shards, encoded by the codec.
+        """
+        messages = self.__pending
+        if inbound is not None:
+            messages += [self.codec.decode(*row) for row in inbound.tolist()]
+        messages.sort(key=lambda message: self.codec.agent_id(message.get_exp()))
+        for message in messages:
+            self.message_service.dispatch_message(message)
+
+        for agent in self.local_agents:
+            agent.step()
+        self.schedule.steps += 1
+        self.schedule.time += 1
+
+        outgoing = self.message_service.get_messages_to_proceed()
+        self.message_service.set_messages_to_proceed([])
+        self.__pending, remote = [], []
+        for message in outgoing:
+            if self.codec.agent_id(message.get_dest()) in self.__local:
+                self.__pending.append(message)
+            else:
+                remote.append(self.codec.encode(message))
+        return np.array(remote, dtype=np.int32).reshape(-1, 5)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+import atexit
+import multiprocessing
+import traceback
+from typing import Dict, List, Optional
+
+import numpy as np
+from sharding.ShardModel import ShardModel
+
+
+def run_shard(
+    connection,
+    num_agents: int,
+    local_agents: List[int],
+    seed: Optional[int],
+    verbose: bool,
+):
+    """Serve the commands of a ShardedArgumentModel in a worker process."""
+    try:
+        model = ShardModel(num_agents, local_agents, seed=seed, verbose=verbose)
+        connection.send(("ok", None))
+        while True:
+            command, argument = connection.recv()
+            if command == "step":
+                connection.send(("ok", model.step(argument)))
+            elif command == "gather":
+                connection.send(
+                    (
+                        "ok",
+                        {
+                            agent.get_name(): getattr(agent, argument)
+                            for agent in model.local_agents
+                        },
+                    )
+                )
+            elif command == "close":
+                break
+    except Exception:
+        connection.send(("error", traceback.format_exc()))
+    finally:
+        connection.close()
+
+
+class ShardedArgumentModel:
+    """ShardedArgumentModel class.
+    Class running one ArgumentModel population split between worker processes.
+
+    Each worker runs a ShardModel stepping a contiguous slice of the agents. At each
+    step the messages sent to agents of another shard are sent back through a pipe,
+    and routed to the shard of their receiver with the next step command: every
+    shard waits for the others at the end of a step, and a message is delivered at
+    the beginning of the step after it is sent. The result of a run only depends on
+    the seed, whatever the number of shards.
+
+    The items agreed and proposed by the agents are gathered from the workers on
+    demand.
+
+    attr:
+        num_agents: the number of agents of the population (int)
+        shards: the number of worker processes (int)
+        steps: the number of steps run (int)
+        shard_of: the shard of each agent index (np.ndarray)
+    """
+
+    def __init__(
+        self,
+        num_agents: int = 2,
+        shards: int = 2,
+        seed: Optional[int] = None,
+        verbose: bool = False,
+    ):
+        """Create a new ShardedArgumentModel and start its workers."""
+        self.num_agents = num_agents
+        self.shards = min(shards, num_agents)
+        self.steps = 0
+        slices = np.array_split(np.arange(num_agents), self.shards)
+        self.shard_of = np.repeat(np.arange(self.shards), [len(x) for x in slices])
+
+        context = multiprocessing.get_context()
+        self.__connections = []
+        self.__processes = []
+        for local_agents in slices:
+            connection, child_connection = context.Pipe()
+            process = context.Process(
+                target=run_shard,
+                args=(
+                    child_connection,
+                    num_agents,
+                    local_agents.tolist(),
+                    seed,
+                    verbose,
+                ),
+                daemon=True,
+            )
+            process.start()
+            child_connection.close()
+            self.__connections.append(connection)
+            self.__processes.append(process)
+        atexit.register(self.close)
+
+        self.__inbound = [np.empty((0, 5), dtype=np.int32)] * self.shards
+        self.__receive_all()
+
+    def __receive_all(self) -> list:
+        # Waits for the answer of every shard.
+        results = []
+        for shard, connection in enumerate(self.__connections):
+            status, result = connection.recv()
+            if status == "error":
+                self.close()
+                raise RuntimeError(f"Shard {shard} failed:\n{result}")
+            results.append(result)
+        return results
+
+    def step(self):
+        # Runs one step of every shard, then routes the messages between shards.
+        for connection, inbound in zip(self.__connections, self.__inbound):
+            connection.send(("step", inbound))
+        outbound = np.concatenate(self.__receive_all())
+        owners = self.shard_of[outbound[:, 1]]
+        self.__inbound = [outbound[owners == shard] for shard in range(self.shards)]
+        self.steps += 1
+
+    def run_n_steps(self, n: int):
+        # Runs n steps of the simulation.
+        for _ in range(n):
+            self.step()
+
+    def __gather(self, attribute: str) -> Dict[str, Dict[str, List[str]]]:
+        for connection in self.__connections:
+            connection.send(("gather", attribute))
+        merged = {}
+        for result in self.__receive_all():
+            merged.update(result)
+        return merged
+
+    def get_agreed_items(self) -> Dict[str, Dict[str, List[str]]]:
+        """Return the items each agent agreed on, per other agent."""
+        return self.__gather("agreed_items")
+
+    def get_proposed_items(self) -> Dict[str, Dict[str, List[str]]]:
+        """Return the items each agent proposed, per other agent."""
+        return self.__gather("proposed_items")
+
+    def close(self):
+        # Stops the workers.
+        for connection in self.__connections:
+            try:
+                connection.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+            connection.close()
+        for process in self.__processes:
+            process.join()
+        self.__connections, self.__processes = [], []
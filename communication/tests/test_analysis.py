@@ -0,0 +1,44 @@
+import numpy as np
+from analysis.CommitmentAnalysis import CommitmentAnalysis, commitment_matrix
+from ArgumentModel import ArgumentModel
+
+
+def test_statistics_match_the_set_operations_on_a_run():
+    model = ArgumentModel(num_agents=5, seed=1)
+    model.run_n_steps(30)
+    items = [item.get_name() for item in model.schedule.agents[0].list_items]
+    analysis = CommitmentAnalysis(items)
+    analysis.add_model(model)
+
+    accepted = {
+        agent: set().union(*agreed.values())
+        for agent, agreed in model.get_agreed_items().items()
+    }
+    consensus = set.intersection(*accepted.values())
+    assert [x for x, y in zip(items, analysis.consensus()[0]) if y] == [
+        x for x in items if x in consensus
+    ]
+    assert analysis.acceptance()[0].tolist() == [
+        sum(item in x for x in accepted.values()) for item in items
+    ]
+
+
+def test_runs_of_different_sizes_are_padded(tmp_path):
+    items = ["a", "b", "c"]
+    analysis = CommitmentAnalysis(items)
+    analysis.add_run(
+        commitment_matrix(
+            {"1": {"2": ["a", "b"]}, "2": {"1": ["a"]}}, ["1", "2"], items
+        )
+    )
+    analysis.add_run(np.ones((3, 3), dtype=bool), label=7)
+
+    assert analysis.commitments.shape == (2, 3, 3)
+    assert analysis.consensus().tolist() == [[True, False, False], [True] * 3]
+    assert np.isnan(analysis.coverage()[0, 2])
+    assert analysis.summary()["mean_coverage"].tolist() == [0.5, 1.0]
+
+    analysis.save(tmp_path / "results.npz")
+    loaded = CommitmentAnalysis.load(tmp_path / "results.npz")
+    assert loaded.labels == [2, 7]
+    assert np.array_equal(loaded.commitments, analysis.commitments)
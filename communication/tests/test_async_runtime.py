@@ -0,0 +1,63 @@
+import pytest
+from ArgumentModel import ArgumentModel
+from runtime.AsyncArgumentModel import AsyncArgumentModel
+from runtime.VirtualClock import VirtualClock
+
+
+def committed(model: ArgumentModel) -> list:
+    return [agent.agreed_items for agent in model.schedule.agents]
+
+
+def test_clock_runs_callbacks_in_time_then_schedule_order():
+    clock, calls = VirtualClock(), []
+    clock.call_at(2, lambda: calls.append("c"))
+    clock.call_at(1, lambda: calls.append("a"))
+    clock.call_later(1, lambda: calls.append("b"))
+
+    clock.advance()
+    assert (clock.now, calls) == (1, ["a", "b"])
+    with pytest.raises(ValueError):
+        clock.advance_to(3)
+    clock.advance()
+    assert (clock.now, calls) == (2, ["a", "b", "c"])
+    assert clock.next_time() is None
+
+
+@pytest.mark.parametrize("latency", [0, 1, 0.5])
+def test_async_runs_are_reproducible(latency):
+    first = AsyncArgumentModel(num_agents=5, seed=4, latency=latency)
+    second = AsyncArgumentModel(num_agents=5, seed=4, latency=latency)
+    first.run_n_steps(20)
+    for _ in range(20):
+        second.step()
+
+    assert committed(first) == committed(second)
+    assert any(committed(first))
+    assert first.schedule.steps == first.clock.now == 20
+
+
+def test_replies_are_answered_within_a_step():
+    model = AsyncArgumentModel(num_agents=4, seed=1)
+    model.run_n_steps(3)
+
+    assert not any(
+        agent.get_mailbox().has_new_messages() for agent in model.schedule.agents
+    )
+    with_latency = AsyncArgumentModel(num_agents=4, seed=1, latency=1)
+    with_latency.run_n_steps(3)
+    assert with_latency.clock.pending() > 0
+    with pytest.raises(ValueError):
+        with_latency.save_checkpoint("unused.npz")
+
+
+def test_async_run_resumes_from_checkpoint(tmp_path):
+    path = tmp_path / "run.npz"
+    reference = AsyncArgumentModel(num_agents=5, seed=4)
+    reference.run_n_steps(20)
+
+    interrupted = AsyncArgumentModel(num_agents=5, seed=4)
+    interrupted.run_n_steps(10, checkpoint_every=10, checkpoint_path=path)
+    resumed = AsyncArgumentModel(checkpoint=path)
+    resumed.run_n_steps(10)
+
+    assert committed(resumed) == committed(reference)
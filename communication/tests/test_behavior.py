@@ -0,0 +1,58 @@
+import pytest
+from ArgumentModel import ArgumentModel
+from conversational_model.Behavior import Behavior
+from message.MessagePerformative import MessagePerformative
+from StandardAgentsBehavior import standard_behavior
+
+
+def test_handlers_are_dispatched_per_performative():
+    behavior = Behavior()
+    behavior.on_decision(MessagePerformative.PROPOSE, MessagePerformative.ARGUE)(
+        lambda *args: MessagePerformative.ACCEPT
+    )
+    behavior.default_message(lambda *args: "default")
+    behavior.on_message(MessagePerformative.ACCEPT)(lambda *args: "accept")
+
+    assert (
+        behavior.decide(None, None, None, MessagePerformative.ARGUE, [])
+        == MessagePerformative.ACCEPT
+    )
+    assert behavior.build_message(None, None, None, MessagePerformative.ACCEPT) == (
+        "accept"
+    )
+    assert behavior.build_message(None, None, None, MessagePerformative.REJECT) == (
+        "default"
+    )
+    with pytest.raises(ValueError):
+        behavior.decide(None, None, None, MessagePerformative.COMMIT, [])
+
+
+def test_copies_are_independent():
+    behavior = standard_behavior.copy("accepting")
+    behavior.on_decision(MessagePerformative.ACCEPT)(
+        lambda *args: MessagePerformative.REJECT
+    )
+
+    assert behavior.name == "accepting"
+    assert (
+        behavior.decide(None, None, None, MessagePerformative.ACCEPT, [])
+        == MessagePerformative.REJECT
+    )
+    assert (
+        standard_behavior.decide(None, None, None, MessagePerformative.ACCEPT, [])
+        == MessagePerformative.COMMIT
+    )
+
+
+def test_model_runs_a_custom_behavior():
+    behavior = standard_behavior.copy("accepting")
+
+    @behavior.on_decision(MessagePerformative.PROPOSE)
+    def always_accept(agent, preferences, input, current_state, next_states, context):
+        return MessagePerformative.ACCEPT
+
+    model = ArgumentModel(num_agents=4, seed=1, behavior=behavior)
+    model.run_n_steps(10)
+
+    assert not any(agent.argumentations for agent in model.schedule.agents)
+    assert any(agent.agreed_items for agent in model.schedule.agents)
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+from ArgumentModel import ArgumentModel
+from preferences.PopulationProfiles import PopulationProfiles
+
+
+def snapshot(model: ArgumentModel) -> list:
+    return [
+        (
+            agent.get_name(),
+            agent.agreed_items,
+            agent.proposed_items,
+            {
+                other: (fsm.current_state, fsm.turn)
+                for other, fsm in agent.conversations.items()
+            },
+            {
+                other: [str(argument) for argument in argumentation.all_arguments()]
+                for other, argumentation in agent.argumentations.items()
+            },
+            [str(message) for message in agent.get_mailbox().peek_new_messages()],
+        )
+        for agent in model.schedule.agents
+    ]
+
+
+def test_resumed_run_is_identical(tmp_path):
+    path = tmp_path / "run.npz"
+    reference = ArgumentModel(num_agents=6, seed=4)
+    reference.run_n_steps(25)
+
+    interrupted = ArgumentModel(num_agents=6, seed=4)
+    interrupted.run_n_steps(12, checkpoint_every=5, checkpoint_path=path)
+
+    resumed = ArgumentModel(checkpoint=path)
+    assert resumed.schedule.steps == 10
+    resumed.run_n_steps(15)
+
+    assert snapshot(resumed) == snapshot(reference)
+
+
+def test_restored_state_matches_saved_state(tmp_path):
+    path = tmp_path / "run.npz"
+    model = ArgumentModel(num_agents=5, seed=2)
+    model.run_n_steps(7)
+    model.save_checkpoint(path)
+
+    assert snapshot(ArgumentModel(checkpoint=path)) == snapshot(model)
+    assert not (tmp_path / "run.npz.partial").exists()
+
+
+def test_resumed_agents_keep_their_thresholds(tmp_path):
+    model = ArgumentModel(num_agents=4, seed=2)
+    model.run_n_steps(3)
+    model.save_checkpoint(tmp_path / "run.npz")
+
+    resumed = ArgumentModel(checkpoint=tmp_path / "run.npz")
+    resumed.save_profiles(tmp_path / "profiles.bin")
+    profiles = PopulationProfiles.load(tmp_path / "profiles.bin")
+
+    assert not np.isnan(profiles.records["thresholds"]).all()
+    for idx, agent in enumerate(model.schedule.agents):
+        assert np.array_equal(
+            profiles.get_agent_preferences(idx)[2], agent.thresholds, equal_nan=True
+        )
+
+
+def test_resumed_run_keeps_its_draw_settings(tmp_path):
+    path = tmp_path / "run.npz"
+    model = ArgumentModel(num_agents=4, seed=2, deterministic=True, max_conversations=2)
+    model.run_n_steps(3)
+    model.save_checkpoint(path)
+
+    for settings in ({}, {"deterministic": True}, {"max_conversations": 2}):
+        with pytest.raises(ValueError):
+            ArgumentModel(checkpoint=path, **settings)
+    resumed = ArgumentModel(checkpoint=path, deterministic=True, max_conversations=2)
+    assert snapshot(resumed) == snapshot(model)
@@ -0,0 +1,70 @@
+import pytest
+from ArgumentModel import ArgumentModel
+from memoization.ConversationCache import ConversationCache
+from preferences.CriterionName import CriterionName
+from preferences.CriterionValue import CriterionValue
+from preferences.Item import Item
+from preferences.Preferences import Preferences
+from preferences.Value import Value
+from StandardAgentsBehavior import standard_behavior
+
+
+def test_deterministic_ties_go_to_the_first_item():
+    preferences = Preferences(None, None)
+    preferences.set_criterion_name_list([CriterionName.PROFESSOR])
+    items = [Item(name, "") for name in ("A", "B", "C")]
+    for item in items:
+        preferences.add_criterion_value(
+            CriterionValue(item, CriterionName.PROFESSOR, Value.GOOD)
+        )
+
+    for _ in range(5):
+        assert preferences.most_preferred(items, deterministic=True) is items[0]
+
+
+def test_repeated_runs_resolve_from_the_cache():
+    cache = ConversationCache()
+    first = ArgumentModel(
+        num_agents=4, seed=2, deterministic=True, conversation_cache=cache
+    )
+    first.run_n_steps(20)
+    misses = cache.misses
+    second = ArgumentModel(
+        num_agents=4, seed=2, deterministic=True, conversation_cache=cache
+    )
+    second.run_n_steps(20)
+
+    assert misses > 0
+    assert cache.misses == misses
+    assert cache.hits == misses
+    assert cache.hit_rate == 0.5
+    assert second.get_agreed_items() == first.get_agreed_items()
+    assert {
+        agent.get_name(): {
+            other: sorted(map(str, argumentation.all_arguments()))
+            for other, argumentation in agent.argumentations.items()
+        }
+        for agent in second.schedule.agents
+    } == {
+        agent.get_name(): {
+            other: sorted(map(str, argumentation.all_arguments()))
+            for other, argumentation in agent.argumentations.items()
+        }
+        for agent in first.schedule.agents
+    }
+
+
+def test_cache_keeps_the_most_recently_used_outcomes():
+    cache = ConversationCache(maxsize=2)
+    ArgumentModel(num_agents=5, seed=1, conversation_cache=cache).run_n_steps(10)
+
+    assert len(cache) == 2
+    assert cache.evictions == cache.misses - 2
+
+
+def test_cache_needs_the_standard_behavior():
+    with pytest.raises(ValueError):
+        ArgumentModel(
+            behavior=standard_behavior.copy("custom"),
+            conversation_cache=ConversationCache(),
+        )
@@ -0,0 +1,53 @@
+from arguments.Argument import Argument
+from arguments.Argumentation import Argumentation
+from ArgumentModel import ArgumentModel
+from conversational_model.ConversationManager import ConversationManager
+from conversational_model.ConversationTable import ConversationTable
+from conversational_model.FSM import Turn
+from message.MessagePerformative import MessagePerformative
+from preferences.Item import Item
+
+
+def test_closed_conversation_is_reset_in_place():
+    table = ConversationTable()
+    manager = ConversationManager(table.add_agent("Agent 0"), {})
+    table.add_agent("Agent 1")
+    conversation = manager.open("Agent 1")
+    conversation.current_state = MessagePerformative.ACK
+    conversation.turn = Turn.Other
+
+    manager.update("Agent 1")
+
+    assert conversation.is_start()
+    assert manager.open("Agent 1") is conversation
+
+
+def test_least_recently_closed_argumentations_are_evicted():
+    table = ConversationTable()
+    argumentations = {}
+    manager = ConversationManager(
+        table.add_agent("Agent 0"),
+        argumentations,
+        argument_budget=1,
+    )
+    for other in ("Agent 1", "Agent 2"):
+        table.add_agent(other)
+        argumentations[other] = Argumentation("Agent 0", other)
+        argumentations[other].add_argument(
+            Argument(True, Item("Item", "An item"), "Agent 0")
+        )
+        manager.update(other)
+
+    assert list(argumentations) == ["Agent 2"]
+    assert manager.evicted == 1
+
+
+def test_budget_bounds_the_argumentations_kept():
+    model = ArgumentModel(num_agents=8, seed=3, argument_budget=0)
+    model.run_n_steps(30)
+
+    agents = model.schedule.agents
+    assert sum(agent.conversation_manager.evicted for agent in agents) > 0
+    for agent in agents:
+        for other in agent.argumentations:
+            assert not agent.conversations[other].is_start()
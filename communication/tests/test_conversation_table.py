@@ -0,0 +1,155 @@
+import numpy as np
+import pytest
+from ArgumentModel import ArgumentModel
+from conversational_model.ConversationTable import ConversationTable
+from conversational_model.FSM import FiniteStateMachine, Turn
+from message.Message import Message
+from message.MessagePerformative import MessagePerformative
+from preferences.Preferences import Preferences
+
+
+def answer(performative):
+    def decide(preferences, input, current_state, next_states, context):
+        return performative
+
+    def build_message(preferences, input, next_state, context):
+        return None
+
+    return Preferences(decide, build_message)
+
+
+def test_conversation_follows_the_protocol_like_a_fsm():
+    table = ConversationTable()
+    conversations = table.add_agent("Agent 1")
+    table.add_agent("Agent 2")
+    conversation = conversations["Agent 2"]
+    fsm = FiniteStateMachine("Agent 1", "Agent 2")
+    idle = Message("Agent 1", "Agent 2", MessagePerformative.IDLE, None)
+    accept = Message("Agent 2", "Agent 1", MessagePerformative.ACCEPT, "item")
+
+    for machine in (conversation, fsm):
+        machine.step(input=idle, preferences=answer(MessagePerformative.PROPOSE))
+        machine.step(input=accept)
+        machine.step(input=accept, preferences=answer(MessagePerformative.COMMIT))
+        machine.step(
+            input=Message("Agent 2", "Agent 1", MessagePerformative.COMMIT, "item")
+        )
+        machine.step(input=accept, preferences=answer(None))
+
+    assert (conversation.current_state, conversation.turn) == (
+        fsm.current_state,
+        fsm.turn,
+    )
+    assert conversation.current_state == MessagePerformative.ACK
+    assert conversation.has_finished() and fsm.has_finished()
+
+
+def test_mapping_lists_the_conversations_left_untouched():
+    table = ConversationTable(capacity=1)
+    names = [f"Agent {idx}" for idx in range(5)]
+    conversations = [table.add_agent(name) for name in names]
+
+    assert len(conversations[0]) == 0
+    assert "Agent 3" not in conversations[0]
+    conversations[0]["Agent 3"].step(
+        input=Message("Agent 3", "Agent 0", MessagePerformative.PROPOSE, "item")
+    )
+
+    assert list(conversations[0]) == ["Agent 3"]
+    assert conversations[0]["Agent 3"].current_state == MessagePerformative.PROPOSE
+    assert table.states().shape == (5, 5)
+
+    with pytest.raises(KeyError):
+        conversations[0]["Agent 5"]
+    with pytest.raises(KeyError):
+        conversations[0]["Agent 5"] = conversations[0]["Agent 3"]
+    assert len(table) == 5
+
+
+def test_finished_conversations_are_reset_at_once():
+    table = ConversationTable()
+    for name in ("Agent 0", "Agent 1", "Agent 2"):
+        table.add_agent(name)
+    table.set_state(0, 1, MessagePerformative.ACK)
+    table.set_turn(0, 1, Turn.Other)
+    table.set_state(1, 2, MessagePerformative.ARGUE)
+    table.set_turn(1, 2, Turn.Other)
+
+    assert table.available_partners(0).tolist() == [1, 2]
+    assert table.available_partners(1).tolist() == [0]
+    assert table.reset_finished() == 1
+    assert table.is_start(0, 1)
+    assert np.count_nonzero(table.active()) == 1
+
+
+def test_model_shares_one_table_between_its_agents():
+    model = ArgumentModel(num_agents=6, seed=2)
+    model.run_n_steps(10)
+
+    for agent in model.schedule.agents:
+        assert agent.conversations.table is model.conversations
+        for other, conversation in agent.conversations.items():
+            assert (
+                model.conversations.get_state(
+                    model.conversations.agent_id(agent.get_name()),
+                    model.conversations.agent_id(other),
+                )
+                == conversation.current_state
+            )
+
+
+def test_opening_transitions_share_one_control_message():
+    inputs = []
+
+    def decide(preferences, input, current_state, next_states, context):
+        inputs.append(input)
+        return MessagePerformative.IDLE
+
+    def build_message(preferences, input, next_state, context):
+        return None
+
+    table = ConversationTable()
+    conversations = table.add_agent("Agent 0")
+    table.add_agent("Agent 1")
+    conversation = conversations["Agent 1"]
+    for _ in range(3):
+        conversation.tick(Preferences(decide, build_message))
+
+    assert inputs[0] is inputs[1] is inputs[2]
+    assert inputs[0].get_dest() == "Agent 1"
+    assert inputs[0].get_performative() == MessagePerformative.IDLE
+
+
+def test_available_partners_reuse_the_same_buffers():
+    table = ConversationTable()
+    conversations = [table.add_agent(f"Agent {idx}") for idx in range(4)]
+    table.set_state(0, 2, MessagePerformative.PROPOSE)
+    table.set_state(0, 3, MessagePerformative.REJECT)
+    table.set_turn(0, 3, Turn.Other)
+
+    buffers = []
+    available_partners = table.available_partners
+
+    def record_buffers(agent, given=None):
+        buffers.append(given)
+        return available_partners(agent, given)
+
+    table.available_partners = record_buffers
+    assert conversations[0].available_partners().tolist() == [1, 3]
+    table.set_turn(0, 3, Turn.Me)
+    assert conversations[0].available_partners().tolist() == [1]
+    assert buffers[0][0] is buffers[1][0] and buffers[0][1] is buffers[1][1]
+    assert available_partners(0).tolist() == [1]
+
+
+def test_table_with_rows_only_holds_the_rows_of_its_agents():
+    table = ConversationTable(4, rows=range(1, 3))
+    conversations = [table.add_agent(f"Agent {idx}") for idx in range(4)]
+    conversations[2]["Agent 0"].current_state = MessagePerformative.PROPOSE
+
+    assert table.states().shape == (2, 4)
+    assert table.states()[1, 0] == MessagePerformative.PROPOSE.value
+    assert conversations[1].available_partners().tolist() == [0, 2, 3]
+    assert conversations[2].available_partners().tolist() == [1, 3]
+    with pytest.raises(ValueError):
+        table.add_agent("Agent 4")
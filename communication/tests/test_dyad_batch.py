@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from ArgumentModel import ArgumentModel
+from batch.DyadBatch import DyadBatch
+from conversational_model.Behavior import Behavior
+from memoization.ConversationCache import ConversationCache
+from topology.Topology import Topology
+
+
+def test_batch_matches_the_models_on_the_same_seeds():
+    models = [ArgumentModel(num_agents=2, seed=seed) for seed in range(20)]
+    batch = DyadBatch.from_models(models)
+
+    for _ in range(40):
+        for model in models:
+            model.step()
+        batch.step()
+        assert batch.mismatches(models).tolist() == []
+    assert batch.agreed.any()
+
+
+def test_generated_batches_depend_on_the_seed_only():
+    first = DyadBatch.generate(200, seed=4)
+    second = DyadBatch.generate(200, seed=4)
+    first.run_n_steps(30)
+    second.run_n_steps(30)
+
+    assert first.values.shape == (200, 2, len(first.item_names), 5)
+    assert np.array_equal(first.agreed, second.agreed)
+    acceptance = first.acceptance()
+    proposing = ~np.isnan(acceptance)
+    assert proposing.any()
+    assert np.all((acceptance[proposing] >= 0) & (acceptance[proposing] <= 1))
+
+
+def test_unsupported_models_are_rejected():
+    for options in (
+        {"argument_budget": 1},
+        {"topology": Topology.ring(2, 1)},
+        {"deterministic": True},
+        {"conversation_cache": ConversationCache()},
+        {"behavior": Behavior()},
+    ):
+        with pytest.raises(ValueError):
+            DyadBatch.from_models([ArgumentModel(num_agents=2, seed=1, **options)])
@@ -0,0 +1,65 @@
+"""
+Import-time budget of the simulation core.
+
+The tests are run from the communication directory, like the simulation itself:
+    python -m pytest -q
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+COMMUNICATION_DIR = Path(__file__).resolve().parent.parent
+
+CORE_MODULES = [
+    "message.Message",
+    "message.MessagePerformative",
+    "message.MessageService",
+    "mailbox.Mailbox",
+    "preferences.Preferences",
+    "preferences.PreferenceModel",
+    "preferences.ItemFactory",
+    "arguments.Argument",
+    "conversational_model.FSM",
+]
+
+HEAVY_MODULES = ["pandas", "matplotlib", "networkx"]
+
+# Generous enough for a cold start on a slow machine, far below the cost of
+# importing pandas and matplotlib together.
+CORE_IMPORT_BUDGET_S = 0.5
+
+
+def import_in_fresh_interpreter(modules):
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        + "".join(f"import {module}\n" for module in modules)
+        + "elapsed = time.perf_counter() - start\n"
+        "print(json.dumps({'elapsed': elapsed, 'modules': list(sys.modules)}))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=COMMUNICATION_DIR,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def test_core_does_not_import_heavy_modules():
+    result = import_in_fresh_interpreter(CORE_MODULES)
+    loaded = [x for x in HEAVY_MODULES if x in result["modules"]]
+    assert loaded == [], f"Simulation core imported {loaded}"
+
+
+def test_core_import_time_budget():
+    result = import_in_fresh_interpreter(CORE_MODULES)
+    assert result["elapsed"] < CORE_IMPORT_BUDGET_S
+
+
+def test_model_does_not_import_matplotlib():
+    result = import_in_fresh_interpreter(["ArgumentModel"])
+    assert "matplotlib" not in result["modules"]
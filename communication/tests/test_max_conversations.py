@@ -0,0 +1,34 @@
+import pytest
+from ArgumentModel import ArgumentModel
+
+
+def count_agreed(max_conversations: int) -> int:
+    model = ArgumentModel(num_agents=8, seed=3, max_conversations=max_conversations)
+    model.run_n_steps(10)
+    return sum(
+        len(items)
+        for agent in model.schedule.agents
+        for items in agent.agreed_items.values()
+    )
+
+
+def test_agents_keep_up_to_max_conversations_under_way():
+    model = ArgumentModel(num_agents=6, seed=3, max_conversations=3)
+    agent = model.schedule.agents[0]
+    row = agent.conversations.agent
+    under_way = []
+    for _ in range(6):
+        agent.init_conversation()
+        under_way.append(int(model.conversations.active()[row].sum()))
+
+    assert max(under_way) == 3
+    assert under_way == sorted(under_way)
+
+
+def test_more_conversations_under_way_reach_more_agreements():
+    assert count_agreed(3) > count_agreed(1)
+
+
+def test_at_least_one_conversation_is_kept_under_way():
+    with pytest.raises(ValueError):
+        ArgumentModel(num_agents=2, max_conversations=0)
@@ -0,0 +1,65 @@
+from arguments.Argument import Argument
+from message.Message import Message
+from message.MessagePerformative import MessagePerformative
+from preferences.CriterionName import CriterionName
+from preferences.Item import Item
+from preferences.Value import Value
+from tracing.MessageTrace import MessageTrace, read_trace
+
+
+def make_argument(item: Item) -> Argument:
+    argument = Argument(False, item, "Agent 2")
+    argument.add_premiss_couple_values(CriterionName.FLEXIBLE, Value.BAD)
+    argument.add_premiss_comparison(CriterionName.FLEXIBLE, CriterionName.PROFESSOR)
+    return argument
+
+
+def test_argument_key_round_trip():
+    item = Item("POO", "Génie logiciel orienté objet")
+    argument = make_argument(item)
+
+    rebuilt = Argument.from_key(argument.to_key(), item, "Agent 2")
+
+    assert rebuilt == argument
+    assert rebuilt.decision is False
+
+
+def test_records_are_written_in_bulk(tmp_path):
+    path = tmp_path / "run.trace"
+    item = Item("POO", "Génie logiciel orienté objet")
+    argument = make_argument(item)
+    items = [Item("IA", "Intelligence artificielle"), item]
+    trace = MessageTrace(path, ["Agent 1", "Agent 2"], items, buffer_size=2)
+
+    trace.record_message(
+        0, Message("Agent 1", "Agent 2", MessagePerformative.PROPOSE, "POO")
+    )
+    trace.record_message(
+        1, Message("Agent 2", "Agent 1", MessagePerformative.ARGUE, argument)
+    )
+    trace.record_message(
+        1, Message("Agent 1", "Agent 2", MessagePerformative.ACCEPT, "IA")
+    )
+    trace.log(MessageTrace.EVENTS, "not kept at the MESSAGES level %s", object())
+    trace.close()
+
+    header, records = read_trace(path)
+    assert header["agents"] == ["Agent 1", "Agent 2"]
+    assert header["items"] == ["IA", "POO"]
+    assert records["step"].tolist() == [0, 1, 1]
+    assert records["sender"].tolist() == [0, 1, 0]
+    assert records["performative"].tolist() == [101, 106, 102]
+    assert records["item"].tolist() == [1, 1, 0]
+    assert records["argument"].tolist() == [-1, argument.to_key(), -1]
+    assert not (tmp_path / "run.trace.log").exists()
+
+
+def test_events_are_formatted_by_the_writer(tmp_path):
+    path = tmp_path / "run.trace"
+    items = [Item("IA", "Intelligence artificielle")]
+    trace = MessageTrace(path, ["Agent 1"], items, level=MessageTrace.EVENTS)
+    trace.log(MessageTrace.EVENTS, "Agent %s: %s", "Agent 1", "FLEXIBLE > PROFESSOR")
+    trace.close()
+
+    log = (tmp_path / "run.trace.log").read_text(encoding="utf-8")
+    assert log == "Agent Agent 1: FLEXIBLE > PROFESSOR\n"
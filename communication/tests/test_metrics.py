@@ -0,0 +1,66 @@
+import json
+import urllib.request
+
+from ArgumentModel import ArgumentModel
+from memoization.ConversationCache import ConversationCache
+from message.MessagePerformative import MessagePerformative
+
+
+def test_json_file_and_prometheus_endpoint(tmp_path):
+    path = tmp_path / "metrics.json"
+    model = ArgumentModel(
+        num_agents=6,
+        seed=3,
+        metrics_port=0,
+        metrics_path=str(path),
+        metrics_interval=60,
+    )
+    model.run_n_steps(10)
+
+    sample = model.metrics_exporter.take_sample()
+    assert sample["steps_total"] == 10
+    assert sample["steps_per_second"] > 0
+    proposals = sample["messages_total"]["PROPOSE"]
+    assert proposals == model.metrics.messages[MessagePerformative.PROPOSE.value] > 0
+    assert sample["commitments_total"] == sample["messages_total"]["ACK"]
+    assert sample["active_conversations"] >= 0
+    assert sample["resident_memory_bytes"] > 0
+
+    url = f"http://127.0.0.1:{model.metrics_exporter.port}/metrics"
+    with urllib.request.urlopen(url) as response:
+        text = response.read().decode("utf-8")
+    assert "# TYPE sma_steps_total counter" in text
+    assert "sma_steps_total 10" in text
+    assert f'sma_messages_total{{performative="PROPOSE"}} {proposals}' in text
+
+    model.close_metrics()
+    assert json.loads(path.read_text())["steps_total"] == 10
+
+
+def test_metrics_are_off_by_default():
+    model = ArgumentModel(num_agents=2, seed=3)
+    model.run_n_steps(2)
+    assert model.metrics is None
+    assert model.message_service.metrics is None
+    model.close_metrics()
+
+
+def test_cached_conversations_are_counted(tmp_path):
+    model = ArgumentModel(
+        num_agents=10,
+        seed=1,
+        conversation_cache=ConversationCache(),
+        metrics_path=str(tmp_path / "metrics.json"),
+        metrics_interval=60,
+    )
+    model.run_n_steps(10)
+
+    sample = model.metrics_exporter.take_sample()
+    model.close_metrics()
+    agreed = sum(
+        len(items)
+        for agent in model.schedule.agents
+        for items in agent.agreed_items.values()
+    )
+    assert sample["commitments_total"] >= agreed // 2 > 0
+    assert sample["messages_total"]["PROPOSE"] > 0
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from ArgumentModel import ArgumentModel
+from preferences.PopulationProfiles import PopulationProfiles
+
+
+def preference_data(model):
+    return [
+        (
+            [
+                criterion.name
+                for criterion in agent.preferences.get_criterion_name_list()
+            ],
+            agent.preferences.get_value_matrix(agent.list_items).tolist(),
+        )
+        for agent in model.schedule.agent_buffer()
+    ]
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_saved_profiles_give_the_same_population(tmp_path, mmap):
+    path = tmp_path / "population.profiles"
+    model = ArgumentModel(num_agents=6, seed=8)
+    model.save_profiles(str(path))
+
+    profiles = PopulationProfiles.load(str(path), mmap=mmap)
+    assert isinstance(profiles.records, np.memmap) == mmap
+    assert profiles.agent_names == [f"Agent {idx}" for idx in range(1, 7)]
+    restored = ArgumentModel(profiles=profiles, seed=3)
+
+    assert len(restored.schedule.agents) == 6
+    assert preference_data(restored) == preference_data(model)
+    for agent, original in zip(
+        restored.schedule.agent_buffer(), model.schedule.agent_buffer()
+    ):
+        assert np.array_equal(agent.thresholds, original.thresholds)
+    restored.run_n_steps(5)
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / "population.profiles"
+    path.write_bytes(b"not a profiles file")
+
+    with pytest.raises(ValueError):
+        PopulationProfiles.load(str(path))
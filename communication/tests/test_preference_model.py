@@ -0,0 +1,48 @@
+import numpy as np
+from preferences.CriterionName import CriterionName
+from preferences.ItemFactory import ItemCreatorCSV
+from preferences.PreferenceModel import IntervalProfileCSV, RandomIntervalProfile
+from preferences.Value import Value
+
+
+def write_profiles(path) -> str:
+    filename = path / "profiles.csv"
+    rows = ["CRITERIA,P1,P2,P3,P4"]
+    rows += [f"{criterion.name},2,4,6,8" for criterion in CriterionName]
+    filename.write_text("\n".join(rows))
+    return str(filename)
+
+
+def test_csv_profile_honours_benefit_and_cost_criteria(tmp_path):
+    items, map_item_criterion = ItemCreatorCSV().create()
+    profile = IntervalProfileCSV(
+        map_item_criterion,
+        verbose=False,
+        filename=write_profiles(tmp_path),
+    )
+
+    for item in items:
+        for criterion in CriterionName:
+            real_value = map_item_criterion[item.get_name()][criterion.name]
+            level = sum(real_value > threshold for threshold in (2, 4, 6, 8))
+            if not CriterionName.is_positive_criterion(criterion):
+                level = 4 - level
+            assert profile.get_value_from_data(item, criterion) == Value(level)
+
+
+def test_bulk_classification_matches_single_lookups():
+    items, map_item_criterion = ItemCreatorCSV().create()
+    profile = RandomIntervalProfile(
+        map_item_criterion,
+        rng=np.random.default_rng(0),
+    )
+    criteria = list(CriterionName)
+
+    values = profile.get_values_from_data(items, criteria)
+
+    assert values.shape == (len(items), len(criteria))
+    for row, item in enumerate(items):
+        for column, criterion in enumerate(criteria):
+            assert profile.VALUES[values[row, column]] == profile.get_value_from_data(
+                item, criterion
+            )
@@ -0,0 +1,109 @@
+from preferences.CriterionName import CriterionName
+from preferences.CriterionValue import CriterionValue
+from preferences.Item import Item
+from preferences.Preferences import Preferences
+from preferences.Value import Value
+
+
+def make_preferences() -> tuple:
+    preferences = Preferences(None, None)
+    preferences.set_criterion_name_list(
+        [CriterionName.PROFESSOR, CriterionName.DIFFICULTY, CriterionName.EVALUATION]
+    )
+    item = Item("AI", "Artificial intelligence")
+    for criterion, value in (
+        (CriterionName.DIFFICULTY, Value.VERY_GOOD),
+        (CriterionName.EVALUATION, Value.GOOD),
+        (CriterionName.PROFESSOR, Value.BAD),
+    ):
+        preferences.add_criterion_value(CriterionValue(item, criterion, value))
+    return preferences, item
+
+
+def test_premisses_are_ordered_by_importance():
+    preferences, item = make_preferences()
+    preferences.build_index()
+
+    assert preferences.get_supporting_premisses(item) == (
+        (CriterionName.DIFFICULTY, Value.VERY_GOOD),
+        (CriterionName.EVALUATION, Value.GOOD),
+    )
+    assert preferences.get_attacking_premisses(item) == (
+        (CriterionName.PROFESSOR, Value.BAD),
+    )
+
+
+def test_premisses_follow_preference_changes():
+    preferences, item = make_preferences()
+    preferences.build_index()
+    preferences.set_criterion_name_list(
+        [CriterionName.EVALUATION, CriterionName.DIFFICULTY, CriterionName.PROFESSOR]
+    )
+
+    assert [x for x, _ in preferences.get_supporting_premisses(item)] == [
+        CriterionName.EVALUATION,
+        CriterionName.DIFFICULTY,
+    ]
+    assert preferences.get_attacking_premisses(Item("ML", "")) == ()
+
+
+def test_criterion_ranks():
+    preferences, _ = make_preferences()
+
+    assert preferences.get_criterion_rank(CriterionName.DIFFICULTY) == 1
+    assert preferences.get_criterion_rank(CriterionName.FLEXIBLE) is None
+    assert preferences.is_preferred_criterion(
+        CriterionName.PROFESSOR, CriterionName.EVALUATION
+    )
+    assert not preferences.is_preferred_criterion(
+        CriterionName.EVALUATION, CriterionName.DIFFICULTY
+    )
+
+
+def test_better_alternative_matches_a_scan_of_the_items():
+    from ArgumentModel import ArgumentModel
+    from arguments.CoupleValue import CoupleValue
+
+    agent = ArgumentModel(num_agents=2, seed=3).schedule.agents[0]
+    for proposed in agent.list_items:
+        for criterion in agent.preferences.get_criterion_name_list():
+            for value in Value:
+                expected = next(
+                    (
+                        (item, agent.preferences.get_value(item, criterion))
+                        for item in agent.list_items
+                        if item.get_name() != proposed.get_name()
+                        and agent.preferences.get_value(item, criterion).value
+                        > value.value
+                    ),
+                    None,
+                )
+                assert (
+                    agent.better_alternative_same_criterion(
+                        proposed, CoupleValue(criterion, value)
+                    )
+                    == expected
+                )
+
+
+def test_item_score_weights_criteria_by_rank():
+    preferences, item = make_preferences()
+
+    assert item.get_score(preferences) == 100 * 1 + 50 * 4 + 25 * 3
+
+
+def test_score_matrix_matches_the_item_scores():
+    from ArgumentModel import ArgumentModel
+
+    model = ArgumentModel(num_agents=5, seed=1)
+    matrix = model.get_score_matrix()
+
+    assert matrix is model.get_score_matrix()
+    assert matrix.scores.shape == (5, len(model.schedule.agents[0].list_items))
+    for agent in model.schedule.agents:
+        for item in agent.list_items:
+            expected, weight = 0, 100
+            for criterion in agent.preferences.get_criterion_name_list():
+                expected += weight * agent.preferences.get_value(item, criterion).value
+                weight /= 2
+            assert matrix.get_score(agent.get_name(), item.get_name()) == expected
@@ -0,0 +1,40 @@
+import pytest
+from message.MessagePerformative import MessagePerformative
+from profiling.Profiler import Profiler
+
+
+def test_wrap_counts_calls_and_time():
+    profiler = Profiler()
+    decide = profiler.wrap("decide", lambda x: x + 1)
+
+    assert decide(1) == 2
+    assert decide(2) == 3
+
+    report = profiler.report()
+    assert report["phases"]["decide"]["calls"] == 2
+    assert report["phases"]["decide"]["total_s"] >= 0
+    assert report["phases"]["collect"]["calls"] == 0
+
+
+def test_messages_are_counted_per_step():
+    profiler = Profiler()
+    profiler.begin_step()
+    profiler.count_message(MessagePerformative.PROPOSE)
+    profiler.count_message(MessagePerformative.PROPOSE)
+    profiler.begin_step()
+    profiler.count_message(MessagePerformative.ACCEPT)
+
+    report = profiler.report()
+    assert report["steps"] == 2
+    assert report["messages"]["per_step"] == [{"PROPOSE": 2}, {"ACCEPT": 1}]
+    assert report["messages"]["total"] == {"PROPOSE": 2, "ACCEPT": 1}
+
+
+def test_cprofile_phase(tmp_path):
+    profiler = Profiler(cprofile_phase="build_message")
+    profiler.wrap("build_message", sum)([1, 2])
+    profiler.dump_stats(tmp_path / "build_message.prof")
+    assert (tmp_path / "build_message.prof").stat().st_size > 0
+
+    with pytest.raises(ValueError):
+        Profiler(cprofile_phase="unknown")
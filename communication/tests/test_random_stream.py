@@ -0,0 +1,49 @@
+from ArgumentModel import ArgumentModel
+from rng.RandomStream import RandomStream
+
+
+def committed(model: ArgumentModel) -> dict:
+    return {agent.get_name(): agent.agreed_items for agent in model.schedule.agents}
+
+
+def test_stream_is_reproducible_across_blocks():
+    first, second = RandomStream(42, block_size=3), RandomStream(42, block_size=3)
+    draws = [first.random() for _ in range(10)]
+
+    assert draws == [second.random() for _ in range(10)]
+    assert all(0 <= x < 1 for x in draws)
+
+
+def test_spawned_streams_are_independent():
+    streams = RandomStream.spawn(42, 2)
+    assert [streams[0].random() for _ in range(5)] != [
+        streams[1].random() for _ in range(5)
+    ]
+
+
+def test_choice_covers_the_sequence():
+    stream = RandomStream(0)
+    assert {stream.choice("abc") for _ in range(100)} == {"a", "b", "c"}
+
+
+def test_models_with_the_same_seed_are_identical():
+    first = ArgumentModel(num_agents=4, seed=1)
+    second = ArgumentModel(num_agents=4, seed=1)
+    first.run_n_steps(20)
+    second.run_n_steps(20)
+
+    assert committed(first) == committed(second)
+    assert any(agent.agreed_items for agent in first.schedule.agents)
+
+
+def test_interleaved_models_do_not_interfere():
+    alone = ArgumentModel(num_agents=4, seed=1)
+    alone.run_n_steps(20)
+
+    first = ArgumentModel(num_agents=4, seed=1)
+    other = ArgumentModel(num_agents=4, seed=2)
+    for _ in range(20):
+        first.step()
+        other.step()
+
+    assert committed(first) == committed(alone)
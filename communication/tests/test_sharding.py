@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from sharding.ShardedArgumentModel import ShardedArgumentModel
+from sharding.ShardModel import ShardModel
+
+
+def run(shards: int) -> tuple:
+    model = ShardedArgumentModel(num_agents=7, shards=shards, seed=4)
+    try:
+        model.run_n_steps(20)
+        return model.get_agreed_items(), model.get_proposed_items()
+    finally:
+        model.close()
+
+
+def test_run_does_not_depend_on_the_number_of_shards():
+    agreed, proposed = run(1)
+
+    assert (agreed, proposed) == run(3)
+    assert any(agreed.values())
+
+
+def test_shard_model_only_steps_its_agents():
+    model = ShardModel(4, [0, 1], seed=1)
+    outbound = model.step(np.empty((0, 5), dtype=np.int32))
+
+    names = [agent.get_name() for agent in model.local_agents]
+    assert names == ["Agent 1", "Agent 2"]
+    assert not any(
+        agent.conversations
+        for agent in model.schedule.agents
+        if agent.get_name() not in names
+    )
+    assert set(outbound[:, 1].tolist()) <= {2, 3}
+
+
+def test_shard_model_only_creates_its_agents():
+    model = ShardModel(4, [2, 3], seed=1)
+    whole = ShardModel(4, [0, 1, 2, 3], seed=1)
+
+    assert [agent.get_name() for agent in model.schedule.agents] == [
+        "Agent 3",
+        "Agent 4",
+    ]
+    assert model.conversations.names == [f"Agent {idx}" for idx in range(1, 5)]
+    assert model.conversations.states().shape == (2, 4)
+    for agent, reference in zip(model.local_agents, whole.schedule.agents[2:]):
+        assert agent.preferences.get_criterion_name_list() == (
+            reference.preferences.get_criterion_name_list()
+        )
+        assert (
+            agent.preferences.get_value_matrix(agent.list_items)
+            == reference.preferences.get_value_matrix(reference.list_items)
+        ).all()
+
+    with pytest.raises(ValueError):
+        ShardModel(4, [0, 2], seed=1)
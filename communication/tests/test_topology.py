@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from ArgumentModel import ArgumentModel
+from topology.Topology import Topology
+
+
+def test_ring_joins_the_closest_agents():
+    topology = Topology.ring(6, degree=4)
+
+    assert topology.neighbours(0).tolist() == [1, 2, 4, 5]
+    assert topology.degrees().tolist() == [4] * 6
+    assert topology.num_edges == 12
+
+
+def test_edge_list_is_symmetric_without_duplicates(tmp_path):
+    filename = tmp_path / "edges.txt"
+    filename.write_text("# a triangle and a loop\n0 1\n1 2\n2 0\n1 0\n3 3\n")
+    topology = Topology.from_edge_list(str(filename))
+
+    assert topology.num_agents == 4
+    assert topology.num_edges == 3
+    assert topology.neighbours(1).tolist() == [0, 2]
+    assert topology.neighbours(3).tolist() == []
+
+
+def test_random_graphs_have_the_requested_degree():
+    assert set(Topology.regular(20, 3, seed=1).degrees().tolist()) == {3}
+    assert Topology.small_world(20, 4, 0.2, seed=1).num_edges == 40
+
+
+def test_agents_only_converse_with_their_neighbours():
+    topology = Topology.ring(12, degree=2)
+    model = ArgumentModel(num_agents=12, seed=1, topology=topology)
+    model.run_n_steps(20)
+
+    table = model.conversations
+    assert table.states().shape == (2 * topology.num_edges,)
+    talked = False
+    for agent in model.schedule.agents:
+        neighbours = {
+            table.names[other]
+            for other in topology.neighbours(table.agent_id(agent.get_name()))
+        }
+        assert set(agent.conversations) <= neighbours
+        assert set(agent.agreed_items) <= neighbours
+        assert set(agent.proposed_items) <= neighbours
+        talked = talked or bool(agent.proposed_items)
+    assert talked
+
+
+def test_topology_must_match_the_population():
+    with pytest.raises(ValueError):
+        ArgumentModel(num_agents=5, topology=Topology.ring(6))
+    with pytest.raises(ValueError):
+        Topology(3, np.array([[0, 3]]))
@@ -0,0 +1,95 @@
+import pytest
+from arguments.Argument import Argument
+from conversational_model.FSM import Turn
+from message.Message import Message
+from message.MessagePerformative import MessagePerformative as P
+from preferences.CriterionName import CriterionName
+from preferences.Item import Item
+from preferences.Value import Value
+from tracing.MessageTrace import MessageTrace
+from tracing.TraceReplay import TraceReplay
+
+
+@pytest.fixture
+def trace_path(tmp_path):
+    """A negotiation of POO between two agents, won after one argument each."""
+    poo = Item("POO", "Génie logiciel orienté objet")
+    items = [Item("IA", "Intelligence Artificielle"), poo]
+
+    because = Argument(True, poo, "Agent 1")
+    because.add_premiss_couple_values(CriterionName.FLEXIBLE, Value.GOOD)
+    argue = Argument(False, poo, "Agent 2")
+    argue.add_premiss_couple_values(CriterionName.FLEXIBLE, Value.BAD)
+
+    path = tmp_path / "run.trace"
+    trace = MessageTrace(path, ["Agent 1", "Agent 2"], items)
+    for step, exp, dest, performative, content in [
+        (0, "Agent 1", "Agent 2", P.PROPOSE, "POO"),
+        (0, "Agent 2", "Agent 1", P.ASK_WHY, "POO"),
+        (1, "Agent 1", "Agent 2", P.BECAUSE, because),
+        (1, "Agent 2", "Agent 1", P.ARGUE, argue),
+        (2, "Agent 1", "Agent 2", P.ACCEPT, "POO"),
+        (2, "Agent 2", "Agent 1", P.COMMIT, "POO"),
+        (3, "Agent 1", "Agent 2", P.ACK, "POO"),
+    ]:
+        trace.record_message(step, Message(exp, dest, performative, content))
+    trace.close()
+    return path
+
+
+def test_replay_rebuilds_agent_state(trace_path):
+    replay = TraceReplay(trace_path)
+    replay.run()
+
+    assert replay.current_step == 4
+    assert replay.proposed_items["Agent 1"] == {"Agent 2": ["POO"]}
+    assert replay.agreed_items["Agent 1"] == {"Agent 2": ["POO"]}
+    assert replay.agreed_items["Agent 2"] == {"Agent 1": ["POO"]}
+    assert len(replay.mailboxes["Agent 2"].get_messages()) == 4
+
+    [argument] = replay.argumentations["Agent 2"]["Agent 1"].all_arguments()
+    assert (
+        str(argument) == "[ not POO (Génie logiciel orienté objet); (FLEXIBLE = BAD) ] "
+    )
+    assert argument.get_parent().get_agent() == "Agent 1"
+
+    assert replay.conversation_state("Agent 1", "Agent 2") == (P.ACK, Turn.Other)
+    assert replay.conversation_state("Agent 2", "Agent 1") == (P.IDLE, Turn.Other)
+
+
+def test_seek_backwards(trace_path):
+    replay = TraceReplay(trace_path)
+    replay.run()
+    replay.seek(2)
+
+    assert replay.current_step == 2
+    assert replay.agreed_items["Agent 1"] == {}
+    assert replay.conversation_state("Agent 1", "Agent 2") == (P.ARGUE, Turn.Me)
+    assert replay.conversation_state("Agent 2", "Agent 1") == (P.ARGUE, Turn.Other)
+
+
+def test_record_statistics(trace_path):
+    replay = TraceReplay(trace_path, mmap=True)
+
+    assert replay.acceptance_rates() == {"POO": 1.0}
+    assert replay.argument_depths() == {1: 1}
+
+
+def test_replay_matches_the_recorded_model(tmp_path):
+    from ArgumentModel import ArgumentModel
+
+    model = ArgumentModel(num_agents=5, trace_path=tmp_path / "model.trace", seed=1)
+    model.run_n_steps(30)
+    model.close_trace()
+
+    replay = TraceReplay(tmp_path / "model.trace")
+    replay.run()
+
+    for agent in model.schedule.agents:
+        name = agent.get_name()
+        assert replay.agreed_items[name] == agent.agreed_items
+        assert replay.proposed_items[name] == agent.proposed_items
+        for other, argumentation in agent.argumentations.items():
+            assert list(replay.argumentations[name][other].all_arguments()) == list(
+                argumentation.all_arguments()
+            )
@@ -0,0 +1,36 @@
+from ArgumentModel import ArgumentModel
+from conversational_model.FSM import FiniteStateMachine
+from message.Message import Message
+from message.MessagePerformative import MessagePerformative
+from preferences.Preferences import Preferences
+
+
+def test_decision_context_reaches_the_message_builder():
+    contexts = []
+
+    def decide(preferences, input, current_state, next_states, context):
+        context.item = "item"
+        contexts.append(context)
+        return MessagePerformative.PROPOSE
+
+    def build_message(preferences, input, next_state, context):
+        contexts.append(context)
+        return None
+
+    fsm = FiniteStateMachine("Agent 1", "Agent 2")
+    fsm.step(
+        input=Message("Agent 1", "Agent 2", MessagePerformative.IDLE, None),
+        preferences=Preferences(decide, build_message),
+    )
+
+    assert contexts[0] is contexts[1]
+    assert contexts[1].item == "item"
+
+
+def test_proposed_item_is_the_one_the_decision_supported():
+    # The message builder used to draw the proposed item again, which could pick
+    # an item without supporting argument and fail when asked why.
+    model = ArgumentModel(num_agents=6, seed=0)
+    model.run_n_steps(40)
+
+    assert any(agent.agreed_items for agent in model.schedule.agents)
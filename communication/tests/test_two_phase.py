@@ -0,0 +1,71 @@
+import threading
+
+import pytest
+from memoization.ConversationCache import ConversationCache
+from message.Message import Message
+from message.MessagePerformative import MessagePerformative
+from runtime.ThreadedArgumentModel import ThreadedArgumentModel
+
+
+def run(workers: int) -> list:
+    model = ThreadedArgumentModel(num_agents=7, seed=4, workers=workers)
+    try:
+        model.run_n_steps(25)
+        return [agent.agreed_items for agent in model.schedule.agents]
+    finally:
+        model.close()
+
+
+def test_run_does_not_depend_on_the_number_of_threads():
+    committed = run(1)
+
+    assert committed == run(4)
+    assert any(committed)
+
+
+def test_conversation_caches_are_rejected():
+    with pytest.raises(ValueError):
+        ThreadedArgumentModel(num_agents=4, conversation_cache=ConversationCache())
+
+
+def test_held_messages_are_sent_in_commit_order():
+    model = ThreadedArgumentModel(num_agents=3, seed=1, workers=1)
+    names = [agent.get_name() for agent in model.schedule.agents]
+    service = model.message_service
+
+    service.hold_messages(names)
+    for sender in reversed(names):
+        service.send_message(
+            Message(sender, names[0], MessagePerformative.IDLE, None),
+        )
+    assert service.get_messages_to_proceed() == []
+    service.commit_messages(names)
+
+    assert [x.get_exp() for x in service.get_messages_to_proceed()] == names
+    model.close()
+
+
+def test_mailbox_receives_from_concurrent_threads():
+    model = ThreadedArgumentModel(num_agents=2, seed=1)
+    sender, receiver = model.schedule.agents
+
+    def send():
+        for _ in range(1000):
+            sender.send_message(
+                Message(
+                    sender.get_name(),
+                    receiver.get_name(),
+                    MessagePerformative.IDLE,
+                    None,
+                )
+            )
+
+    threads = [threading.Thread(target=send) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    model.message_service.dispatch_messages()
+
+    assert len(receiver.get_new_messages()) == 4000
+    model.close()
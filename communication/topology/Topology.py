@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+from typing import Optional
+
+import numpy as np
+
+
+class Topology:
+    """Topology class.
+    Class implementing the undirected interaction graph of a population, agents
+    being referred to by their index. Agents only open conversations with their
+    neighbours, so that the state kept per agent is sized by its degree.
+
+    The graph is stored in compressed sparse rows: the neighbours of agent a are
+    indices[indptr[a]:indptr[a + 1]], in increasing order. Each edge appears in the
+    rows of both its ends, and self loops are dropped.
+
+    attr:
+        num_agents: the number of agents (int)
+        indptr: the start of the row of each agent in indices (np.ndarray)
+        indices: the neighbours of every agent, row after row (np.ndarray)
+    """
+
+    def __init__(self, num_agents: int, edges: np.ndarray):
+        """Create a new Topology from an (edges, 2) array of agent indices."""
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        if len(edges) and (edges.min() < 0 or edges.max() >= num_agents):
+            raise ValueError(f"Edges must join agents of 0 to {num_agents - 1}")
+        edges = edges[edges[:, 0] != edges[:, 1]]
+        arcs = np.unique(
+            np.concatenate((edges, edges[:, ::-1])) if len(edges) else edges,
+            axis=0,
+        )
+        self.num_agents = num_agents
+        self.indptr = np.zeros(num_agents + 1, dtype=np.int64)
+        np.cumsum(np.bincount(arcs[:, 0], minlength=num_agents), out=self.indptr[1:])
+        self.indices = np.ascontiguousarray(arcs[:, 1])
+
+    @property
+    def num_edges(self) -> int:
+        """The number of edges."""
+        return len(self.indices) // 2
+
+    def neighbours(self, agent: int) -> np.ndarray:
+        """Return the neighbours of an agent, in increasing order."""
+        return self.indices[self.indptr[agent] : self.indptr[agent + 1]]
+
+    def degrees(self) -> np.ndarray:
+        """Return the number of neighbours of each agent."""
+        return np.diff(self.indptr)
+
+    @staticmethod
+    def ring(num_agents: int, degree: int = 2) -> "Topology":
+        """Return the ring lattice joining each agent to the degree // 2 closest
+        agents on each side."""
+        agents = np.arange(num_agents)
+        edges = [
+            np.stack((agents, (agents + offset) % num_agents), axis=1)
+            for offset in range(1, degree // 2 + 1)
+        ]
+        return Topology(
+            num_agents,
+            np.concatenate(edges) if edges else np.empty((0, 2), dtype=np.int64),
+        )
+
+    @staticmethod
+    def regular(
+        num_agents: int,
+        degree: int,
+        seed: Optional[int] = None,
+    ) -> "Topology":
+        """Return a random graph where every agent has degree neighbours."""
+        import networkx as nx
+
+        graph = nx.random_regular_graph(degree, num_agents, seed=seed)
+        return Topology(num_agents, np.array(graph.edges(), dtype=np.int64))
+
+    @staticmethod
+    def small_world(
+        num_agents: int,
+        degree: int,
+        rewiring: float,
+        seed: Optional[int] = None,
+    ) -> "Topology":
+        """Return a Watts-Strogatz graph: the ring lattice of the given degree, each
+        edge being rewired to a random agent with probability rewiring."""
+        import networkx as nx
+
+        graph = nx.watts_strogatz_graph(num_agents, degree, rewiring, seed=seed)
+        return Topology(num_agents, np.array(graph.edges(), dtype=np.int64))
+
+    @staticmethod
+    def from_edge_list(filename: str, num_agents: Optional[int] = None) -> "Topology":
+        """Return the graph of a text file holding one edge per line, as two agent
+        indices separated by white space. Lines starting with # are ignored."""
+        edges = np.loadtxt(filename, dtype=np.int64, comments="#", ndmin=2)
+        if num_agents is None:
+            num_agents = int(edges.max()) + 1 if edges.size else 0
+        return Topology(num_agents, edges)
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+import atexit
+import json
+import queue
+import struct
+import threading
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+from message.Message import Message
+from message.MessageCodec import MessageCodec
+from preferences.Item import Item
+
+TRACE_MAGIC = b"SMATRACE"
+TRACE_VERSION = 1
+
+# One record per message sent: the step, the sender and receiver indices in the
+# header agent list, the performative value, the item index in the header item
+# list (-1 if none) and the argument key (-1 if none, see Argument.to_key).
+TRACE_RECORD_DTYPE = np.dtype(
+    [
+        ("step", "<u4"),
+        ("sender", "<i4"),
+        ("receiver", "<i4"),
+        ("performative", "u1"),
+        ("item", "<i2"),
+        ("argument", "<i4"),
+    ]
+)
+
+_HEADER_PREFIX = struct.Struct("<8sII")
+
+
+class MessageTrace:
+    """MessageTrace class.
+    Class implementing a structured sink for the messages exchanged during a run.
+
+    Records are appended to an in-memory buffer as plain tuples and handed over in
+    bulk to a background writer thread, which packs them into TRACE_RECORD_DTYPE
+    and appends them to the trace file. Text events (FSM transitions, generated
+    preferences...) are only kept at the EVENTS level, and are formatted by the
+    writer thread into a companion "<path>.log" file.
+
+    attr:
+        path: the trace file (Path)
+        level: MESSAGES records messages only, EVENTS also records text events (int)
+        codec: encodes the messages with the header indices (MessageCodec)
+    """
+
+    MESSAGES = 1
+    EVENTS = 2
+
+    def __init__(
+        self,
+        path: str,
+        agent_names: List[str],
+        items: List[Item],
+        level: int = MESSAGES,
+        buffer_size: int = 65536,
+    ):
+        """Create a new MessageTrace and write its header."""
+        self.path = Path(path)
+        self.level = level
+        self.codec = MessageCodec(agent_names, items)
+        self.__buffer_size = buffer_size
+        self.__records: List[tuple] = []
+        self.__events: List[Tuple[str, tuple]] = []
+        self.__queue: queue.Queue = queue.Queue()
+        self.__closed = False
+        self.__lock = threading.RLock()
+
+        header = json.dumps(
+            {
+                "agents": list(agent_names),
+                "items": [item.get_name() for item in items],
+                "descriptions": [item.get_description() for item in items],
+            }
+        ).encode("utf-8")
+        with open(self.path, "wb") as trace_file:
+            trace_file.write(
+                _HEADER_PREFIX.pack(TRACE_MAGIC, TRACE_VERSION, len(header))
+            )
+            trace_file.write(header)
+
+        self.__writer = threading.Thread(
+            target=self.__write_chunks,
+            name="MessageTraceWriter",
+            daemon=True,
+        )
+        self.__writer.start()
+        atexit.register(self.close)
+
+    def enabled_for(self, level: int) -> bool:
+        """Return whether records of the given level are kept."""
+        return level <= self.level
+
+    def record_message(self, step: int, message: Message) -> None:
+        """Append a message to the buffer."""
+        record = (step, *self.codec.encode(message))
+        with self.__lock:
+            self.__records.append(record)
+            if len(self.__records) >= self.__buffer_size:
+                self.flush()
+
+    def log(self, level: int, message: str, *args) -> None:
+        """Keep a text event, formatted as message % args by the writer thread."""
+        if level > self.level:
+            return
+        with self.__lock:
+            self.__events.append((message, args))
+            if len(self.__events) >= self.__buffer_size:
+                self.flush()
+
+    def flush(self) -> None:
+        """Hand the buffered records over to the writer thread."""
+        with self.__lock:
+            if self.__records:
+                self.__queue.put(("records", self.__records))
+                self.__records = []
+            if self.__events:
+                self.__queue.put(("events", self.__events))
+                self.__events = []
+
+    def close(self) -> None:
+        """Flush the buffers and wait for the writer thread to finish."""
+        if self.__closed:
+            return
+        self.__closed = True
+        self.flush()
+        self.__queue.put(None)
+        self.__writer.join()
+        atexit.unregister(self.close)
+
+    def __write_chunks(self) -> None:
+        log_path = self.path.with_name(self.path.name + ".log")
+        while True:
+            chunk = self.__queue.get()
+            if chunk is None:
+                return
+            kind, entries = chunk
+            if kind == "records":
+                with open(self.path, "ab") as trace_file:
+                    trace_file.write(
+                        np.array(entries, dtype=TRACE_RECORD_DTYPE).tobytes()
+                    )
+            else:
+                with open(log_path, "a", encoding="utf-8") as log_file:
+                    log_file.writelines(
+                        (message % args if args else message) + "\n"
+                        for message, args in entries
+                    )
+
+
+def read_trace(path: str, mmap: bool = False) -> Tuple[dict, np.ndarray]:
+    """Read a trace file written by MessageTrace.
+
+    Returns:
+        the header ({"agents": [...], "items": [...], "descriptions": [...]}) and
+        the records as a
+        structured array of TRACE_RECORD_DTYPE, memory-mapped if mmap is True.
+    """
+    with open(path, "rb") as trace_file:
+        magic, version, header_length = _HEADER_PREFIX.unpack(
+            trace_file.read(_HEADER_PREFIX.size)
+        )
+        if magic != TRACE_MAGIC or version != TRACE_VERSION:
+            raise ValueError(f"{path} is not a version {TRACE_VERSION} message trace")
+        header = json.loads(trace_file.read(header_length).decode("utf-8"))
+
+    offset = _HEADER_PREFIX.size + header_length
+    if mmap:
+        size = Path(path).stat().st_size - offset
+        if size == 0:
+            return header, np.empty(0, dtype=TRACE_RECORD_DTYPE)
+        records = np.memmap(path, dtype=TRACE_RECORD_DTYPE, mode="r", offset=offset)
+    else:
+        records = np.fromfile(path, dtype=TRACE_RECORD_DTYPE, offset=offset)
+    return header, records
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+from collections import Counter
+from mailbox.Mailbox import Mailbox
+from typing import Dict, List, Tuple
+
+import numpy as np
+from arguments.Argumentation import Argumentation
+from conversational_model.FSM import Turn
+from conversational_model.Protocol import Protocol
+from message.Message import Message
+from message.MessageCodec import MessageCodec
+from message.MessagePerformative import MessagePerformative
+from preferences.Item import Item
+from tracing.MessageTrace import read_trace
+
+
+class TraceReplay:
+    """TraceReplay class.
+    Class rebuilding, step by step, the state of a recorded ArgumentModel run from
+    its message trace, without invoking any decision logic.
+
+    Everything the agents record is a consequence of the messages they send:
+        - PROPOSE adds the item to the sender's proposed items,
+        - COMMIT and ACK add the item to the sender's agreed items,
+        - ARGUE and BECAUSE add the argument to the sender's argumentation, an ARGUE
+          argument answering the last argument received from the other agent,
+    and the conversation states follow the protocol: the sender moves to the
+    performative it sent, the receiver infers it and, when the protocol leaves it a
+    single silent successor (IDLE after ACK, REJECT or QUERY_REF), moves there.
+
+    The receiving side is advanced when the message is delivered: a message sent at
+    step s is processed by its receiver at step s or s + 1 depending on the
+    activation order, which the trace does not record.
+
+    attr:
+        agents: the agent names, indexed like the trace records (list)
+        items: the items, indexed like the trace records (list)
+        current_step: the number of steps replayed so far (int)
+        mailboxes: the mailbox of each agent (dict)
+        agreed_items: the items each agent agreed on, per other agent (dict)
+        proposed_items: the items each agent proposed, per other agent (dict)
+        argumentations: the arguments each agent used, per other agent (dict)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mmap: bool = False,
+        protocol_path: str = ".",
+        protocol_filename: str = "conversational_graph.json",
+    ):
+        """Open a trace written by MessageTrace."""
+        header, self.records = read_trace(path, mmap=mmap)
+        self.agents: List[str] = header["agents"]
+        self.items: List[Item] = [
+            Item(name, description)
+            for name, description in zip(header["items"], header["descriptions"])
+        ]
+        self.__codec = MessageCodec(self.agents, self.items)
+
+        protocol = Protocol.load(protocol_path, protocol_filename)
+        self.__initial_state = protocol.initial_state
+        self.__silent_successor: Dict[MessagePerformative, MessagePerformative] = {
+            state: successors[0]
+            for state, successors in protocol.successors.items()
+            if len(successors) == 1
+            and successors[0]
+            in (MessagePerformative.IDLE, MessagePerformative.FINISHED)
+        }
+
+        steps = self.records["step"]
+        self.num_steps = int(steps[-1]) + 1 if len(steps) else 0
+        # Records of step s are records[step_starts[s]:step_starts[s + 1]].
+        self.__step_starts = np.searchsorted(steps, np.arange(self.num_steps + 1))
+
+        self.reset()
+
+    def reset(self) -> None:
+        """Go back to the state before the first step."""
+        self.current_step = 0
+        self.mailboxes: Dict[str, Mailbox] = {name: Mailbox() for name in self.agents}
+        self.agreed_items: Dict[str, Dict[str, List[str]]] = {
+            name: {} for name in self.agents
+        }
+        self.proposed_items: Dict[str, Dict[str, List[str]]] = {
+            name: {} for name in self.agents
+        }
+        self.argumentations: Dict[str, Dict[str, Argumentation]] = {
+            name: {} for name in self.agents
+        }
+        self.__states: Dict[Tuple[str, str], Tuple[MessagePerformative, int]] = {}
+        self.__last_received: Dict[Tuple[str, str], Message] = {}
+
+    def conversation_state(
+        self,
+        agent: str,
+        other: str,
+    ) -> Tuple[MessagePerformative, int]:
+        """Return the protocol state and turn of agent in its conversation with other."""
+        return self.__states.get((agent, other), (self.__initial_state, Turn.Me))
+
+    def step(self) -> bool:
+        """Replay the next step. Return False when the trace is exhausted."""
+        if self.current_step >= self.num_steps:
+            return False
+        start = self.__step_starts[self.current_step]
+        end = self.__step_starts[self.current_step + 1]
+        for record in self.records[start:end]:
+            self.__apply(record)
+        self.current_step += 1
+        return True
+
+    def seek(self, step: int) -> None:
+        """Move to the state reached after the given number of steps."""
+        step = min(step, self.num_steps)
+        if step < self.current_step:
+            self.reset()
+        while self.current_step < step:
+            self.step()
+
+    def run(self) -> None:
+        """Replay every remaining step."""
+        self.seek(self.num_steps)
+
+    def __apply(self, record) -> None:
+        message = self.__codec.decode(*record.tolist()[1:])
+        sender, receiver = message.get_exp(), message.get_dest()
+        performative, content = message.get_performative(), message.get_content()
+
+        if performative == MessagePerformative.PROPOSE:
+            self.proposed_items[sender].setdefault(receiver, []).append(content)
+        elif performative in (MessagePerformative.COMMIT, MessagePerformative.ACK):
+            agreed = self.agreed_items[sender].setdefault(receiver, [])
+            if content not in agreed:
+                agreed.append(content)
+        elif performative in (MessagePerformative.ARGUE, MessagePerformative.BECAUSE):
+            argumentations = self.argumentations[sender]
+            if receiver not in argumentations:
+                argumentations[receiver] = Argumentation(sender, receiver)
+            # Like the message builder, the argument is recorded before it is
+            # linked to the one it answers.
+            argumentations[receiver].add_argument(content)
+            if performative == MessagePerformative.ARGUE:
+                content.set_parent(
+                    self.__last_received[(sender, receiver)].get_content()
+                )
+
+        self.__states[(sender, receiver)] = (performative, Turn.Other)
+        self.mailboxes[receiver].receive_messages(message)
+        self.__last_received[(receiver, sender)] = message
+        self.__states[(receiver, sender)] = (
+            (self.__silent_successor[performative], Turn.Other)
+            if performative in self.__silent_successor
+            else (performative, Turn.Me)
+        )
+
+    def acceptance_rates(self) -> Dict[str, float]:
+        """Return, for each proposed item, its number of commitments per proposal.
+        Computed from the records only."""
+        performatives = self.records["performative"]
+        items = self.records["item"]
+        proposed = np.bincount(
+            items[performatives == MessagePerformative.PROPOSE.value],
+            minlength=len(self.items),
+        )
+        committed = np.bincount(
+            items[performatives == MessagePerformative.COMMIT.value],
+            minlength=len(self.items),
+        )
+        return {
+            item.get_name(): committed[idx] / proposed[idx]
+            for idx, item in enumerate(self.items)
+            if proposed[idx] > 0
+        }
+
+    def argument_depths(self) -> Counter:
+        """Return how many conversations reached each number of ARGUE messages.
+        Computed from the records only."""
+        depths = Counter()
+        current: Dict[Tuple[int, int], int] = {}
+        performatives = self.records["performative"].tolist()
+        senders = self.records["sender"].tolist()
+        receivers = self.records["receiver"].tolist()
+        for performative, sender, receiver in zip(performatives, senders, receivers):
+            pair = (min(sender, receiver), max(sender, receiver))
+            if performative == MessagePerformative.PROPOSE.value:
+                if pair in current:
+                    depths[current[pair]] += 1
+                current[pair] = 0
+            elif performative == MessagePerformative.ARGUE.value:
+                current[pair] = current.get(pair, 0) + 1
+        depths.update(current.values())
+        return depths